@@ -0,0 +1,27 @@
+"""Indexes for the paginated stock movement ledger
+
+Revision ID: 0003_stock_movement_indexes
+Revises: 0002_photo_url_text
+Create Date: 2026-10-19 00:00:00.000000
+"""
+
+from alembic import op
+
+
+revision = "0003_stock_movement_indexes"
+down_revision = "0002_photo_url_text"
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    # Keyset pagination walks (created_at, id) backwards; per-inventory history uses the second one
+    op.create_index("ix_stock_movements_created_at_id", "stock_movements", ["created_at", "id"])
+    op.create_index(
+        "ix_stock_movements_inventory_created_at", "stock_movements", ["inventory_id", "created_at"]
+    )
+
+
+def downgrade() -> None:
+    op.drop_index("ix_stock_movements_inventory_created_at", table_name="stock_movements")
+    op.drop_index("ix_stock_movements_created_at_id", table_name="stock_movements")
@@ -0,0 +1,38 @@
+"""Inventory snapshots for as-of stock queries
+
+Revision ID: 0004_inventory_snapshots
+Revises: 0003_stock_movement_indexes
+Create Date: 2026-10-19 00:00:00.000000
+"""
+
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+
+revision = "0004_inventory_snapshots"
+down_revision = "0003_stock_movement_indexes"
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.create_table(
+        "inventory_snapshots",
+        sa.Column("id", postgresql.UUID(as_uuid=True), primary_key=True),
+        sa.Column(
+            "inventory_id",
+            postgresql.UUID(as_uuid=True),
+            sa.ForeignKey("inventories.id", ondelete="CASCADE"),
+        ),
+        sa.Column("taken_at", sa.DateTime(timezone=True), nullable=False),
+        sa.Column("balance", sa.Integer(), nullable=False, server_default="0"),
+        sa.Column("movement_count", sa.Integer(), nullable=False, server_default="0"),
+        sa.UniqueConstraint(
+            "inventory_id", "taken_at", name="uq_inventory_snapshots_inventory_taken_at"
+        ),
+    )
+
+
+def downgrade() -> None:
+    op.drop_table("inventory_snapshots")
@@ -0,0 +1,39 @@
+"""Striped inventory counters for hot products
+
+Revision ID: 0005_inventory_stripes
+Revises: 0004_inventory_snapshots
+Create Date: 2026-10-19 00:00:00.000000
+"""
+
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+
+revision = "0005_inventory_stripes"
+down_revision = "0004_inventory_snapshots"
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.add_column(
+        "inventories", sa.Column("stripe_count", sa.Integer(), nullable=False, server_default="0")
+    )
+    op.create_table(
+        "inventory_stripes",
+        sa.Column(
+            "inventory_id",
+            postgresql.UUID(as_uuid=True),
+            sa.ForeignKey("inventories.id", ondelete="CASCADE"),
+            primary_key=True,
+        ),
+        sa.Column("stripe", sa.Integer(), primary_key=True),
+        sa.Column("available", sa.Integer(), server_default="0"),
+        sa.Column("reserved", sa.Integer(), server_default="0"),
+    )
+
+
+def downgrade() -> None:
+    op.drop_table("inventory_stripes")
+    op.drop_column("inventories", "stripe_count")
@@ -0,0 +1,54 @@
+"""Time-limited stock holds placed from carts
+
+Revision ID: 0006_stock_holds
+Revises: 0005_inventory_stripes
+Create Date: 2026-10-19 00:00:00.000000
+"""
+
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+
+revision = "0006_stock_holds"
+down_revision = "0005_inventory_stripes"
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.create_table(
+        "stock_holds",
+        sa.Column("id", postgresql.UUID(as_uuid=True), primary_key=True),
+        sa.Column(
+            "cart_id", postgresql.UUID(as_uuid=True), sa.ForeignKey("carts.id", ondelete="CASCADE")
+        ),
+        sa.Column(
+            "cart_item_id",
+            postgresql.UUID(as_uuid=True),
+            sa.ForeignKey("cart_items.id", ondelete="CASCADE"),
+        ),
+        sa.Column(
+            "inventory_id",
+            postgresql.UUID(as_uuid=True),
+            sa.ForeignKey("inventories.id", ondelete="CASCADE"),
+        ),
+        sa.Column("quantity", sa.Integer(), nullable=False),
+        sa.Column("expires_at", sa.DateTime(timezone=True), nullable=False),
+        sa.Column("created_at", sa.DateTime(timezone=True), server_default=sa.func.now()),
+    )
+    op.create_index("ix_stock_holds_cart_id", "stock_holds", ["cart_id"])
+    op.create_index("ix_stock_holds_cart_item_id", "stock_holds", ["cart_item_id"])
+    op.create_index("ix_stock_holds_expires_at", "stock_holds", ["expires_at"])
+    op.add_column(
+        "order_items",
+        sa.Column("reserved_quantity", sa.Integer(), nullable=False, server_default="0"),
+    )
+
+
+def downgrade() -> None:
+    op.drop_column("order_items", "reserved_quantity")
+    op.drop_index("ix_stock_holds_expires_at", table_name="stock_holds")
+    op.drop_index("ix_stock_holds_cart_item_id", table_name="stock_holds")
+    op.drop_index("ix_stock_holds_cart_id", table_name="stock_holds")
+    op.drop_table("stock_holds")
@@ -0,0 +1,72 @@
+"""Low-stock thresholds and alert feed
+
+Revision ID: 0007_stock_alerts
+Revises: 0006_stock_holds
+Create Date: 2026-10-19 00:00:00.000000
+"""
+
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+
+revision = "0007_stock_alerts"
+down_revision = "0006_stock_holds"
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    alertkind = sa.Enum("low", "recovered", name="stockalertkind")
+
+    op.create_table(
+        "stock_thresholds",
+        sa.Column("id", postgresql.UUID(as_uuid=True), primary_key=True),
+        sa.Column(
+            "product_id",
+            postgresql.UUID(as_uuid=True),
+            sa.ForeignKey("products.id", ondelete="CASCADE"),
+        ),
+        sa.Column(
+            "warehouse_id",
+            postgresql.UUID(as_uuid=True),
+            sa.ForeignKey("warehouses.id", ondelete="CASCADE"),
+        ),
+        sa.Column("min_available", sa.Integer(), nullable=False),
+        sa.Column("is_below", sa.Boolean(), server_default=sa.false()),
+        sa.UniqueConstraint(
+            "product_id", "warehouse_id", name="uq_stock_thresholds_product_warehouse"
+        ),
+    )
+
+    op.create_table(
+        "stock_alerts",
+        sa.Column("id", postgresql.UUID(as_uuid=True), primary_key=True),
+        sa.Column(
+            "threshold_id",
+            postgresql.UUID(as_uuid=True),
+            sa.ForeignKey("stock_thresholds.id", ondelete="CASCADE"),
+        ),
+        sa.Column(
+            "product_id",
+            postgresql.UUID(as_uuid=True),
+            sa.ForeignKey("products.id", ondelete="CASCADE"),
+        ),
+        sa.Column(
+            "warehouse_id",
+            postgresql.UUID(as_uuid=True),
+            sa.ForeignKey("warehouses.id", ondelete="CASCADE"),
+        ),
+        sa.Column("kind", alertkind, nullable=False),
+        sa.Column("available", sa.Integer(), nullable=False),
+        sa.Column("min_available", sa.Integer(), nullable=False),
+        sa.Column("created_at", sa.DateTime(timezone=True), server_default=sa.func.now()),
+    )
+    op.create_index("ix_stock_alerts_created_at", "stock_alerts", ["created_at"])
+
+
+def downgrade() -> None:
+    op.drop_index("ix_stock_alerts_created_at", table_name="stock_alerts")
+    op.drop_table("stock_alerts")
+    op.drop_table("stock_thresholds")
+    sa.Enum(name="stockalertkind").drop(op.get_bind(), checkfirst=True)
@@ -0,0 +1,27 @@
+"""Composite index for variant-level inventory lookups
+
+Revision ID: 0008_inventory_variant_index
+Revises: 0007_stock_alerts
+Create Date: 2026-10-19 00:00:00.000000
+"""
+
+from alembic import op
+
+
+revision = "0008_inventory_variant_index"
+down_revision = "0007_stock_alerts"
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    # Reservas, holds y el filtro de disponibilidad resuelven (product_id, variant_id) por igualdad
+    op.create_index(
+        "ix_inventories_product_variant_warehouse",
+        "inventories",
+        ["product_id", "variant_id", "warehouse_id"],
+    )
+
+
+def downgrade() -> None:
+    op.drop_index("ix_inventories_product_variant_warehouse", table_name="inventories")
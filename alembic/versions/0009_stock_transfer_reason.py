@@ -0,0 +1,25 @@
+"""Movement reason for inter-warehouse transfers
+
+Revision ID: 0009_stock_transfer_reason
+Revises: 0008_inventory_variant_index
+Create Date: 2026-10-19 00:00:00.000000
+"""
+
+from alembic import op
+
+
+revision = "0009_stock_transfer_reason"
+down_revision = "0008_inventory_variant_index"
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    # ADD VALUE no puede usarse dentro de la misma transacción que lo agrega
+    with op.get_context().autocommit_block():
+        op.execute("ALTER TYPE stockmovementreason ADD VALUE IF NOT EXISTS 'transfer'")
+
+
+def downgrade() -> None:
+    # Postgres no permite quitar valores de un enum; las filas 'transfer' quedan como ajustes
+    op.execute("UPDATE stock_movements SET reason = 'adjustment' WHERE reason = 'transfer'")
@@ -0,0 +1,123 @@
+"""Monthly range partitioning for stock_movements
+
+Revision ID: 0010_partition_stock_movements
+Revises: 0009_stock_transfer_reason
+Create Date: 2026-10-19 00:00:00.000000
+"""
+
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+
+revision = "0010_partition_stock_movements"
+down_revision = "0009_stock_transfer_reason"
+branch_labels = None
+depends_on = None
+
+# Meses creados por adelantado; después los mantienen app/jobs/stock_partitions.py y el arranque
+# de la app (0018 agrega la partición DEFAULT)
+MONTHS_AHEAD = 3
+
+
+def upgrade() -> None:
+    # Los límites de cada partición se escriben en UTC, igual que el job de mantenimiento
+    op.execute("SET LOCAL TIME ZONE 'UTC'")
+    op.execute("ALTER TABLE stock_movements RENAME TO stock_movements_unpartitioned")
+    op.execute(
+        "ALTER TABLE stock_movements_unpartitioned "
+        "RENAME CONSTRAINT stock_movements_pkey TO stock_movements_unpartitioned_pkey"
+    )
+    op.execute(
+        "ALTER INDEX ix_stock_movements_created_at_id "
+        "RENAME TO ix_stock_movements_unpartitioned_created_at_id"
+    )
+    op.execute(
+        "ALTER INDEX ix_stock_movements_inventory_created_at "
+        "RENAME TO ix_stock_movements_unpartitioned_inventory_created_at"
+    )
+    op.execute(
+        "UPDATE stock_movements_unpartitioned SET created_at = now() WHERE created_at IS NULL"
+    )
+
+    # La clave de partición tiene que formar parte de la PK
+    op.execute(
+        """
+        CREATE TABLE stock_movements (
+            LIKE stock_movements_unpartitioned INCLUDING DEFAULTS,
+            PRIMARY KEY (id, created_at),
+            FOREIGN KEY (inventory_id) REFERENCES inventories (id) ON DELETE CASCADE
+        ) PARTITION BY RANGE (created_at)
+        """
+    )
+    op.execute("ALTER TABLE stock_movements ALTER COLUMN created_at SET NOT NULL")
+    op.execute(
+        f"""
+        DO $$
+        DECLARE
+            month timestamptz;
+            last_month timestamptz := date_trunc('month', now()) + interval '{MONTHS_AHEAD} months';
+        BEGIN
+            SELECT date_trunc('month', coalesce(min(created_at), now())) INTO month
+            FROM stock_movements_unpartitioned;
+            WHILE month <= last_month LOOP
+                EXECUTE format(
+                    'CREATE TABLE %I PARTITION OF stock_movements FOR VALUES FROM (%L) TO (%L)',
+                    'stock_movements_p' || to_char(month, 'YYYYMM'),
+                    month,
+                    month + interval '1 month'
+                );
+                month := month + interval '1 month';
+            END LOOP;
+        END $$
+        """
+    )
+    op.execute("INSERT INTO stock_movements SELECT * FROM stock_movements_unpartitioned")
+    op.execute("DROP TABLE stock_movements_unpartitioned")
+    op.create_index("ix_stock_movements_created_at_id", "stock_movements", ["created_at", "id"])
+    op.create_index(
+        "ix_stock_movements_inventory_created_at", "stock_movements", ["inventory_id", "created_at"]
+    )
+
+    op.create_table(
+        "stock_ledger_baselines",
+        sa.Column(
+            "inventory_id",
+            postgresql.UUID(as_uuid=True),
+            sa.ForeignKey("inventories.id", ondelete="CASCADE"),
+            primary_key=True,
+        ),
+        sa.Column("quantity_change", sa.Integer(), nullable=False, server_default="0"),
+        sa.Column("reserved_change", sa.Integer(), nullable=False, server_default="0"),
+        sa.Column("movement_count", sa.Integer(), nullable=False, server_default="0"),
+        sa.Column("through", sa.DateTime(timezone=True), nullable=False),
+    )
+
+
+def downgrade() -> None:
+    op.drop_table("stock_ledger_baselines")
+    op.execute("ALTER TABLE stock_movements RENAME TO stock_movements_partitioned")
+    op.execute(
+        "ALTER INDEX ix_stock_movements_created_at_id "
+        "RENAME TO ix_stock_movements_partitioned_created_at_id"
+    )
+    op.execute(
+        "ALTER INDEX ix_stock_movements_inventory_created_at "
+        "RENAME TO ix_stock_movements_partitioned_inventory_created_at"
+    )
+    op.execute(
+        """
+        CREATE TABLE stock_movements (
+            LIKE stock_movements_partitioned INCLUDING DEFAULTS,
+            PRIMARY KEY (id),
+            FOREIGN KEY (inventory_id) REFERENCES inventories (id) ON DELETE CASCADE
+        )
+        """
+    )
+    # Vuelven solo las particiones adjuntas; las desacopladas quedan como tablas sueltas
+    op.execute("INSERT INTO stock_movements SELECT * FROM stock_movements_partitioned")
+    op.execute("DROP TABLE stock_movements_partitioned")
+    op.create_index("ix_stock_movements_created_at_id", "stock_movements", ["created_at", "id"])
+    op.create_index(
+        "ix_stock_movements_inventory_created_at", "stock_movements", ["inventory_id", "created_at"]
+    )
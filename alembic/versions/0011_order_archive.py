@@ -0,0 +1,42 @@
+"""Archive tables for closed orders
+
+Revision ID: 0011_order_archive
+Revises: 0010_partition_stock_movements
+Create Date: 2026-10-19 00:00:00.000000
+"""
+
+from alembic import op
+
+
+revision = "0011_order_archive"
+down_revision = "0010_partition_stock_movements"
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    # LIKE copia columnas, tipos y defaults pero no FKs: el archivo no bloquea borrados
+    op.execute(
+        "CREATE TABLE orders_archive (LIKE orders INCLUDING DEFAULTS, "
+        "archived_at timestamptz DEFAULT now(), PRIMARY KEY (id))"
+    )
+    op.execute(
+        "CREATE TABLE order_items_archive (LIKE order_items INCLUDING DEFAULTS, PRIMARY KEY (id))"
+    )
+    op.execute(
+        "CREATE TABLE order_returns_archive "
+        "(LIKE order_returns INCLUDING DEFAULTS, PRIMARY KEY (id))"
+    )
+    op.create_index("ix_orders_archive_user_created", "orders_archive", ["user_id", "created_at"])
+    op.create_index("ix_orders_archive_created_at", "orders_archive", ["created_at"])
+    op.create_index("ix_order_items_archive_order", "order_items_archive", ["order_id"])
+    op.create_index("ix_order_returns_archive_order", "order_returns_archive", ["order_id"])
+    # El job de archivo busca pedidos cerrados por antigüedad
+    op.create_index("ix_orders_status_updated_at", "orders", ["status", "updated_at"])
+
+
+def downgrade() -> None:
+    op.drop_index("ix_orders_status_updated_at", table_name="orders")
+    op.drop_table("order_returns_archive")
+    op.drop_table("order_items_archive")
+    op.drop_table("orders_archive")
@@ -0,0 +1,75 @@
+"""Store money amounts as integer cents
+
+Revision ID: 0012_money_cents
+Revises: 0011_order_archive
+Create Date: 2026-10-19 00:00:00.000000
+"""
+
+from alembic import op
+
+
+revision = "0012_money_cents"
+down_revision = "0011_order_archive"
+branch_labels = None
+depends_on = None
+
+# (tabla, columna, default, NUMERIC original); los coeficientes
+# (deposit_ratio, percentage, tax_rate) siguen en NUMERIC
+ORDER_TOTALS = (
+    "subtotal",
+    "logistics_cost",
+    "guarantee_amount",
+    "total",
+    "reservation_required",
+    "outstanding_balance",
+)
+MONEY_COLUMNS = [
+    ("products", "base_price", None, "NUMERIC(10, 2)"),
+    ("product_variants", "price_override", None, "NUMERIC(10, 2)"),
+    ("cart_items", "price_per_day", None, "NUMERIC(10, 2)"),
+    ("logistics_config", "base_fee", "0", "NUMERIC(10, 2)"),
+    ("logistics_config", "hourly_vehicle_fee", "0", "NUMERIC(10, 2)"),
+    ("logistics_config", "default_tolls", "0", "NUMERIC(10, 2)"),
+    *(
+        (table, column, "0", "NUMERIC(12, 2)")
+        for table in ("orders", "orders_archive")
+        for column in ORDER_TOTALS
+    ),
+    *(
+        (table, "unit_price", None, "NUMERIC(10, 2)")
+        for table in ("order_items", "order_items_archive")
+    ),
+    *(
+        (table, "total_price", None, "NUMERIC(12, 2)")
+        for table in ("order_items", "order_items_archive")
+    ),
+    *(
+        (table, column, "0", "NUMERIC(10, 2)")
+        for table in ("order_returns", "order_returns_archive")
+        for column in ("breakage_cost", "missing_cost")
+    ),
+]
+
+
+def _convert(to_cents: bool) -> None:
+    for table, column, default, numeric in MONEY_COLUMNS:
+        if to_cents:
+            # round() de NUMERIC redondea medio centavo hacia arriba; con escala 2 no hay
+            # fracciones que redondear
+            change = f"TYPE BIGINT USING round({column} * 100)::bigint"
+        else:
+            change = f"TYPE {numeric} USING {column}::numeric / 100"
+        # El default no se castea solo al cambiar el tipo: se saca y se vuelve a poner
+        clauses = [f"ALTER COLUMN {column} DROP DEFAULT"] if default is not None else []
+        clauses.append(f"ALTER COLUMN {column} {change}")
+        if default is not None:
+            clauses.append(f"ALTER COLUMN {column} SET DEFAULT {default}")
+        op.execute(f"ALTER TABLE {table} {', '.join(clauses)}")
+
+
+def upgrade() -> None:
+    _convert(to_cents=True)
+
+
+def downgrade() -> None:
+    _convert(to_cents=False)
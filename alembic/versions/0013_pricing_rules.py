@@ -0,0 +1,54 @@
+"""Declarative pricing rules
+
+Revision ID: 0013_pricing_rules
+Revises: 0012_money_cents
+Create Date: 2026-10-19 00:00:00.000000
+"""
+
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+
+revision = "0013_pricing_rules"
+down_revision = "0012_money_cents"
+branch_labels = None
+depends_on = None
+
+pricing_rule_kind = sa.Enum(
+    "volume_discount",
+    "category_multiplier",
+    "season_multiplier",
+    "duration_curve",
+    name="pricingrulekind",
+)
+
+
+def upgrade() -> None:
+    op.create_table(
+        "pricing_rules",
+        sa.Column("id", postgresql.UUID(as_uuid=True), primary_key=True),
+        sa.Column("kind", pricing_rule_kind, nullable=False),
+        sa.Column("multiplier", sa.Numeric(6, 4), nullable=False),
+        sa.Column("threshold", sa.Integer()),
+        sa.Column(
+            "category_id",
+            postgresql.UUID(as_uuid=True),
+            sa.ForeignKey("categories.id", ondelete="CASCADE"),
+        ),
+        sa.Column(
+            "season_id",
+            postgresql.UUID(as_uuid=True),
+            sa.ForeignKey("seasons.id", ondelete="CASCADE"),
+        ),
+        sa.Column("active", sa.Boolean(), nullable=False, server_default=sa.true()),
+        sa.Column("notes", sa.String(length=255)),
+        sa.Column("created_at", sa.DateTime(timezone=True), server_default=sa.func.now()),
+    )
+    op.create_index("ix_pricing_rules_active", "pricing_rules", ["active"])
+
+
+def downgrade() -> None:
+    op.drop_index("ix_pricing_rules_active", table_name="pricing_rules")
+    op.drop_table("pricing_rules")
+    sa.Enum(name="pricingrulekind").drop(op.get_bind(), checkfirst=True)
@@ -0,0 +1,88 @@
+"""Append-only configuration versions
+
+Revision ID: 0014_config_versions
+Revises: 0013_pricing_rules
+Create Date: 2026-10-19 00:00:00.000000
+"""
+
+import uuid
+
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+
+revision = "0014_config_versions"
+down_revision = "0013_pricing_rules"
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.create_table(
+        "config_versions",
+        sa.Column("id", postgresql.UUID(as_uuid=True), primary_key=True),
+        sa.Column(
+            "logistics_id",
+            postgresql.UUID(as_uuid=True),
+            sa.ForeignKey("logistics_config.id"),
+            nullable=False,
+        ),
+        sa.Column(
+            "guarantee_id",
+            postgresql.UUID(as_uuid=True),
+            sa.ForeignKey("guarantee_config.id"),
+            nullable=False,
+        ),
+        sa.Column("effective_from", sa.DateTime(timezone=True), server_default=sa.func.now()),
+        sa.Column("is_current", sa.Boolean(), nullable=False, server_default=sa.false()),
+    )
+    op.create_index("ix_config_versions_effective_from", "config_versions", ["effective_from"])
+    op.create_index(
+        "ix_config_versions_current",
+        "config_versions",
+        ["is_current"],
+        unique=True,
+        postgresql_where=sa.text("is_current"),
+    )
+
+    # La fila más reciente de cada tabla pasa a ser la versión vigente; el historial
+    # anterior se perdió al sobrescribir
+    conn = op.get_bind()
+    logistics = conn.execute(
+        sa.text("SELECT id, updated_at FROM logistics_config ORDER BY updated_at DESC LIMIT 1")
+    ).first()
+    guarantee = conn.execute(
+        sa.text("SELECT id, updated_at FROM guarantee_config ORDER BY updated_at DESC LIMIT 1")
+    ).first()
+    if logistics and guarantee:
+        conn.execute(
+            sa.text(
+                "INSERT INTO config_versions "
+                "(id, logistics_id, guarantee_id, effective_from, is_current) "
+                "VALUES (:id, :logistics_id, :guarantee_id, :effective_from, true)"
+            ),
+            {
+                "id": uuid.uuid4(),
+                "logistics_id": logistics.id,
+                "guarantee_id": guarantee.id,
+                "effective_from": max(logistics.updated_at, guarantee.updated_at),
+            },
+        )
+
+    # Pedidos existentes quedan sin versión: no se sabe con qué configuración se cotizaron
+    op.add_column(
+        "orders",
+        sa.Column(
+            "config_version_id", postgresql.UUID(as_uuid=True), sa.ForeignKey("config_versions.id")
+        ),
+    )
+    op.add_column("orders_archive", sa.Column("config_version_id", postgresql.UUID(as_uuid=True)))
+
+
+def downgrade() -> None:
+    op.drop_column("orders_archive", "config_version_id")
+    op.drop_column("orders", "config_version_id")
+    op.drop_index("ix_config_versions_current", table_name="config_versions")
+    op.drop_index("ix_config_versions_effective_from", table_name="config_versions")
+    op.drop_table("config_versions")
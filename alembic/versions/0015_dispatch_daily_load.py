@@ -0,0 +1,71 @@
+"""Daily dispatch load rollup
+
+Revision ID: 0015_dispatch_daily_load
+Revises: 0014_config_versions
+Create Date: 2026-10-19 00:00:00.000000
+"""
+
+from alembic import op
+import sqlalchemy as sa
+
+
+revision = "0015_dispatch_daily_load"
+down_revision = "0014_config_versions"
+branch_labels = None
+depends_on = None
+
+dispatch_leg = sa.Enum("delivery", "pickup", name="dispatchleg")
+
+# Mismo criterio que DISPATCH_STATUSES en app/services/dispatch.py
+BACKFILL = """
+INSERT INTO dispatch_daily_load (day, leg, "window", orders, vehicle_hours, items, boxes)
+SELECT day, leg, "window", count(*), sum(logistics_hours), sum(items), sum(boxes)
+FROM (
+    SELECT o.id, o.logistics_hours, {day} AS day, CAST('{leg}' AS dispatchleg) AS leg,
+           coalesce({window}, '') AS "window",
+           coalesce(sum(i.quantity), 0) AS items,
+           coalesce(
+               sum((i.quantity + coalesce(i.units_per_box, 1) - 1) / coalesce(i.units_per_box, 1)),
+               0
+           ) AS boxes
+    FROM {orders} o LEFT JOIN {items} i ON i.order_id = o.id
+    WHERE o.delivery_type = 'delivery'
+      AND o.status IN (
+          'pending_reservation', 'reservation_confirmed', 'ready_for_delivery',
+          'delivered', 'returned'
+      )
+      AND {day} IS NOT NULL
+    GROUP BY o.id
+) per_order
+GROUP BY day, leg, "window"
+ON CONFLICT (day, leg, "window") DO UPDATE SET
+    orders = dispatch_daily_load.orders + excluded.orders,
+    vehicle_hours = dispatch_daily_load.vehicle_hours + excluded.vehicle_hours,
+    items = dispatch_daily_load.items + excluded.items,
+    boxes = dispatch_daily_load.boxes + excluded.boxes
+"""
+
+
+def upgrade() -> None:
+    op.create_table(
+        "dispatch_daily_load",
+        sa.Column("day", sa.Date(), primary_key=True),
+        sa.Column("leg", dispatch_leg, primary_key=True),
+        sa.Column("window", sa.String(length=100), primary_key=True, server_default=""),
+        sa.Column("orders", sa.Integer(), nullable=False, server_default="0"),
+        sa.Column("vehicle_hours", sa.Integer(), nullable=False, server_default="0"),
+        sa.Column("items", sa.Integer(), nullable=False, server_default="0"),
+        sa.Column("boxes", sa.Integer(), nullable=False, server_default="0"),
+    )
+    # Carga inicial desde pedidos activos y archivados; después la mantienen los cambios de estado
+    for orders, items in (("orders", "order_items"), ("orders_archive", "order_items_archive")):
+        for leg, day, window in (
+            ("delivery", "o.event_start", "o.delivery_window"),
+            ("pickup", "o.event_end", "o.return_window"),
+        ):
+            op.execute(BACKFILL.format(orders=orders, items=items, leg=leg, day=day, window=window))
+
+
+def downgrade() -> None:
+    op.drop_table("dispatch_daily_load")
+    sa.Enum(name="dispatchleg").drop(op.get_bind(), checkfirst=True)
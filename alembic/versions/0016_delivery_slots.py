@@ -0,0 +1,64 @@
+"""Delivery slots with per-day capacity
+
+Revision ID: 0016_delivery_slots
+Revises: 0015_dispatch_daily_load
+Create Date: 2026-10-19 00:00:00.000000
+"""
+
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+
+revision = "0016_delivery_slots"
+down_revision = "0015_dispatch_daily_load"
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.create_table(
+        "delivery_slots",
+        sa.Column("id", postgresql.UUID(as_uuid=True), primary_key=True),
+        sa.Column("label", sa.String(length=100), nullable=False),
+        sa.Column("weekday", sa.Integer()),
+        sa.Column("capacity", sa.Integer(), nullable=False),
+        sa.Column("active", sa.Boolean(), nullable=False, server_default=sa.true()),
+        sa.Column("created_at", sa.DateTime(timezone=True), server_default=sa.func.now()),
+    )
+    op.create_index("ix_delivery_slots_active", "delivery_slots", ["active"])
+    op.create_table(
+        "delivery_slot_days",
+        sa.Column(
+            "slot_id",
+            postgresql.UUID(as_uuid=True),
+            sa.ForeignKey("delivery_slots.id", ondelete="CASCADE"),
+            primary_key=True,
+        ),
+        sa.Column("day", sa.Date(), primary_key=True),
+        sa.Column("capacity", sa.Integer(), nullable=False),
+        sa.Column("booked", sa.Integer(), nullable=False, server_default="0"),
+        sa.CheckConstraint(
+            "booked >= 0 AND booked <= capacity", name="ck_delivery_slot_days_booked"
+        ),
+    )
+    for table in ("orders", "orders_archive"):
+        # El archivo no lleva FKs (ver 0011)
+        foreign_key = (
+            (sa.ForeignKey("delivery_slots.id", ondelete="SET NULL"),) if table == "orders" else ()
+        )
+        op.add_column(
+            table, sa.Column("delivery_slot_id", postgresql.UUID(as_uuid=True), *foreign_key)
+        )
+        op.add_column(
+            table, sa.Column("return_slot_id", postgresql.UUID(as_uuid=True), *foreign_key)
+        )
+
+
+def downgrade() -> None:
+    for table in ("orders_archive", "orders"):
+        op.drop_column(table, "return_slot_id")
+        op.drop_column(table, "delivery_slot_id")
+    op.drop_table("delivery_slot_days")
+    op.drop_index("ix_delivery_slots_active", table_name="delivery_slots")
+    op.drop_table("delivery_slots")
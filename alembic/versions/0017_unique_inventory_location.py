@@ -0,0 +1,44 @@
+"""Unique inventory per (product, variant, warehouse)
+
+Revision ID: 0017_unique_inventory_location
+Revises: 0016_delivery_slots
+Create Date: 2026-10-19 00:00:00.000000
+"""
+
+from alembic import op
+import sqlalchemy as sa
+
+
+revision = "0017_unique_inventory_location"
+down_revision = "0016_delivery_slots"
+branch_labels = None
+depends_on = None
+
+NO_VARIANT_KEY = "coalesce(variant_id, '00000000-0000-0000-0000-000000000000'::uuid)"
+
+
+def upgrade() -> None:
+    # Los duplicados tienen movimientos, holds y snapshots propios: fusionarlos es una decisión
+    # de negocio, no de la migración
+    duplicates = op.get_bind().scalar(
+        sa.text(
+            "SELECT count(*) FROM ("
+            f"SELECT 1 FROM inventories GROUP BY product_id, {NO_VARIANT_KEY}, warehouse_id "
+            "HAVING count(*) > 1) AS d"
+        )
+    )
+    if duplicates:
+        raise RuntimeError(
+            f"{duplicates} (product, variant, warehouse) locations have more than one inventory; "
+            "merge them before upgrading"
+        )
+    op.create_index(
+        "uq_inventories_stock_location",
+        "inventories",
+        ["product_id", sa.text(NO_VARIANT_KEY), "warehouse_id"],
+        unique=True,
+    )
+
+
+def downgrade() -> None:
+    op.drop_index("uq_inventories_stock_location", table_name="inventories")
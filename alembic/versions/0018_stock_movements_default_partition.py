@@ -0,0 +1,31 @@
+"""DEFAULT partition for stock_movements
+
+Revision ID: 0018_stock_movements_default_partition
+Revises: 0017_unique_inventory_location
+Create Date: 2026-10-19 00:00:00.000000
+"""
+
+from alembic import op
+import sqlalchemy as sa
+
+
+revision = "0018_stock_movements_default_partition"
+down_revision = "0017_unique_inventory_location"
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    # Si el job de particiones deja de correr, los inserts caen acá en vez de fallar;
+    # ensure_movement_partitions mueve después esas filas a su partición mensual
+    op.execute("CREATE TABLE stock_movements_default PARTITION OF stock_movements DEFAULT")
+
+
+def downgrade() -> None:
+    pending = op.get_bind().scalar(sa.text("SELECT count(*) FROM stock_movements_default"))
+    if pending:
+        raise RuntimeError(
+            f"stock_movements_default still has {pending} rows; "
+            "run app/jobs/stock_partitions.py before downgrading"
+        )
+    op.execute("DROP TABLE stock_movements_default")
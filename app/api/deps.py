@@ -5,11 +5,11 @@ from uuid import UUID
 import jwt
 from fastapi import Depends, Header, HTTPException, status
 from fastapi.security import OAuth2PasswordBearer
-from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker
 from sqlalchemy import select
 
 from app.core.security import decode_token
-from app.db.session import get_session
+from app.db.session import AsyncSessionLocal, get_session
 from app.models.user import User, UserRole
 
 oauth2_scheme = OAuth2PasswordBearer(tokenUrl="/auth/login")
@@ -20,6 +20,11 @@ async def get_db() -> AsyncSession:
         yield session
 
 
+def get_session_factory() -> async_sessionmaker:
+    """Fábrica de sesiones para servicios que abren varias en paralelo (reconciliación)."""
+    return AsyncSessionLocal
+
+
 async def get_current_user(
     token: Annotated[str, Depends(oauth2_scheme)], db: Annotated[AsyncSession, Depends(get_db)]
 ) -> User:
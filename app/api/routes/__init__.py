@@ -1,6 +1,6 @@
 from fastapi import APIRouter
 
-from app.api.routes import auth, cart, catalog, config, orders, stock, users
+from app.api.routes import auth, cart, catalog, config, delivery, orders, realtime, stock, users
 
 api_router = APIRouter()
 api_router.include_router(auth.router)
@@ -8,5 +8,7 @@ api_router.include_router(users.router)
 api_router.include_router(catalog.router)
 api_router.include_router(cart.router)
 api_router.include_router(orders.router)
+api_router.include_router(delivery.router)
 api_router.include_router(stock.router)
 api_router.include_router(config.router)
+api_router.include_router(realtime.router)
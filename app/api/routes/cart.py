@@ -5,10 +5,22 @@ from sqlalchemy.orm import selectinload
 from sqlalchemy.ext.asyncio import AsyncSession
 
 from app.api.deps import get_current_user, get_db, get_optional_user, get_session_token
-from app.models.cart import Cart, CartItem
+from app.core.config import get_settings
+from app.models.cart import Cart
 from app.models.user import User
-from app.schemas.cart import CartCreate, CartItemCreate, CartItemOut, CartItemUpdate, CartOut, CartUpdate
+from app.schemas.cart import (
+    CartCreate,
+    CartItemCreate,
+    CartItemUpdate,
+    CartOut,
+    CartQuoteOut,
+    CartUpdate,
+)
 from app.services import cart as cart_service
+from app.services.config import get_pricing_config
+from app.services.holds import refresh_holds, release_holds
+from app.services.order import quote_cart
+from app.services.stock import InsufficientStockError
 
 router = APIRouter(prefix="/cart", tags=["cart"])
 
@@ -58,9 +70,24 @@ async def get_cart(
     user: User | None = Depends(get_optional_user),
 ):
     cart = await _resolve_cart(db, session_token, user)
+    settings = get_settings()
+    if settings.cart_hold_minutes and cart.items:
+        await refresh_holds(db, cart.id, settings.cart_hold_minutes)
+        await db.commit()
     return CartOut.model_validate(cart)
 
 
+@router.get("/quote", response_model=CartQuoteOut)
+async def get_cart_quote(
+    db: AsyncSession = Depends(get_db),
+    session_token: str | None = Depends(get_session_token),
+    user: User | None = Depends(get_optional_user),
+):
+    cart = await _resolve_cart(db, session_token, user)
+    # Recotizar el mismo carrito (ir y volver con las fechas, reintentos) sale del memo
+    return CartQuoteOut.model_validate(quote_cart(cart, await get_pricing_config(db)))
+
+
 @router.post("", response_model=CartOut, status_code=status.HTTP_201_CREATED)
 async def create_cart(payload: CartCreate, db: AsyncSession = Depends(get_db), user: User | None = Depends(get_optional_user)):
     existing = await cart_service.get_cart_by_session(db, payload.session_token)
@@ -84,7 +111,15 @@ async def add_item(
     user: User | None = Depends(get_optional_user),
 ):
     cart = await _resolve_cart(db, session_token, user)
-    cart = await cart_service.add_item(db, cart, payload)
+    settings = get_settings()
+    try:
+        cart = await cart_service.add_item(
+            db, cart, payload, settings.cart_hold_minutes, settings.preferred_warehouse_id
+        )
+    except InsufficientStockError as exc:
+        raise HTTPException(status_code=status.HTTP_409_CONFLICT, detail=str(exc)) from exc
+    except ValueError as exc:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(exc)) from exc
     refreshed = await _resolve_cart(db, session_token, user)
     return CartOut.model_validate(refreshed)
 
@@ -101,7 +136,18 @@ async def update_item(
     item = next((i for i in cart.items if i.id == item_id), None)
     if not item:
         raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Item not found in cart")
-    await cart_service.update_item(db, item, payload.quantity, payload.days)
+    settings = get_settings()
+    try:
+        await cart_service.update_item(
+            db,
+            item,
+            payload.quantity,
+            payload.days,
+            settings.cart_hold_minutes,
+            settings.preferred_warehouse_id,
+        )
+    except InsufficientStockError as exc:
+        raise HTTPException(status_code=status.HTTP_409_CONFLICT, detail=str(exc)) from exc
     refreshed = await _resolve_cart(db, session_token, user)
     return CartOut.model_validate(refreshed)
 
@@ -117,6 +163,7 @@ async def delete_item(
     item = next((i for i in cart.items if i.id == item_id), None)
     if not item:
         raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Item not found")
+    await release_holds(db, cart_item_id=item.id)
     await db.delete(item)
     await db.commit()
     refreshed = await _resolve_cart(db, session_token, user)
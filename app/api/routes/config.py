@@ -3,65 +3,117 @@ from fastapi import APIRouter, Depends, HTTPException, status
 from sqlalchemy.ext.asyncio import AsyncSession
 
 from app.api.deps import get_db, get_operator_or_admin
-from app.models.config import GuaranteeConfig, LogisticsConfig, Season
+from app.models.config import PricingRule, Season
 from app.schemas.config import (
+    ConfigVersionOut,
     GuaranteeConfigCreate,
     GuaranteeConfigOut,
     LogisticsConfigCreate,
     LogisticsConfigOut,
+    PricingRuleCreate,
+    PricingRuleOut,
+    QuoteCacheStats,
     SeasonCreate,
     SeasonOut,
 )
 from app.services import config as config_service
+from app.services.quote_cache import quote_memo
 
 router = APIRouter(prefix="/config", tags=["config"])
 
 
 @router.get("/logistics", response_model=LogisticsConfigOut)
 async def get_logistics(db: AsyncSession = Depends(get_db)):
-    config = await config_service.get_logistics(db)
-    return LogisticsConfigOut.model_validate(config)
+    config = await config_service.get_pricing_config(db)
+    return LogisticsConfigOut.model_validate(config.logistics)
 
 
 @router.put("/logistics", response_model=LogisticsConfigOut)
 async def update_logistics(payload: LogisticsConfigCreate, db: AsyncSession = Depends(get_db), user=Depends(get_operator_or_admin)):
-    config = await config_service.get_logistics(db)
-    config.base_fee = payload.base_fee
-    config.hourly_vehicle_fee = payload.hourly_vehicle_fee
-    config.default_tolls = payload.default_tolls
-    config.notes = payload.notes
-    await db.commit()
-    await db.refresh(config)
+    config = await config_service.set_logistics(
+        db, payload.base_fee, payload.hourly_vehicle_fee, payload.default_tolls, payload.notes
+    )
     return LogisticsConfigOut.model_validate(config)
 
 
 @router.get("/seasons", response_model=list[SeasonOut])
 async def get_seasons(db: AsyncSession = Depends(get_db)):
-    seasons = await config_service.list_seasons(db)
-    return [SeasonOut.model_validate(s) for s in seasons]
+    config = await config_service.get_pricing_config(db)
+    return [SeasonOut.model_validate(s) for s in config.seasons]
 
 
 @router.post("/seasons", response_model=SeasonOut, status_code=status.HTTP_201_CREATED)
 async def create_season(payload: SeasonCreate, db: AsyncSession = Depends(get_db), user=Depends(get_operator_or_admin)):
-    season = Season(**payload.model_dump())
-    db.add(season)
-    await db.commit()
-    await db.refresh(season)
+    season = await config_service.create_season(db, Season(**payload.model_dump()))
     return SeasonOut.model_validate(season)
 
 
 @router.get("/guarantee", response_model=GuaranteeConfigOut)
 async def get_guarantee(db: AsyncSession = Depends(get_db)):
-    config = await config_service.get_guarantee(db)
-    return GuaranteeConfigOut.model_validate(config)
+    config = await config_service.get_pricing_config(db)
+    return GuaranteeConfigOut.model_validate(config.guarantee)
 
 
 @router.put("/guarantee", response_model=GuaranteeConfigOut)
 async def update_guarantee(payload: GuaranteeConfigCreate, db: AsyncSession = Depends(get_db), user=Depends(get_operator_or_admin)):
-    config = await config_service.get_guarantee(db)
-    config.percentage = payload.percentage
-    config.apply_tax = payload.apply_tax
-    config.tax_rate = payload.tax_rate
-    await db.commit()
-    await db.refresh(config)
+    config = await config_service.set_guarantee(
+        db, payload.percentage, payload.apply_tax, payload.tax_rate
+    )
     return GuaranteeConfigOut.model_validate(config)
+
+
+@router.get("/versions", response_model=list[ConfigVersionOut])
+async def list_config_versions(
+    limit: int = 100, db: AsyncSession = Depends(get_db), user=Depends(get_operator_or_admin)
+):
+    return [
+        ConfigVersionOut.model_validate(v)
+        for v in await config_service.list_config_versions(db, limit)
+    ]
+
+
+@router.get("/versions/{version_id}", response_model=ConfigVersionOut)
+async def get_config_version(
+    version_id: uuid.UUID, db: AsyncSession = Depends(get_db), user=Depends(get_operator_or_admin)
+):
+    version = await config_service.get_config_version(db, version_id)
+    if not version:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND, detail="Config version not found"
+        )
+    return ConfigVersionOut.model_validate(version)
+
+
+@router.get("/quote-cache", response_model=QuoteCacheStats)
+async def get_quote_cache_stats(user=Depends(get_operator_or_admin)):
+    return QuoteCacheStats(**quote_memo.stats())
+
+
+@router.get("/pricing-rules", response_model=list[PricingRuleOut])
+async def get_pricing_rules(db: AsyncSession = Depends(get_db)):
+    return [
+        PricingRuleOut.model_validate(rule) for rule in await config_service.list_pricing_rules(db)
+    ]
+
+
+@router.post("/pricing-rules", response_model=PricingRuleOut, status_code=status.HTTP_201_CREATED)
+async def create_pricing_rule(
+    payload: PricingRuleCreate,
+    db: AsyncSession = Depends(get_db),
+    user=Depends(get_operator_or_admin),
+):
+    try:
+        rule = await config_service.create_pricing_rule(db, PricingRule(**payload.model_dump()))
+    except ValueError as exc:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(exc)) from exc
+    return PricingRuleOut.model_validate(rule)
+
+
+@router.delete("/pricing-rules/{rule_id}", response_model=PricingRuleOut)
+async def deactivate_pricing_rule(
+    rule_id: uuid.UUID, db: AsyncSession = Depends(get_db), user=Depends(get_operator_or_admin)
+):
+    rule = await db.get(PricingRule, rule_id)
+    if not rule or not rule.active:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Pricing rule not found")
+    return PricingRuleOut.model_validate(await config_service.deactivate_pricing_rule(db, rule))
@@ -0,0 +1,45 @@
+import uuid
+from datetime import date
+
+from fastapi import APIRouter, Depends, HTTPException, status
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.api.deps import get_db, get_operator_or_admin
+from app.models.delivery import DeliverySlot
+from app.schemas.delivery import DeliverySlotCreate, DeliverySlotOut, SlotAvailability
+from app.services import slots as slot_service
+
+router = APIRouter(prefix="/delivery-slots", tags=["delivery"])
+
+
+@router.get("/", response_model=list[DeliverySlotOut])
+async def list_slots(db: AsyncSession = Depends(get_db)):
+    return [DeliverySlotOut.model_validate(slot) for slot in await slot_service.list_slots(db)]
+
+
+@router.post("/", response_model=DeliverySlotOut, status_code=status.HTTP_201_CREATED)
+async def create_slot(
+    payload: DeliverySlotCreate,
+    db: AsyncSession = Depends(get_db),
+    user=Depends(get_operator_or_admin),
+):
+    slot = await slot_service.create_slot(db, DeliverySlot(**payload.model_dump()))
+    return DeliverySlotOut.model_validate(slot)
+
+
+@router.get("/availability", response_model=list[SlotAvailability])
+async def get_availability(start: date, end: date, db: AsyncSession = Depends(get_db)):
+    try:
+        return await slot_service.available_slots(db, start, end)
+    except ValueError as exc:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(exc)) from exc
+
+
+@router.delete("/{slot_id}", response_model=DeliverySlotOut)
+async def deactivate_slot(
+    slot_id: uuid.UUID, db: AsyncSession = Depends(get_db), user=Depends(get_operator_or_admin)
+):
+    slot = await db.get(DeliverySlot, slot_id)
+    if not slot or not slot.active:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Delivery slot not found")
+    return DeliverySlotOut.model_validate(await slot_service.deactivate_slot(db, slot))
@@ -1,4 +1,6 @@
 import uuid
+from datetime import date
+from heapq import merge
 
 from fastapi import APIRouter, Depends, HTTPException, status
 from sqlalchemy import select
@@ -9,8 +11,26 @@ from app.api.deps import get_current_user, get_db, get_operator_or_admin
 from app.models.cart import Cart
 from app.models.order import Order, OrderItem, OrderStatus
 from app.models.user import User, UserRole
-from app.schemas.order import CheckoutRequest, OrderOut, OrderReturnCreate, OrderStatusUpdate
-from app.services.order import create_order_from_cart, register_return, reserve_stock, update_order_status
+from app.core.config import get_settings
+from app.schemas.order import (
+    AllocationPlan,
+    CheckoutRequest,
+    DispatchDay,
+    OrderOut,
+    OrderRequoteReport,
+    OrderReturnCreate,
+    OrderStatusUpdate,
+)
+from app.services import archive as archive_service
+from app.services.dispatch import dispatch_board
+from app.services.order import (
+    create_order_from_cart,
+    preview_allocation,
+    register_return,
+    reserve_stock,
+    update_order_status,
+)
+from app.services.quotes import requote_pending_orders
 
 router = APIRouter(prefix="/orders", tags=["orders"])
 
@@ -32,18 +52,54 @@ async def _get_order_or_404(db: AsyncSession, order_id: uuid.UUID) -> Order:
 
 
 @router.get("/", response_model=list[OrderOut])
-async def list_orders(db: AsyncSession = Depends(get_db), user: User = Depends(get_current_user)):
+async def list_orders(
+    include_archived: bool = False,
+    db: AsyncSession = Depends(get_db),
+    user: User = Depends(get_current_user),
+):
     query = select(Order).options(*_order_load_options())
     if user.role == UserRole.client:
         query = query.where(Order.user_id == user.id)
     result = await db.execute(query.order_by(Order.created_at.desc()))
     orders = result.scalars().unique().all()
+    if include_archived:
+        # Ambas listas ya vienen ordenadas por created_at desc
+        archived = await archive_service.list_archived_orders(
+            db, user.id if user.role == UserRole.client else None
+        )
+        orders = merge(orders, archived, key=lambda o: o.created_at, reverse=True)
     return [OrderOut.model_validate(o) for o in orders]
 
 
+@router.get("/dispatch", response_model=list[DispatchDay])
+async def get_dispatch_board(
+    start: date,
+    end: date,
+    db: AsyncSession = Depends(get_db),
+    user: User = Depends(get_operator_or_admin),
+):
+    if end < start:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST, detail="end must be on or after start"
+        )
+    return await dispatch_board(db, start, end)
+
+
 @router.get("/{order_id}", response_model=OrderOut)
-async def get_order(order_id: uuid.UUID, db: AsyncSession = Depends(get_db), user: User = Depends(get_current_user)):
-    order = await _get_order_or_404(db, order_id)
+async def get_order(
+    order_id: uuid.UUID,
+    include_archived: bool = False,
+    db: AsyncSession = Depends(get_db),
+    user: User = Depends(get_current_user),
+):
+    result = await db.execute(
+        select(Order).options(*_order_load_options()).where(Order.id == order_id)
+    )
+    order = result.scalars().first()
+    if order is None and include_archived:
+        order = await archive_service.get_archived_order(db, order_id)
+    if not order:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Order not found")
     if user.role == UserRole.client and order.user_id != user.id:
         raise HTTPException(status_code=status.HTTP_403_FORBIDDEN, detail="Not allowed")
     return OrderOut.model_validate(order)
@@ -64,11 +120,26 @@ async def checkout(payload: CheckoutRequest, db: AsyncSession = Depends(get_db),
         raise HTTPException(status_code=status.HTTP_403_FORBIDDEN, detail="Cart belongs to another user")
     if cart.user_id is None:
         cart.user_id = user.id
-    order = await create_order_from_cart(db, cart)
+    try:
+        order = await create_order_from_cart(
+            db, cart, payload.delivery_slot_id, payload.return_slot_id
+        )
+    except ValueError as exc:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(exc)) from exc
     order = await _get_order_or_404(db, order.id)
     return OrderOut.model_validate(order)
 
 
+@router.post("/requote", response_model=OrderRequoteReport)
+async def requote_orders(
+    dry_run: bool = True,
+    db: AsyncSession = Depends(get_db),
+    user: User = Depends(get_operator_or_admin),
+):
+    # Por defecto solo informa: aplicar requiere dry_run=false explícito
+    return await requote_pending_orders(db, dry_run=dry_run)
+
+
 @router.patch("/{order_id}/status", response_model=OrderOut)
 async def change_status(
     order_id: uuid.UUID,
@@ -85,11 +156,24 @@ async def change_status(
     return OrderOut.model_validate(updated)
 
 
+@router.get("/{order_id}/allocation", response_model=AllocationPlan)
+async def allocation_preview(
+    order_id: uuid.UUID,
+    preferred_warehouse_id: uuid.UUID | None = None,
+    db: AsyncSession = Depends(get_db),
+    user: User = Depends(get_operator_or_admin),
+):
+    order = await _get_order_or_404(db, order_id)
+    return await preview_allocation(
+        db, order, preferred_warehouse_id or get_settings().preferred_warehouse_id
+    )
+
+
 @router.post("/{order_id}/confirm-reservation", response_model=OrderOut)
 async def confirm_reservation(order_id: uuid.UUID, db: AsyncSession = Depends(get_db), user: User = Depends(get_operator_or_admin)):
     order = await _get_order_or_404(db, order_id)
     try:
-        await reserve_stock(db, order)
+        await reserve_stock(db, order, get_settings().preferred_warehouse_id)
     except ValueError as exc:
         raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(exc))
     try:
@@ -0,0 +1,84 @@
+import asyncio
+import uuid
+from typing import Optional
+
+import jwt
+from fastapi import APIRouter, WebSocket, WebSocketDisconnect
+from sqlalchemy import select
+
+from app.core.security import decode_token
+from app.db.session import AsyncSessionLocal
+from app.models.user import User, UserRole
+from app.services import realtime
+
+router = APIRouter(prefix="/realtime", tags=["realtime"])
+
+TOPICS = {"inventory", "orders"}
+# Códigos de cierre de aplicación (rango 4000-4999)
+CLOSE_UNAUTHORIZED = 4401
+CLOSE_FORBIDDEN = 4403
+CLOSE_SLOW_CONSUMER = 4408
+
+
+async def _authenticate(token: str) -> Optional[User]:
+    try:
+        payload = decode_token(token)
+        if payload.get("type") != "access":
+            return None
+        user_id = uuid.UUID(payload.get("sub"))
+    except (jwt.PyJWTError, ValueError, TypeError):
+        return None
+    # Sesión corta: no se retiene una conexión del pool mientras el socket siga abierto
+    async with AsyncSessionLocal() as db:
+        user = (await db.execute(select(User).where(User.id == user_id))).scalars().first()
+    return user if user and user.is_active else None
+
+
+@router.websocket("/ws")
+async def stream(
+    websocket: WebSocket,
+    token: str,
+    topics: str = "inventory,orders",
+    warehouse_id: Optional[uuid.UUID] = None,
+    product_id: Optional[uuid.UUID] = None,
+    order_id: Optional[uuid.UUID] = None,
+):
+    user = await _authenticate(token)
+    if user is None:
+        await websocket.close(code=CLOSE_UNAUTHORIZED)
+        return
+    requested = {topic.strip() for topic in topics.split(",") if topic.strip()} & TOPICS
+    filters = {"warehouse_id": warehouse_id, "product_id": product_id, "order_id": order_id}
+    if user.role not in {UserRole.admin, UserRole.operator}:
+        # Los clientes solo ven el estado de sus propios pedidos
+        requested &= {"orders"}
+        filters["user_id"] = user.id
+    if not requested:
+        await websocket.close(code=CLOSE_FORBIDDEN)
+        return
+    await websocket.accept()
+    subscription = realtime.hub.subscribe(requested, filters)
+    # Se escucha al cliente a la vez que la cola: el cierre se nota aunque el tópico esté quieto
+    receiver = asyncio.ensure_future(websocket.receive())
+    getter = asyncio.ensure_future(subscription.queue.get())
+    try:
+        while True:
+            done, _ = await asyncio.wait({receiver, getter}, return_when=asyncio.FIRST_COMPLETED)
+            if receiver in done:
+                # Lo que mande el cliente se ignora; solo interesa el cierre
+                if receiver.result()["type"] == "websocket.disconnect":
+                    return
+                receiver = asyncio.ensure_future(websocket.receive())
+            if getter in done:
+                if subscription.overflowed:
+                    # El cliente no da abasto: se corta para que recargue el estado por REST
+                    await websocket.close(code=CLOSE_SLOW_CONSUMER)
+                    return
+                await websocket.send_json(getter.result())
+                getter = asyncio.ensure_future(subscription.queue.get())
+    except WebSocketDisconnect:
+        pass
+    finally:
+        receiver.cancel()
+        getter.cancel()
+        realtime.hub.unsubscribe(subscription)
@@ -1,21 +1,48 @@
 import uuid
+from datetime import datetime
+from typing import Literal
 
-from fastapi import APIRouter, Depends, HTTPException, status
-from sqlalchemy import select
-from sqlalchemy.ext.asyncio import AsyncSession
+from fastapi import APIRouter, Depends, HTTPException, Query, Response, status
+from sqlalchemy import func, select
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker
 from sqlalchemy.orm import joinedload
 
-from app.api.deps import get_db, get_operator_or_admin
+from app.api.deps import get_db, get_operator_or_admin, get_session_factory
 from app.models.catalog import Product, ProductVariant
-from app.models.stock import Inventory, StockMovement, StockMovementReason, Warehouse
+from app.models.stock import (
+    Inventory,
+    StockMovement,
+    StockMovementReason,
+    StockThreshold,
+    Warehouse,
+)
 from app.schemas.stock import (
+    InventoryAsOfOut,
     InventoryOut,
+    ReconciliationReport,
+    SnapshotCompactionResult,
+    StockAlertOut,
+    StockMovementBulkCreate,
+    StockMovementBulkResult,
     StockMovementCreate,
     StockMovementOut,
     StockMovementWithMeta,
+    StockOverviewProduct,
+    StockThresholdCreate,
+    StockThresholdOut,
+    StockTransferBulkCreate,
+    StockTransferCreate,
+    StockTransferOut,
     WarehouseCreate,
     WarehouseOut,
 )
+from app.services import alerts as alert_service
+from app.services import snapshots as snapshot_service
+from app.services import stock as stock_service
+from app.services import transfers as transfer_service
+from app.services.reconciliation import reconcile_inventory
+from app.services.stock import BulkMovementError, InventoryNotFoundError
+from app.services.striping import fold_stripes, set_stripe_count, stripe_totals
 
 router = APIRouter(prefix="/stock", tags=["stock"])
 
@@ -35,10 +62,35 @@ async def list_warehouses(db: AsyncSession = Depends(get_db), user=Depends(get_o
     return [WarehouseOut.model_validate(w) for w in result.scalars().all()]
 
 
+def _inventory_totals():
+    totals = stripe_totals()
+    return select(
+        Inventory.id,
+        Inventory.product_id,
+        Inventory.variant_id,
+        Inventory.warehouse_id,
+        Inventory.stripe_count,
+        (Inventory.available + func.coalesce(totals.c.available, 0)).label("available"),
+        (Inventory.reserved + func.coalesce(totals.c.reserved, 0)).label("reserved"),
+    ).outerjoin(totals, totals.c.inventory_id == Inventory.id)
+
+
 @router.get("/", response_model=list[InventoryOut])
 async def list_inventory(db: AsyncSession = Depends(get_db), user=Depends(get_operator_or_admin)):
-    result = await db.execute(select(Inventory))
-    return [InventoryOut.model_validate(i) for i in result.scalars().all()]
+    result = await db.execute(_inventory_totals())
+    return [InventoryOut.model_validate(row) for row in result.all()]
+
+
+@router.get("/overview", response_model=list[StockOverviewProduct])
+async def stock_overview(
+    limit: int = Query(50, ge=1, le=200),
+    offset: int = Query(0, ge=0),
+    sort: Literal["scarcity", "name"] = "scarcity",
+    warehouse_id: uuid.UUID | None = None,
+    db: AsyncSession = Depends(get_db),
+    user=Depends(get_operator_or_admin),
+):
+    return await stock_service.stock_overview(db, limit, offset, sort, warehouse_id)
 
 
 @router.post("/inventories", response_model=InventoryOut, status_code=status.HTTP_201_CREATED)
@@ -59,54 +111,137 @@ async def create_inventory(
             raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Variant not found")
     inventory = Inventory(product_id=product_id, warehouse_id=warehouse_id, available=available, variant_id=variant_id)
     db.add(inventory)
+    if available:
+        await db.flush()
+        db.add(
+            StockMovement(
+                inventory_id=inventory.id,
+                quantity_change=available,
+                reason=StockMovementReason.adjustment,
+                reference="initial",
+            )
+        )
     await db.commit()
     await db.refresh(inventory)
     return InventoryOut.model_validate(inventory)
 
 
-@router.post("/movements", response_model=StockMovementOut, status_code=status.HTTP_201_CREATED)
-async def create_movement(payload: StockMovementCreate, db: AsyncSession = Depends(get_db), user=Depends(get_operator_or_admin)):
-    inventory = await db.get(Inventory, payload.inventory_id)
-    if not inventory:
-        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Inventory not found")
-    inventory.available += payload.quantity_change
-    movement = StockMovement(
-        inventory_id=payload.inventory_id,
-        quantity_change=payload.quantity_change,
-        reason=payload.reason,
-        reference=payload.reference,
-        amount=payload.amount,
-    )
-    db.add(movement)
+@router.put("/inventories/{inventory_id}/stripes", response_model=InventoryOut)
+async def update_stripes(
+    inventory_id: uuid.UUID,
+    stripe_count: int = Query(..., ge=0, description="0 disables striping"),
+    db: AsyncSession = Depends(get_db),
+    user=Depends(get_operator_or_admin),
+):
+    try:
+        await set_stripe_count(db, inventory_id, stripe_count)
+    except ValueError as exc:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(exc)) from exc
+    row = (await db.execute(_inventory_totals().where(Inventory.id == inventory_id))).first()
+    return InventoryOut.model_validate(row)
+
+
+@router.post("/stripes/fold")
+async def fold_inventory_stripes(
+    db: AsyncSession = Depends(get_db), user=Depends(get_operator_or_admin)
+):
+    folded = await fold_stripes(db)
     await db.commit()
-    await db.refresh(movement)
+    return {"folded": folded}
+
+
+@router.post("/movements", response_model=StockMovementOut, status_code=status.HTTP_201_CREATED)
+async def create_movement(
+    payload: StockMovementCreate,
+    prevent_negative: bool = Query(
+        False, description="Reject movements that would leave stock negative"
+    ),
+    db: AsyncSession = Depends(get_db),
+    user=Depends(get_operator_or_admin),
+):
+    try:
+        movement = await stock_service.create_movement(db, payload, prevent_negative)
+    except InventoryNotFoundError as exc:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail=str(exc)) from exc
+    except ValueError as exc:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(exc)) from exc
     return StockMovementOut.model_validate(movement)
 
 
+@router.post(
+    "/movements/bulk", response_model=StockMovementBulkResult, status_code=status.HTTP_201_CREATED
+)
+async def create_movements_bulk(
+    payload: StockMovementBulkCreate,
+    prevent_negative: bool = Query(
+        False, description="Reject the batch if any inventory would go negative"
+    ),
+    db: AsyncSession = Depends(get_db),
+    user=Depends(get_operator_or_admin),
+):
+    try:
+        deltas = await stock_service.create_movements_bulk(db, payload.movements, prevent_negative)
+    except BulkMovementError as exc:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=[e.model_dump(mode="json") for e in exc.errors],
+        ) from exc
+    return StockMovementBulkResult(created=len(payload.movements), inventories_updated=len(deltas))
+
+
+@router.post("/transfers", response_model=StockTransferOut, status_code=status.HTTP_201_CREATED)
+async def create_transfer(
+    payload: StockTransferCreate,
+    db: AsyncSession = Depends(get_db),
+    user=Depends(get_operator_or_admin),
+):
+    try:
+        results = await transfer_service.transfer_stock(db, [payload])
+    except BulkMovementError as exc:
+        detail = exc.errors[0].detail
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=detail) from exc
+    return results[0]
+
+
+@router.post(
+    "/transfers/bulk", response_model=list[StockTransferOut], status_code=status.HTTP_201_CREATED
+)
+async def create_transfers_bulk(
+    payload: StockTransferBulkCreate,
+    db: AsyncSession = Depends(get_db),
+    user=Depends(get_operator_or_admin),
+):
+    try:
+        return await transfer_service.transfer_stock(db, payload.transfers)
+    except BulkMovementError as exc:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=[e.model_dump(mode="json") for e in exc.errors],
+        ) from exc
+
+
 @router.get("/movements", response_model=list[StockMovementWithMeta])
-async def list_movements(db: AsyncSession = Depends(get_db), user=Depends(get_operator_or_admin)):
-    stmt = (
-        select(
-            StockMovement.id,
-            StockMovement.inventory_id,
-            StockMovement.quantity_change,
-            StockMovement.reason,
-            StockMovement.reference,
-            StockMovement.amount,
-            StockMovement.created_at,
-            Inventory.product_id,
-            Inventory.variant_id,
-            Inventory.warehouse_id,
-            Product.name.label("product_name"),
-            Warehouse.name.label("warehouse_name"),
+async def list_movements(
+    response: Response,
+    product_id: uuid.UUID | None = None,
+    warehouse_id: uuid.UUID | None = None,
+    reason: StockMovementReason | None = None,
+    reference: str | None = None,
+    created_from: datetime | None = None,
+    created_to: datetime | None = None,
+    cursor: str | None = Query(None, description="Value of X-Next-Cursor from the previous page"),
+    limit: int = Query(100, ge=1, le=500),
+    db: AsyncSession = Depends(get_db),
+    user=Depends(get_operator_or_admin),
+):
+    try:
+        rows, next_cursor = await stock_service.list_movements(
+            db, product_id, warehouse_id, reason, reference, created_from, created_to, cursor, limit
         )
-        .join(Inventory, StockMovement.inventory_id == Inventory.id)
-        .join(Product, Inventory.product_id == Product.id)
-        .join(Warehouse, Inventory.warehouse_id == Warehouse.id)
-        .order_by(StockMovement.created_at.desc())
-    )
-    result = await db.execute(stmt)
-    rows = result.all()
+    except ValueError as exc:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(exc)) from exc
+    if next_cursor:
+        response.headers["X-Next-Cursor"] = next_cursor
     return [
         StockMovementWithMeta(
             id=row.id,
@@ -124,3 +259,75 @@ async def list_movements(db: AsyncSession = Depends(get_db), user=Depends(get_op
         )
         for row in rows
     ]
+
+
+@router.get("/as-of", response_model=list[InventoryAsOfOut])
+async def stock_as_of(
+    at: datetime,
+    product_id: uuid.UUID | None = None,
+    warehouse_id: uuid.UUID | None = None,
+    db: AsyncSession = Depends(get_db),
+    user=Depends(get_operator_or_admin),
+):
+    rows = await snapshot_service.stock_as_of(db, at, product_id, warehouse_id)
+    return [InventoryAsOfOut.model_validate(row) for row in rows]
+
+
+@router.post(
+    "/snapshots", response_model=SnapshotCompactionResult, status_code=status.HTTP_201_CREATED
+)
+async def take_snapshots(db: AsyncSession = Depends(get_db), user=Depends(get_operator_or_admin)):
+    created = await snapshot_service.take_snapshots(db)
+    return SnapshotCompactionResult(created=created, pruned=0)
+
+
+@router.post("/snapshots/compact", response_model=SnapshotCompactionResult)
+async def compact_snapshots(
+    max_pending_movements: int = Query(500, ge=1),
+    keep_all_days: int = Query(90, ge=1),
+    db: AsyncSession = Depends(get_db),
+    user=Depends(get_operator_or_admin),
+):
+    result = await snapshot_service.compact_snapshots(db, max_pending_movements, keep_all_days)
+    return SnapshotCompactionResult(**result)
+
+
+@router.post("/reconcile", response_model=ReconciliationReport)
+async def reconcile(
+    repair: bool = Query(False, description="Write the ledger-derived counters back"),
+    warehouse_id: uuid.UUID | None = None,
+    session_factory: async_sessionmaker = Depends(get_session_factory),
+    user=Depends(get_operator_or_admin),
+):
+    return await reconcile_inventory(
+        session_factory, repair=repair, warehouse_ids=[warehouse_id] if warehouse_id else None
+    )
+
+
+@router.put("/thresholds", response_model=StockThresholdOut)
+async def set_threshold(
+    payload: StockThresholdCreate,
+    db: AsyncSession = Depends(get_db),
+    user=Depends(get_operator_or_admin),
+):
+    threshold = await alert_service.set_threshold(
+        db, payload.product_id, payload.warehouse_id, payload.min_available
+    )
+    return StockThresholdOut.model_validate(threshold)
+
+
+@router.get("/thresholds", response_model=list[StockThresholdOut])
+async def list_thresholds(db: AsyncSession = Depends(get_db), user=Depends(get_operator_or_admin)):
+    result = await db.execute(select(StockThreshold))
+    return [StockThresholdOut.model_validate(t) for t in result.scalars().all()]
+
+
+@router.get("/alerts", response_model=list[StockAlertOut])
+async def list_alerts(
+    since: datetime | None = Query(None, description="Only alerts created after this instant"),
+    limit: int = Query(100, ge=1, le=500),
+    db: AsyncSession = Depends(get_db),
+    user=Depends(get_operator_or_admin),
+):
+    alerts = await alert_service.list_alerts(db, since, limit)
+    return [StockAlertOut.model_validate(a) for a in alerts]
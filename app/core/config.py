@@ -1,3 +1,4 @@
+import uuid
 from functools import lru_cache
 from typing import List, Optional
 
@@ -26,6 +27,12 @@ class Settings(BaseSettings):
     client_email: str = Field("client@example.com", alias="CLIENT_EMAIL")
     client_password: str = Field("client", alias="CLIENT_PASSWORD")
 
+    preferred_warehouse_id: Optional[uuid.UUID] = Field(None, alias="PREFERRED_WAREHOUSE_ID")
+    cart_hold_minutes: int = Field(20, alias="CART_HOLD_MINUTES")
+    order_archive_days: int = Field(180, alias="ORDER_ARCHIVE_DAYS")
+    pending_reservation_hours: int = Field(72, alias="PENDING_RESERVATION_HOURS")
+    overdue_return_days: int = Field(2, alias="OVERDUE_RETURN_DAYS")
+
     @field_validator("allowed_origins", mode="before")
     @classmethod
     def split_origins(cls, v):
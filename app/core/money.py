@@ -0,0 +1,135 @@
+from decimal import ROUND_HALF_EVEN, ROUND_HALF_UP, Decimal
+from functools import total_ordering
+from typing import Any
+
+from pydantic_core import core_schema
+
+CENTS = 100
+
+
+def divide_rounded(value: int, divisor: int, rounding: str = ROUND_HALF_EVEN) -> int:
+    """value / divisor en enteros, con el mismo criterio que Decimal.quantize."""
+    if divisor < 0:
+        value, divisor = -value, -divisor
+    quotient, remainder = divmod(value, divisor)
+    twice = 2 * remainder
+    if twice > divisor:
+        return quotient + 1
+    if twice == divisor:
+        if rounding == ROUND_HALF_EVEN:
+            return quotient + quotient % 2
+        if rounding == ROUND_HALF_UP:
+            # Medio centavo se aleja del cero: -0.5 -> -1
+            return quotient + (1 if value >= 0 else 0)
+        raise ValueError(f"Unsupported rounding {rounding}")
+    return quotient
+
+
+@total_ordering
+class Money:
+    """Importe de punto fijo en centavos enteros.
+
+    Sumas, restas y productos por enteros son exactos; solo scale() y of() redondean, por defecto
+    a la par (ROUND_HALF_EVEN, como quantize con el contexto estándar). Se compara igual que el
+    Decimal equivalente, así que Money(60000) == Decimal("600.00").
+    """
+
+    __slots__ = ("cents",)
+
+    def __init__(self, cents: int = 0):
+        self.cents = cents
+
+    @classmethod
+    def of(cls, value: Any, rounding: str = ROUND_HALF_EVEN) -> "Money":
+        """Convierte Money, int, Decimal, str o float (unidades de moneda, no centavos)."""
+        if isinstance(value, Money):
+            return value
+        if isinstance(value, bool):
+            raise TypeError("bool is not an amount")
+        if isinstance(value, int):
+            return cls(value * CENTS)
+        if isinstance(value, float):
+            # repr del float, no su binario: 0.1 es 0.10 y no 0.1000000000000000055
+            value = repr(value)
+        numerator, denominator = Decimal(value).as_integer_ratio()
+        return cls(divide_rounded(numerator * CENTS, denominator, rounding))
+
+    def to_decimal(self) -> Decimal:
+        return Decimal(self.cents).scaleb(-2)
+
+    def scale(self, ratio: Any, rounding: str = ROUND_HALF_EVEN) -> "Money":
+        """Importe por un coeficiente (Decimal, str o int), redondeado una sola vez al centavo."""
+        numerator, denominator = Decimal(ratio).as_integer_ratio()
+        return Money(divide_rounded(self.cents * numerator, denominator, rounding))
+
+    def __add__(self, other: "Money") -> "Money":
+        if isinstance(other, Money):
+            return Money(self.cents + other.cents)
+        return NotImplemented
+
+    def __radd__(self, other: Any) -> "Money":
+        # sum() arranca en 0
+        if other == 0:
+            return self
+        return NotImplemented
+
+    def __sub__(self, other: "Money") -> "Money":
+        if isinstance(other, Money):
+            return Money(self.cents - other.cents)
+        return NotImplemented
+
+    def __neg__(self) -> "Money":
+        return Money(-self.cents)
+
+    def __mul__(self, factor: int) -> "Money":
+        if isinstance(factor, int) and not isinstance(factor, bool):
+            return Money(self.cents * factor)
+        return NotImplemented
+
+    __rmul__ = __mul__
+
+    def __bool__(self) -> bool:
+        return self.cents != 0
+
+    def __eq__(self, other: Any) -> bool:
+        if isinstance(other, Money):
+            return self.cents == other.cents
+        if isinstance(other, int) and not isinstance(other, bool):
+            return self.cents == other * CENTS
+        if isinstance(other, Decimal):
+            return self.to_decimal() == other
+        return NotImplemented
+
+    def __lt__(self, other: Any) -> bool:
+        if isinstance(other, Money):
+            return self.cents < other.cents
+        if isinstance(other, int) and not isinstance(other, bool):
+            return self.cents < other * CENTS
+        if isinstance(other, Decimal):
+            return self.to_decimal() < other
+        return NotImplemented
+
+    def __hash__(self) -> int:
+        return hash(self.to_decimal())
+
+    def __repr__(self) -> str:
+        return f"Money('{self}')"
+
+    def __str__(self) -> str:
+        # Sin pasar por Decimal: es lo que se usa al serializar listados
+        units, cents = divmod(abs(self.cents), CENTS)
+        return f"{'-' if self.cents < 0 else ''}{units}.{cents:02d}"
+
+    @classmethod
+    def __get_pydantic_core_schema__(cls, source: Any, handler: Any) -> core_schema.CoreSchema:
+        # En JSON se valida y publica como decimal ("600.00"): el contrato de la API no cambia
+        from_decimal = core_schema.no_info_after_validator_function(
+            cls.of, core_schema.decimal_schema()
+        )
+        return core_schema.json_or_python_schema(
+            json_schema=from_decimal,
+            python_schema=core_schema.union_schema(
+                [core_schema.is_instance_schema(cls), from_decimal]
+            ),
+            serialization=core_schema.to_string_ser_schema(when_used="json"),
+        )
@@ -10,6 +10,7 @@ from app.models import (  # noqa: E402,F401
     cart,
     catalog,
     config as config_models,
+    delivery,
     order,
     stock,
     user,
@@ -0,0 +1,17 @@
+import asyncio
+
+from app.core.config import get_settings
+from app.db.session import AsyncSessionLocal
+from app.services.archive import archive_closed_orders
+
+
+async def run() -> None:
+    # Diario, fuera de horario: saca de orders los pedidos cerrados viejos para que los
+    # listados operativos sigan livianos
+    async with AsyncSessionLocal() as session:
+        archived = await archive_closed_orders(session, get_settings().order_archive_days)
+    print({"archived": archived})
+
+
+if __name__ == "__main__":
+    asyncio.run(run())
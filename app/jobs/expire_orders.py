@@ -0,0 +1,25 @@
+import argparse
+import asyncio
+
+from app.core.config import get_settings
+from app.db.session import AsyncSessionLocal
+from app.services.expiry import EXPIRY_BATCH_SIZE, expire_orders
+
+
+async def run(batch_size: int = EXPIRY_BATCH_SIZE) -> None:
+    # Cada hora: se puede correr en varios workers a la vez (SKIP LOCKED)
+    settings = get_settings()
+    async with AsyncSessionLocal() as session:
+        counts = await expire_orders(
+            session, settings.pending_reservation_hours, settings.overdue_return_days, batch_size
+        )
+    print(counts)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(
+        description="Cancel stale pending reservations and report overdue returns"
+    )
+    parser.add_argument("--batch-size", type=int, default=EXPIRY_BATCH_SIZE)
+    args = parser.parse_args()
+    asyncio.run(run(args.batch_size))
@@ -0,0 +1,15 @@
+import asyncio
+
+from app.db.session import AsyncSessionLocal
+from app.services.striping import fold_stripes
+
+
+async def run() -> None:
+    # Cada pocos minutos: devuelve lo reservado a la fila principal y rebalancea los stripes
+    async with AsyncSessionLocal() as session:
+        await fold_stripes(session)
+        await session.commit()
+
+
+if __name__ == "__main__":
+    asyncio.run(run())
@@ -0,0 +1,23 @@
+import argparse
+import asyncio
+from datetime import date
+
+from app.db.session import AsyncSessionLocal
+from app.services.dispatch import rebuild_dispatch_load
+
+
+async def run(start: date, end: date) -> None:
+    # La tabla se mantiene sola; esto es para repararla si quedó desalineada con los pedidos
+    async with AsyncSessionLocal() as session:
+        rows = await rebuild_dispatch_load(session, start, end)
+    print({"start": start.isoformat(), "end": end.isoformat(), "rows": rows})
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(
+        description="Recompute the daily dispatch load from orders for a date range"
+    )
+    parser.add_argument("--start", type=date.fromisoformat, required=True)
+    parser.add_argument("--end", type=date.fromisoformat, required=True)
+    args = parser.parse_args()
+    asyncio.run(run(args.start, args.end))
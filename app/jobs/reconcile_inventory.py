@@ -0,0 +1,20 @@
+import argparse
+import asyncio
+
+from app.db.session import AsyncSessionLocal
+from app.services.reconciliation import reconcile_inventory
+
+
+async def run(repair: bool = False, concurrency: int = 4) -> None:
+    report = await reconcile_inventory(AsyncSessionLocal, repair=repair, concurrency=concurrency)
+    print(report.model_dump_json(exclude={"drift"}, indent=2))
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(
+        description="Recompute inventory counters from the stock ledger"
+    )
+    parser.add_argument("--repair", action="store_true", help="Write the expected counters back")
+    parser.add_argument("--concurrency", type=int, default=4)
+    args = parser.parse_args()
+    asyncio.run(run(args.repair, args.concurrency))
@@ -0,0 +1,14 @@
+import asyncio
+
+from app.db.session import AsyncSessionLocal
+from app.services.holds import release_expired_holds
+
+
+async def run() -> None:
+    # Cada minuto: devuelve al stock los holds de carritos abandonados
+    async with AsyncSessionLocal() as session:
+        await release_expired_holds(session)
+
+
+if __name__ == "__main__":
+    asyncio.run(run())
@@ -0,0 +1,36 @@
+import argparse
+import asyncio
+
+from app.db.session import AsyncSessionLocal
+from app.services.quotes import REQUOTE_BATCH_SIZE, requote_pending_orders
+
+
+async def run(apply: bool = False, batch_size: int = REQUOTE_BATCH_SIZE) -> None:
+    # Después de cambiar logística o garantía: primero sin --apply para revisar el diff
+    async with AsyncSessionLocal() as session:
+        report = await requote_pending_orders(session, dry_run=not apply, batch_size=batch_size)
+    for diff in report.orders:
+        print(
+            diff.code,
+            {change.field: f"{change.current} -> {change.proposed}" for change in diff.changes},
+        )
+    print(
+        {
+            "dry_run": report.dry_run,
+            "config_version": report.config_version,
+            "scanned": report.scanned,
+            "changed": report.changed,
+        }
+    )
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(
+        description="Re-price pending_reservation orders with the current pricing config"
+    )
+    parser.add_argument(
+        "--apply", action="store_true", help="Write the new totals instead of only reporting them"
+    )
+    parser.add_argument("--batch-size", type=int, default=REQUOTE_BATCH_SIZE)
+    args = parser.parse_args()
+    asyncio.run(run(args.apply, args.batch_size))
@@ -0,0 +1,29 @@
+import argparse
+import asyncio
+
+from app.db.session import AsyncSessionLocal
+from app.services.partitions import (
+    MONTHS_AHEAD,
+    RETAIN_MONTHS,
+    detach_movement_partitions,
+    ensure_movement_partitions,
+)
+
+
+async def run(months_ahead: int = MONTHS_AHEAD, retain_months: int = RETAIN_MONTHS) -> None:
+    # Pensado para cron diario: las particiones quedan creadas antes de que lleguen inserts y
+    # lo que haya caído en la partición DEFAULT vuelve a su mes
+    async with AsyncSessionLocal() as session:
+        created = await ensure_movement_partitions(session, months_ahead)
+        detached = await detach_movement_partitions(session, retain_months)
+    print({"created": created, "detached": detached})
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Maintain monthly stock_movements partitions")
+    parser.add_argument("--months-ahead", type=int, default=MONTHS_AHEAD)
+    parser.add_argument(
+        "--retain-months", type=int, default=RETAIN_MONTHS, help="Detach partitions older than this"
+    )
+    args = parser.parse_args()
+    asyncio.run(run(args.months_ahead, args.retain_months))
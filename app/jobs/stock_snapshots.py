@@ -0,0 +1,15 @@
+import asyncio
+
+from app.db.session import AsyncSessionLocal
+from app.services.snapshots import compact_snapshots, take_snapshots
+
+
+async def run() -> None:
+    # Pensado para cron diario: snapshot de todo lo que se movió y compactación del historial viejo
+    async with AsyncSessionLocal() as session:
+        await take_snapshots(session)
+        await compact_snapshots(session)
+
+
+if __name__ == "__main__":
+    asyncio.run(run())
@@ -4,7 +4,10 @@ from fastapi.middleware.cors import CORSMiddleware
 
 from app.api.routes import api_router
 from app.core.config import get_settings
+from app.db.session import AsyncSessionLocal
 from app.seed.seed_data import seed
+from app.services import realtime
+from app.services.partitions import ensure_movement_partitions
 
 settings = get_settings()
 
@@ -27,6 +30,24 @@ async def ensure_seed():
     await seed()
 
 
+@app.on_event("startup")
+async def ensure_partitions():
+    # Cada arranque deja creados el mes en curso y los siguientes aunque el cron no haya corrido
+    async with AsyncSessionLocal() as session:
+        await ensure_movement_partitions(session)
+
+
+@app.on_event("startup")
+async def start_realtime():
+    # Con Postgres cada worker escucha el canal y reparte a sus propios sockets
+    await realtime.configure_broker(str(settings.database_url)).start()
+
+
+@app.on_event("shutdown")
+async def stop_realtime():
+    await realtime.broker.stop()
+
+
 @app.get("/")
 async def root():
     return {"message": "Rentware Events API"}
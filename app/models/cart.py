@@ -2,12 +2,13 @@ import uuid
 from datetime import date, datetime
 from typing import Optional
 
-from sqlalchemy import Boolean, Date, DateTime, Enum as PgEnum, ForeignKey, Integer, Numeric, String
+from sqlalchemy import Boolean, Date, DateTime, Enum as PgEnum, ForeignKey, Integer, String
 from sqlalchemy.dialects.postgresql import UUID
-from sqlalchemy.orm import Mapped, mapped_column, relationship
+from sqlalchemy.orm import Mapped, mapped_column, relationship, validates
 
+from app.core.money import Money
 from app.db.base import Base
-from app.models.shared import DeliveryMethod
+from app.models.shared import DeliveryMethod, MoneyType
 
 
 class Cart(Base):
@@ -47,10 +48,15 @@ class CartItem(Base):
     variant_id: Mapped[Optional[uuid.UUID]] = mapped_column(UUID(as_uuid=True), ForeignKey("product_variants.id", ondelete="SET NULL"))
     quantity: Mapped[int] = mapped_column(Integer, default=1)
     days: Mapped[int] = mapped_column(Integer, default=1)
-    price_per_day: Mapped[float] = mapped_column(Numeric(10, 2))  # stored as decimal for totals
+    price_per_day: Mapped[Money] = mapped_column(MoneyType)
     requires_guarantee: Mapped[bool] = mapped_column(Boolean, default=False)
     units_per_box: Mapped[int] = mapped_column(Integer, default=1)
 
     cart = relationship("Cart", back_populates="items")
     product = relationship("Product")
     variant = relationship("ProductVariant")
+
+    @validates("price_per_day")
+    def _coerce_price(self, key, value):
+        # Se normaliza al asignar para que los cálculos lean .cents sin convertir por línea
+        return None if value is None else Money.of(value)
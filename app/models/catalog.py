@@ -1,13 +1,14 @@
 import uuid
 from datetime import datetime
-from decimal import Decimal
 from typing import List
 
-from sqlalchemy import Boolean, Column, DateTime, DECIMAL, ForeignKey, Integer, String, Table, Text
+from sqlalchemy import Boolean, Column, DateTime, ForeignKey, Integer, String, Table, Text
 from sqlalchemy.dialects.postgresql import UUID
 from sqlalchemy.orm import Mapped, mapped_column, relationship
 
+from app.core.money import Money
 from app.db.base import Base
+from app.models.shared import MoneyType
 
 product_tag_table = Table(
     "product_tags",
@@ -43,7 +44,7 @@ class Product(Base):
     name: Mapped[str] = mapped_column(String(255), nullable=False)
     description: Mapped[str | None] = mapped_column(Text)
     category_id: Mapped[uuid.UUID | None] = mapped_column(UUID(as_uuid=True), ForeignKey("categories.id"))
-    base_price: Mapped[Decimal] = mapped_column(DECIMAL(10, 2), nullable=False)
+    base_price: Mapped[Money] = mapped_column(MoneyType, nullable=False)
     requires_guarantee: Mapped[bool] = mapped_column(Boolean, default=False)
     units_per_box: Mapped[int] = mapped_column(Integer, default=1)
     piece_type: Mapped[str | None] = mapped_column(String(100))
@@ -66,7 +67,7 @@ class ProductVariant(Base):
     product_id: Mapped[uuid.UUID] = mapped_column(UUID(as_uuid=True), ForeignKey("products.id", ondelete="CASCADE"))
     color: Mapped[str | None] = mapped_column(String(100))
     material: Mapped[str | None] = mapped_column(String(100))
-    price_override: Mapped[Decimal | None] = mapped_column(DECIMAL(10, 2))
+    price_override: Mapped[Money | None] = mapped_column(MoneyType)
 
     product = relationship("Product", back_populates="variants")
     inventories = relationship("Inventory", back_populates="variant")
@@ -1,22 +1,37 @@
 import uuid
 from datetime import date, datetime
+from enum import Enum
+from typing import Optional
 
-from sqlalchemy import Boolean, Date, DateTime, Numeric, String
+from sqlalchemy import (
+    Boolean,
+    DateTime,
+    Enum as PgEnum,
+    ForeignKey,
+    Index,
+    Integer,
+    Numeric,
+    String,
+    text,
+)
 from sqlalchemy.dialects.postgresql import UUID
 from sqlalchemy.orm import Mapped, mapped_column
 
+from app.core.money import Money
 from app.db.base import Base
+from app.models.shared import MoneyType
 
 
 class LogisticsConfig(Base):
     __tablename__ = "logistics_config"
 
     id: Mapped[uuid.UUID] = mapped_column(UUID(as_uuid=True), primary_key=True, default=uuid.uuid4)
-    base_fee: Mapped[float] = mapped_column(Numeric(10, 2), default=0)
-    hourly_vehicle_fee: Mapped[float] = mapped_column(Numeric(10, 2), default=0)
-    default_tolls: Mapped[float] = mapped_column(Numeric(10, 2), default=0)
+    base_fee: Mapped[Money] = mapped_column(MoneyType, default=Money(0))
+    hourly_vehicle_fee: Mapped[Money] = mapped_column(MoneyType, default=Money(0))
+    default_tolls: Mapped[Money] = mapped_column(MoneyType, default=Money(0))
     notes: Mapped[str | None] = mapped_column(String(255))
-    updated_at: Mapped[datetime] = mapped_column(DateTime(timezone=True), default=datetime.utcnow, onupdate=datetime.utcnow)
+    # Filas inmutables: cada cambio agrega una nueva, así que updated_at es la fecha de alta
+    updated_at: Mapped[datetime] = mapped_column(DateTime(timezone=True), default=datetime.utcnow)
 
 
 class Season(Base):
@@ -37,4 +52,60 @@ class GuaranteeConfig(Base):
     percentage: Mapped[float] = mapped_column(Numeric(5, 2), default=0.15)
     apply_tax: Mapped[bool] = mapped_column(Boolean, default=True)
     tax_rate: Mapped[float] = mapped_column(Numeric(4, 2), default=0.21)
-    updated_at: Mapped[datetime] = mapped_column(DateTime(timezone=True), default=datetime.utcnow, onupdate=datetime.utcnow)
+    # Filas inmutables: cada cambio agrega una nueva, así que updated_at es la fecha de alta
+    updated_at: Mapped[datetime] = mapped_column(DateTime(timezone=True), default=datetime.utcnow)
+
+
+class ConfigVersion(Base):
+    """Combinación de logística y garantía vigente desde effective_from; nunca se modifica."""
+
+    __tablename__ = "config_versions"
+    __table_args__ = (
+        # Puntero a la versión vigente: a lo sumo una fila con is_current y se encuentra por índice
+        Index(
+            "ix_config_versions_current",
+            "is_current",
+            unique=True,
+            postgresql_where=text("is_current"),
+            sqlite_where=text("is_current"),
+        ),
+    )
+
+    id: Mapped[uuid.UUID] = mapped_column(UUID(as_uuid=True), primary_key=True, default=uuid.uuid4)
+    logistics_id: Mapped[uuid.UUID] = mapped_column(
+        UUID(as_uuid=True), ForeignKey("logistics_config.id"), nullable=False
+    )
+    guarantee_id: Mapped[uuid.UUID] = mapped_column(
+        UUID(as_uuid=True), ForeignKey("guarantee_config.id"), nullable=False
+    )
+    effective_from: Mapped[datetime] = mapped_column(
+        DateTime(timezone=True), default=datetime.utcnow, index=True
+    )
+    is_current: Mapped[bool] = mapped_column(Boolean, default=False, nullable=False)
+
+
+class PricingRuleKind(str, Enum):
+    volume_discount = (
+        "volume_discount"  # threshold = cajas (quantity / units_per_box, hacia arriba)
+    )
+    category_multiplier = "category_multiplier"
+    season_multiplier = "season_multiplier"
+    duration_curve = "duration_curve"  # threshold = días de alquiler
+
+
+class PricingRule(Base):
+    __tablename__ = "pricing_rules"
+
+    id: Mapped[uuid.UUID] = mapped_column(UUID(as_uuid=True), primary_key=True, default=uuid.uuid4)
+    kind: Mapped[PricingRuleKind] = mapped_column(PgEnum(PricingRuleKind), nullable=False)
+    multiplier: Mapped[float] = mapped_column(Numeric(6, 4), nullable=False)
+    threshold: Mapped[Optional[int]] = mapped_column(Integer)
+    category_id: Mapped[Optional[uuid.UUID]] = mapped_column(
+        UUID(as_uuid=True), ForeignKey("categories.id", ondelete="CASCADE")
+    )
+    season_id: Mapped[Optional[uuid.UUID]] = mapped_column(
+        UUID(as_uuid=True), ForeignKey("seasons.id", ondelete="CASCADE")
+    )
+    active: Mapped[bool] = mapped_column(Boolean, default=True, index=True)
+    notes: Mapped[Optional[str]] = mapped_column(String(255))
+    created_at: Mapped[datetime] = mapped_column(DateTime(timezone=True), default=datetime.utcnow)
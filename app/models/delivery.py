@@ -0,0 +1,40 @@
+import uuid
+from datetime import date, datetime
+from typing import Optional
+
+from sqlalchemy import Boolean, CheckConstraint, Date, DateTime, ForeignKey, Integer, String
+from sqlalchemy.dialects.postgresql import UUID
+from sqlalchemy.orm import Mapped, mapped_column
+
+from app.db.base import Base
+
+
+class DeliverySlot(Base):
+    """Franja de reparto (p. ej. "Sábado 09-13") con la cantidad de viajes que se pueden atender."""
+
+    __tablename__ = "delivery_slots"
+
+    id: Mapped[uuid.UUID] = mapped_column(UUID(as_uuid=True), primary_key=True, default=uuid.uuid4)
+    label: Mapped[str] = mapped_column(String(100), nullable=False)
+    # 0 = lunes ... 6 = domingo, como date.weekday(); None = todos los días
+    weekday: Mapped[Optional[int]] = mapped_column(Integer)
+    capacity: Mapped[int] = mapped_column(Integer, nullable=False)
+    active: Mapped[bool] = mapped_column(Boolean, default=True, index=True)
+    created_at: Mapped[datetime] = mapped_column(DateTime(timezone=True), default=datetime.utcnow)
+
+
+class DeliverySlotDay(Base):
+    """Reservas de una franja en una fecha; la fila se crea con la primera reserva."""
+
+    __tablename__ = "delivery_slot_days"
+    __table_args__ = (
+        CheckConstraint("booked >= 0 AND booked <= capacity", name="ck_delivery_slot_days_booked"),
+    )
+
+    slot_id: Mapped[uuid.UUID] = mapped_column(
+        UUID(as_uuid=True), ForeignKey("delivery_slots.id", ondelete="CASCADE"), primary_key=True
+    )
+    day: Mapped[date] = mapped_column(Date, primary_key=True)
+    # Copia de la capacidad de la franja al crear la fila: se puede ajustar por fecha puntual
+    capacity: Mapped[int] = mapped_column(Integer, nullable=False)
+    booked: Mapped[int] = mapped_column(Integer, default=0, nullable=False)
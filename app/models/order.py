@@ -5,21 +5,24 @@ from typing import Optional
 
 from sqlalchemy import (
     Boolean,
+    Column,
     Date,
     DateTime,
     Enum as PgEnum,
     ForeignKey,
+    Index,
     Integer,
-    Numeric,
     String,
+    Table,
     Text,
     UniqueConstraint,
 )
 from sqlalchemy.dialects.postgresql import UUID
-from sqlalchemy.orm import Mapped, mapped_column, relationship
+from sqlalchemy.orm import Mapped, foreign, mapped_column, relationship
 
+from app.core.money import Money
 from app.db.base import Base
-from app.models.shared import DeliveryMethod
+from app.models.shared import DeliveryMethod, MoneyType
 
 
 class OrderStatus(str, Enum):
@@ -34,7 +37,10 @@ class OrderStatus(str, Enum):
 
 class Order(Base):
     __tablename__ = "orders"
-    __table_args__ = (UniqueConstraint("cart_id", name="uq_orders_cart"),)
+    __table_args__ = (
+        UniqueConstraint("cart_id", name="uq_orders_cart"),
+        Index("ix_orders_status_updated_at", "status", "updated_at"),
+    )
 
     id: Mapped[uuid.UUID] = mapped_column(UUID(as_uuid=True), primary_key=True, default=uuid.uuid4)
     code: Mapped[str] = mapped_column(String(20), unique=True, index=True)
@@ -45,19 +51,30 @@ class Order(Base):
     delivery_address: Mapped[Optional[str]] = mapped_column(String(255))
     delivery_window: Mapped[Optional[str]] = mapped_column(String(100))
     return_window: Mapped[Optional[str]] = mapped_column(String(100))
+    # Franjas reservadas en el checkout; las ventanas de arriba guardan su etiqueta
+    delivery_slot_id: Mapped[Optional[uuid.UUID]] = mapped_column(
+        UUID(as_uuid=True), ForeignKey("delivery_slots.id", ondelete="SET NULL")
+    )
+    return_slot_id: Mapped[Optional[uuid.UUID]] = mapped_column(
+        UUID(as_uuid=True), ForeignKey("delivery_slots.id", ondelete="SET NULL")
+    )
     event_start: Mapped[Optional[date]] = mapped_column(Date)
     event_end: Mapped[Optional[date]] = mapped_column(Date)
     days: Mapped[int] = mapped_column(Integer, default=1)
     logistics_hours: Mapped[int] = mapped_column(Integer, default=1)
     tolls: Mapped[int] = mapped_column(Integer, default=0)
-    subtotal: Mapped[float] = mapped_column(Numeric(12, 2), default=0)
-    logistics_cost: Mapped[float] = mapped_column(Numeric(12, 2), default=0)
-    guarantee_amount: Mapped[float] = mapped_column(Numeric(12, 2), default=0)
-    total: Mapped[float] = mapped_column(Numeric(12, 2), default=0)
-    reservation_required: Mapped[float] = mapped_column(Numeric(12, 2), default=0)
-    outstanding_balance: Mapped[float] = mapped_column(Numeric(12, 2), default=0)
+    subtotal: Mapped[Money] = mapped_column(MoneyType, default=Money(0))
+    logistics_cost: Mapped[Money] = mapped_column(MoneyType, default=Money(0))
+    guarantee_amount: Mapped[Money] = mapped_column(MoneyType, default=Money(0))
+    total: Mapped[Money] = mapped_column(MoneyType, default=Money(0))
+    reservation_required: Mapped[Money] = mapped_column(MoneyType, default=Money(0))
+    outstanding_balance: Mapped[Money] = mapped_column(MoneyType, default=Money(0))
     requires_guarantee: Mapped[bool] = mapped_column(Boolean, default=False)
     high_season: Mapped[bool] = mapped_column(Boolean, default=False)
+    # Versión de logística y garantía con la que se cotizó
+    config_version_id: Mapped[Optional[uuid.UUID]] = mapped_column(
+        UUID(as_uuid=True), ForeignKey("config_versions.id")
+    )
     notes: Mapped[Optional[str]] = mapped_column(Text)
     created_at: Mapped[datetime] = mapped_column(DateTime(timezone=True), default=datetime.utcnow)
     updated_at: Mapped[datetime] = mapped_column(DateTime(timezone=True), default=datetime.utcnow, onupdate=datetime.utcnow)
@@ -77,10 +94,12 @@ class OrderItem(Base):
     variant_id: Mapped[Optional[uuid.UUID]] = mapped_column(UUID(as_uuid=True), ForeignKey("product_variants.id", ondelete="SET NULL"))
     quantity: Mapped[int] = mapped_column(Integer, default=1)
     days: Mapped[int] = mapped_column(Integer, default=1)
-    unit_price: Mapped[float] = mapped_column(Numeric(10, 2))
-    total_price: Mapped[float] = mapped_column(Numeric(12, 2))
+    unit_price: Mapped[Money] = mapped_column(MoneyType)
+    total_price: Mapped[Money] = mapped_column(MoneyType)
     requires_guarantee: Mapped[bool] = mapped_column(Boolean, default=False)
     units_per_box: Mapped[int] = mapped_column(Integer, default=1)
+    # Unidades ya reservadas (p. ej. holds del carrito convertidos en el checkout)
+    reserved_quantity: Mapped[int] = mapped_column(Integer, default=0, server_default="0")
 
     order = relationship("Order", back_populates="items")
     product = relationship("Product")
@@ -107,9 +126,83 @@ class OrderReturn(Base):
 
     id: Mapped[uuid.UUID] = mapped_column(UUID(as_uuid=True), primary_key=True, default=uuid.uuid4)
     order_id: Mapped[uuid.UUID] = mapped_column(UUID(as_uuid=True), ForeignKey("orders.id", ondelete="CASCADE"))
-    breakage_cost: Mapped[float] = mapped_column(Numeric(10, 2), default=0)
-    missing_cost: Mapped[float] = mapped_column(Numeric(10, 2), default=0)
+    breakage_cost: Mapped[Money] = mapped_column(MoneyType, default=Money(0))
+    missing_cost: Mapped[Money] = mapped_column(MoneyType, default=Money(0))
     notes: Mapped[Optional[str]] = mapped_column(Text)
     created_at: Mapped[datetime] = mapped_column(DateTime(timezone=True), default=datetime.utcnow)
 
     order = relationship("Order", back_populates="returns")
+
+
+class DispatchLeg(str, Enum):
+    delivery = "delivery"  # event_start, franja delivery_window
+    pickup = "pickup"  # event_end, franja return_window
+
+
+class DispatchDailyLoad(Base):
+    """Carga de reparto por día, tramo y franja; se mantiene sumando y restando pedidos."""
+
+    __tablename__ = "dispatch_daily_load"
+
+    day: Mapped[date] = mapped_column(Date, primary_key=True)
+    leg: Mapped[DispatchLeg] = mapped_column(PgEnum(DispatchLeg), primary_key=True)
+    # "" = sin franja: la PK no admite NULL
+    window: Mapped[str] = mapped_column(String(100), primary_key=True, default="")
+    orders: Mapped[int] = mapped_column(Integer, default=0)
+    vehicle_hours: Mapped[int] = mapped_column(Integer, default=0)
+    items: Mapped[int] = mapped_column(Integer, default=0)
+    boxes: Mapped[int] = mapped_column(Integer, default=0)
+
+
+def _archive_table(name: str, source: Table, *extra) -> Table:
+    # Mismas columnas que la tabla caliente pero sin FKs: el archivo no frena borrados
+    columns = [
+        Column(c.name, c.type, primary_key=c.primary_key, nullable=c.nullable)
+        for c in source.columns
+    ]
+    return Table(name, Base.metadata, *columns, *extra)
+
+
+orders_archive = _archive_table(
+    "orders_archive",
+    Order.__table__,
+    Column("archived_at", DateTime(timezone=True), default=datetime.utcnow),
+    Index("ix_orders_archive_user_created", "user_id", "created_at"),
+    Index("ix_orders_archive_created_at", "created_at"),
+)
+order_items_archive = _archive_table(
+    "order_items_archive", OrderItem.__table__, Index("ix_order_items_archive_order", "order_id")
+)
+order_returns_archive = _archive_table(
+    "order_returns_archive",
+    OrderReturn.__table__,
+    Index("ix_order_returns_archive_order", "order_id"),
+)
+
+
+class ArchivedOrderItem(Base):
+    __table__ = order_items_archive
+
+    product = relationship(
+        "Product", primaryjoin="foreign(ArchivedOrderItem.product_id) == Product.id", viewonly=True
+    )
+    variant = relationship(
+        "ProductVariant",
+        primaryjoin="foreign(ArchivedOrderItem.variant_id) == ProductVariant.id",
+        viewonly=True,
+    )
+
+    product_name = OrderItem.product_name
+    variant_label = OrderItem.variant_label
+
+
+class ArchivedOrder(Base):
+    """Pedido cerrado movido fuera de orders; solo lectura."""
+
+    __table__ = orders_archive
+
+    items = relationship(
+        ArchivedOrderItem,
+        primaryjoin=lambda: ArchivedOrder.id == foreign(ArchivedOrderItem.order_id),
+        viewonly=True,
+    )
@@ -1,6 +1,24 @@
 from enum import Enum
 
+from sqlalchemy import BigInteger
+from sqlalchemy.types import TypeDecorator
+
+from app.core.money import Money
+
 
 class DeliveryMethod(str, Enum):
     delivery = "delivery"
     pickup = "pickup"
+
+
+class MoneyType(TypeDecorator):
+    """Importe guardado en centavos enteros (BIGINT); del lado de Python siempre es Money."""
+
+    impl = BigInteger
+    cache_ok = True
+
+    def process_bind_param(self, value, dialect):
+        return None if value is None else Money.of(value).cents
+
+    def process_result_value(self, value, dialect):
+        return None if value is None else Money(int(value))
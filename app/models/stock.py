@@ -3,7 +3,18 @@ from datetime import datetime
 from enum import Enum
 from typing import Optional
 
-from sqlalchemy import DateTime, Enum as PgEnum, ForeignKey, Integer, Numeric, String
+from sqlalchemy import (
+    Boolean,
+    DateTime,
+    Enum as PgEnum,
+    ForeignKey,
+    Index,
+    Integer,
+    Numeric,
+    String,
+    UniqueConstraint,
+    text,
+)
 from sqlalchemy.dialects.postgresql import UUID
 from sqlalchemy.orm import Mapped, mapped_column, relationship
 
@@ -26,10 +37,28 @@ class StockMovementReason(str, Enum):
     reservation = "reservation"
     return_in = "return_in"
     adjustment = "adjustment"
+    transfer = "transfer"
+
+
+# Clave de variant_id en el índice único de inventarios: NULL no choca con NULL en un UNIQUE
+NO_VARIANT_KEY = "coalesce(variant_id, '00000000-0000-0000-0000-000000000000')"
 
 
 class Inventory(Base):
     __tablename__ = "inventories"
+    __table_args__ = (
+        Index(
+            "ix_inventories_product_variant_warehouse", "product_id", "variant_id", "warehouse_id"
+        ),
+        # Un solo inventario por ubicación: altas concurrentes del mismo destino no se duplican
+        Index(
+            "uq_inventories_stock_location",
+            "product_id",
+            text(NO_VARIANT_KEY),
+            "warehouse_id",
+            unique=True,
+        ),
+    )
 
     id: Mapped[uuid.UUID] = mapped_column(UUID(as_uuid=True), primary_key=True, default=uuid.uuid4)
     product_id: Mapped[uuid.UUID] = mapped_column(UUID(as_uuid=True), ForeignKey("products.id", ondelete="CASCADE"))
@@ -37,6 +66,8 @@ class Inventory(Base):
     warehouse_id: Mapped[uuid.UUID] = mapped_column(UUID(as_uuid=True), ForeignKey("warehouses.id", ondelete="CASCADE"))
     available: Mapped[int] = mapped_column(Integer, default=0)
     reserved: Mapped[int] = mapped_column(Integer, default=0)
+    # 0 = contador único; N > 0 reparte el stock en N filas de inventory_stripes
+    stripe_count: Mapped[int] = mapped_column(Integer, default=0, server_default="0")
 
     product = relationship("Product", back_populates="inventories")
     variant = relationship("ProductVariant", back_populates="inventories")
@@ -45,7 +76,13 @@ class Inventory(Base):
 
 
 class StockMovement(Base):
+    # En Postgres es una tabla particionada por mes de created_at; la PK incluye la clave de
+    # partición (migración 0010)
     __tablename__ = "stock_movements"
+    __table_args__ = (
+        Index("ix_stock_movements_created_at_id", "created_at", "id"),
+        Index("ix_stock_movements_inventory_created_at", "inventory_id", "created_at"),
+    )
 
     id: Mapped[uuid.UUID] = mapped_column(UUID(as_uuid=True), primary_key=True, default=uuid.uuid4)
     inventory_id: Mapped[uuid.UUID] = mapped_column(UUID(as_uuid=True), ForeignKey("inventories.id", ondelete="CASCADE"))
@@ -53,6 +90,117 @@ class StockMovement(Base):
     reason: Mapped[StockMovementReason] = mapped_column(PgEnum(StockMovementReason), default=StockMovementReason.manual)
     reference: Mapped[str | None] = mapped_column(String(100))
     amount: Mapped[Optional[Numeric]] = mapped_column(Numeric(10, 2))
-    created_at: Mapped[datetime] = mapped_column(DateTime(timezone=True), default=datetime.utcnow)
+    created_at: Mapped[datetime] = mapped_column(
+        DateTime(timezone=True), primary_key=True, default=datetime.utcnow, nullable=False
+    )
 
     inventory = relationship("Inventory", back_populates="movements")
+
+
+class StockLedgerBaseline(Base):
+    """Sumas de los movimientos que salieron del ledger al desacoplar particiones viejas."""
+
+    __tablename__ = "stock_ledger_baselines"
+
+    inventory_id: Mapped[uuid.UUID] = mapped_column(
+        UUID(as_uuid=True), ForeignKey("inventories.id", ondelete="CASCADE"), primary_key=True
+    )
+    quantity_change: Mapped[int] = mapped_column(Integer, nullable=False, default=0)
+    reserved_change: Mapped[int] = mapped_column(Integer, nullable=False, default=0)
+    movement_count: Mapped[int] = mapped_column(Integer, nullable=False, default=0)
+    through: Mapped[datetime] = mapped_column(DateTime(timezone=True), nullable=False)
+
+
+class InventorySnapshot(Base):
+    __tablename__ = "inventory_snapshots"
+    __table_args__ = (
+        UniqueConstraint(
+            "inventory_id", "taken_at", name="uq_inventory_snapshots_inventory_taken_at"
+        ),
+    )
+
+    id: Mapped[uuid.UUID] = mapped_column(UUID(as_uuid=True), primary_key=True, default=uuid.uuid4)
+    inventory_id: Mapped[uuid.UUID] = mapped_column(
+        UUID(as_uuid=True), ForeignKey("inventories.id", ondelete="CASCADE")
+    )
+    taken_at: Mapped[datetime] = mapped_column(DateTime(timezone=True), nullable=False)
+    # Suma acumulada de quantity_change hasta taken_at (inclusive)
+    balance: Mapped[int] = mapped_column(Integer, nullable=False, default=0)
+    movement_count: Mapped[int] = mapped_column(Integer, nullable=False, default=0)
+
+
+class InventoryStripe(Base):
+    __tablename__ = "inventory_stripes"
+
+    inventory_id: Mapped[uuid.UUID] = mapped_column(
+        UUID(as_uuid=True), ForeignKey("inventories.id", ondelete="CASCADE"), primary_key=True
+    )
+    stripe: Mapped[int] = mapped_column(Integer, primary_key=True)
+    available: Mapped[int] = mapped_column(Integer, default=0)
+    reserved: Mapped[int] = mapped_column(Integer, default=0)
+
+
+class StockHold(Base):
+    __tablename__ = "stock_holds"
+
+    id: Mapped[uuid.UUID] = mapped_column(UUID(as_uuid=True), primary_key=True, default=uuid.uuid4)
+    cart_id: Mapped[uuid.UUID] = mapped_column(
+        UUID(as_uuid=True), ForeignKey("carts.id", ondelete="CASCADE"), index=True
+    )
+    cart_item_id: Mapped[Optional[uuid.UUID]] = mapped_column(
+        UUID(as_uuid=True), ForeignKey("cart_items.id", ondelete="CASCADE"), index=True
+    )
+    inventory_id: Mapped[uuid.UUID] = mapped_column(
+        UUID(as_uuid=True), ForeignKey("inventories.id", ondelete="CASCADE")
+    )
+    quantity: Mapped[int] = mapped_column(Integer, nullable=False)
+    expires_at: Mapped[datetime] = mapped_column(
+        DateTime(timezone=True), nullable=False, index=True
+    )
+    created_at: Mapped[datetime] = mapped_column(DateTime(timezone=True), default=datetime.utcnow)
+
+
+class StockThreshold(Base):
+    __tablename__ = "stock_thresholds"
+    __table_args__ = (
+        UniqueConstraint(
+            "product_id", "warehouse_id", name="uq_stock_thresholds_product_warehouse"
+        ),
+    )
+
+    id: Mapped[uuid.UUID] = mapped_column(UUID(as_uuid=True), primary_key=True, default=uuid.uuid4)
+    product_id: Mapped[uuid.UUID] = mapped_column(
+        UUID(as_uuid=True), ForeignKey("products.id", ondelete="CASCADE")
+    )
+    warehouse_id: Mapped[uuid.UUID] = mapped_column(
+        UUID(as_uuid=True), ForeignKey("warehouses.id", ondelete="CASCADE")
+    )
+    min_available: Mapped[int] = mapped_column(Integer, nullable=False)
+    # Estado del último cruce: solo se emite alerta cuando cambia
+    is_below: Mapped[bool] = mapped_column(Boolean, default=False)
+
+
+class StockAlertKind(str, Enum):
+    low = "low"
+    recovered = "recovered"
+
+
+class StockAlert(Base):
+    __tablename__ = "stock_alerts"
+
+    id: Mapped[uuid.UUID] = mapped_column(UUID(as_uuid=True), primary_key=True, default=uuid.uuid4)
+    threshold_id: Mapped[uuid.UUID] = mapped_column(
+        UUID(as_uuid=True), ForeignKey("stock_thresholds.id", ondelete="CASCADE")
+    )
+    product_id: Mapped[uuid.UUID] = mapped_column(
+        UUID(as_uuid=True), ForeignKey("products.id", ondelete="CASCADE")
+    )
+    warehouse_id: Mapped[uuid.UUID] = mapped_column(
+        UUID(as_uuid=True), ForeignKey("warehouses.id", ondelete="CASCADE")
+    )
+    kind: Mapped[StockAlertKind] = mapped_column(PgEnum(StockAlertKind))
+    available: Mapped[int] = mapped_column(Integer, nullable=False)
+    min_available: Mapped[int] = mapped_column(Integer, nullable=False)
+    created_at: Mapped[datetime] = mapped_column(
+        DateTime(timezone=True), default=datetime.utcnow, index=True
+    )
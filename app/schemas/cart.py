@@ -1,10 +1,10 @@
 import uuid
 from datetime import date
-from decimal import Decimal
 from typing import List, Optional
 
 from pydantic import BaseModel, Field
 
+from app.core.money import Money
 from app.models.shared import DeliveryMethod
 from app.models.order import OrderStatus
 
@@ -35,7 +35,7 @@ class CartItemBase(BaseModel):
 
 
 class CartItemCreate(CartItemBase):
-    price_per_day: Decimal
+    price_per_day: Money
     requires_guarantee: bool = False
     units_per_box: int = 1
 
@@ -47,7 +47,7 @@ class CartItemUpdate(BaseModel):
 
 class CartItemOut(CartItemBase):
     id: uuid.UUID
-    price_per_day: Decimal
+    price_per_day: Money
     requires_guarantee: bool
     units_per_box: int
 
@@ -62,3 +62,15 @@ class CartOut(CartBase):
     order_status: OrderStatus | None = None
 
     model_config = {"from_attributes": True}
+
+
+class CartQuoteOut(BaseModel):
+    days: int
+    subtotal: Money
+    logistics_cost: Money
+    guarantee_amount: Money
+    total: Money
+    reservation_required: Money
+    outstanding_balance: Money
+    requires_guarantee: bool
+    high_season: bool
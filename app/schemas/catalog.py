@@ -1,9 +1,9 @@
 import uuid
-from decimal import Decimal
 from typing import List
 
 from pydantic import BaseModel, Field
 
+from app.core.money import Money
 from app.models.catalog import Product
 
 
@@ -44,7 +44,7 @@ class TagCreate(TagBase):
 class ProductVariantBase(BaseModel):
     color: str | None = None
     material: str | None = None
-    price_override: Decimal | None = None
+    price_override: Money | None = None
 
 
 class ProductVariantCreate(ProductVariantBase):
@@ -61,7 +61,7 @@ class ProductBase(BaseModel):
     name: str
     description: str | None = None
     category_id: uuid.UUID | None = None
-    base_price: Decimal = Field(..., gt=0)
+    base_price: Money = Field(..., gt=0)
     requires_guarantee: bool = False
     units_per_box: int = 1
     piece_type: str | None = None
@@ -78,7 +78,7 @@ class ProductUpdate(BaseModel):
     name: str | None = None
     description: str | None = None
     category_id: uuid.UUID | None = None
-    base_price: Decimal | None = None
+    base_price: Money | None = None
     requires_guarantee: bool | None = None
     units_per_box: int | None = None
     piece_type: str | None = None
@@ -2,13 +2,16 @@ import uuid
 from datetime import date, datetime
 from decimal import Decimal
 
-from pydantic import BaseModel
+from pydantic import BaseModel, Field
+
+from app.core.money import Money
+from app.models.config import PricingRuleKind
 
 
 class LogisticsConfigBase(BaseModel):
-    base_fee: Decimal = 0
-    hourly_vehicle_fee: Decimal = 0
-    default_tolls: Decimal = 0
+    base_fee: Money = Money(0)
+    hourly_vehicle_fee: Money = Money(0)
+    default_tolls: Money = Money(0)
     notes: str | None = None
 
 
@@ -56,3 +59,42 @@ class GuaranteeConfigOut(GuaranteeConfigBase):
     updated_at: datetime
 
     model_config = {"from_attributes": True}
+
+
+class ConfigVersionOut(BaseModel):
+    id: uuid.UUID
+    effective_from: datetime
+    logistics: LogisticsConfigOut
+    guarantee: GuaranteeConfigOut
+
+    model_config = {"from_attributes": True}
+
+
+class QuoteCacheStats(BaseModel):
+    size: int
+    maxsize: int
+    hits: int
+    misses: int
+    evictions: int
+    hit_rate: float
+
+
+class PricingRuleBase(BaseModel):
+    kind: PricingRuleKind
+    multiplier: Decimal = Field(..., gt=0, max_digits=6, decimal_places=4)
+    threshold: int | None = Field(None, ge=0)
+    category_id: uuid.UUID | None = None
+    season_id: uuid.UUID | None = None
+    notes: str | None = None
+
+
+class PricingRuleCreate(PricingRuleBase):
+    pass
+
+
+class PricingRuleOut(PricingRuleBase):
+    id: uuid.UUID
+    active: bool
+    created_at: datetime
+
+    model_config = {"from_attributes": True}
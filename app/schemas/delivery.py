@@ -0,0 +1,31 @@
+import uuid
+from datetime import date, datetime
+
+from pydantic import BaseModel, Field
+
+
+class DeliverySlotBase(BaseModel):
+    label: str = Field(..., max_length=100)
+    weekday: int | None = Field(None, ge=0, le=6)
+    capacity: int = Field(..., ge=1)
+
+
+class DeliverySlotCreate(DeliverySlotBase):
+    pass
+
+
+class DeliverySlotOut(DeliverySlotBase):
+    id: uuid.UUID
+    active: bool
+    created_at: datetime
+
+    model_config = {"from_attributes": True}
+
+
+class SlotAvailability(BaseModel):
+    slot_id: uuid.UUID
+    label: str
+    day: date
+    capacity: int
+    booked: int
+    available: int
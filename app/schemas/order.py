@@ -1,11 +1,11 @@
 import uuid
 from datetime import date, datetime
-from decimal import Decimal
 from typing import List, Optional
 
 from pydantic import BaseModel, Field
 
-from app.models.order import OrderStatus
+from app.core.money import Money
+from app.models.order import DispatchLeg, OrderStatus
 from app.models.shared import DeliveryMethod
 
 
@@ -17,8 +17,8 @@ class OrderItemOut(BaseModel):
     variant_label: str | None = None
     quantity: int
     days: int
-    unit_price: Decimal
-    total_price: Decimal
+    unit_price: Money
+    total_price: Money
     requires_guarantee: bool
     units_per_box: int
 
@@ -42,14 +42,17 @@ class OrderOut(OrderBase):
     code: str
     status: OrderStatus
     days: int
-    subtotal: Decimal
-    logistics_cost: Decimal
-    guarantee_amount: Decimal
-    total: Decimal
-    reservation_required: Decimal
-    outstanding_balance: Decimal
+    subtotal: Money
+    logistics_cost: Money
+    guarantee_amount: Money
+    total: Money
+    reservation_required: Money
+    outstanding_balance: Money
     requires_guarantee: bool
     high_season: bool
+    config_version_id: uuid.UUID | None = None
+    delivery_slot_id: uuid.UUID | None = None
+    return_slot_id: uuid.UUID | None = None
     created_at: datetime
     updated_at: datetime
     items: List[OrderItemOut]
@@ -64,9 +67,70 @@ class OrderStatusUpdate(BaseModel):
 class CheckoutRequest(BaseModel):
     cart_id: uuid.UUID | None = None
     session_token: str | None = None
+    delivery_slot_id: uuid.UUID | None = None
+    return_slot_id: uuid.UUID | None = None
 
 
 class OrderReturnCreate(BaseModel):
-    breakage_cost: Decimal = Field(0, ge=0)
-    missing_cost: Decimal = Field(0, ge=0)
+    breakage_cost: Money = Field(Money(0), ge=0)
+    missing_cost: Money = Field(Money(0), ge=0)
     notes: str | None = None
+
+
+class AllocationPick(BaseModel):
+    inventory_id: uuid.UUID
+    warehouse_id: uuid.UUID
+    product_id: uuid.UUID
+    variant_id: Optional[uuid.UUID] = None
+    quantity: int
+
+
+class AllocationShortage(BaseModel):
+    product_id: uuid.UUID
+    variant_id: Optional[uuid.UUID] = None
+    quantity: int
+
+
+class AllocationPlan(BaseModel):
+    feasible: bool
+    warehouse_ids: List[uuid.UUID]
+    picks: List[AllocationPick]
+    shortages: List[AllocationShortage] = []
+
+
+class QuoteChange(BaseModel):
+    field: str
+    current: Money | bool | int | None
+    proposed: Money | bool | int
+
+
+class OrderRequoteDiff(BaseModel):
+    order_id: uuid.UUID
+    code: str
+    changes: List[QuoteChange]
+
+
+class OrderRequoteReport(BaseModel):
+    dry_run: bool
+    config_version: int
+    scanned: int
+    changed: int
+    orders: List[OrderRequoteDiff]
+
+
+class DispatchSlotLoad(BaseModel):
+    leg: DispatchLeg
+    window: str | None = None
+    orders: int
+    vehicle_hours: int
+    items: int
+    boxes: int
+
+
+class DispatchDay(BaseModel):
+    day: date
+    orders: int
+    vehicle_hours: int
+    items: int
+    boxes: int
+    slots: List[DispatchSlotLoad]
@@ -3,9 +3,9 @@ from decimal import Decimal
 from datetime import datetime
 from typing import List
 
-from pydantic import BaseModel
+from pydantic import BaseModel, Field
 
-from app.models.stock import StockMovementReason
+from app.models.stock import StockAlertKind, StockMovementReason
 from app.models.shared import DeliveryMethod
 
 
@@ -27,6 +27,7 @@ class InventoryOut(BaseModel):
     warehouse_id: uuid.UUID
     available: int
     reserved: int
+    stripe_count: int = 0
 
     model_config = {"from_attributes": True}
 
@@ -39,6 +40,43 @@ class StockMovementCreate(BaseModel):
     amount: Decimal | None = None
 
 
+class StockMovementBulkCreate(BaseModel):
+    movements: List[StockMovementCreate] = Field(..., min_length=1, max_length=10000)
+
+
+class StockMovementBulkError(BaseModel):
+    index: int
+    inventory_id: uuid.UUID | None = None
+    detail: str
+
+
+class StockMovementBulkResult(BaseModel):
+    created: int
+    inventories_updated: int
+
+
+class StockTransferCreate(BaseModel):
+    product_id: uuid.UUID
+    variant_id: uuid.UUID | None = None
+    from_warehouse_id: uuid.UUID
+    to_warehouse_id: uuid.UUID
+    quantity: int = Field(..., gt=0)
+    reference: str | None = Field(None, max_length=100)
+
+
+class StockTransferBulkCreate(BaseModel):
+    transfers: List[StockTransferCreate] = Field(..., min_length=1, max_length=1000)
+
+
+class StockTransferOut(BaseModel):
+    reference: str
+    product_id: uuid.UUID
+    variant_id: uuid.UUID | None = None
+    from_inventory_id: uuid.UUID
+    to_inventory_id: uuid.UUID
+    quantity: int
+
+
 class StockMovementOut(StockMovementCreate):
     id: uuid.UUID
     created_at: datetime
@@ -59,3 +97,90 @@ class StockMovementWithMeta(BaseModel):
     reference: str | None = None
     amount: Decimal | None = None
     created_at: datetime
+
+
+class InventoryAsOfOut(BaseModel):
+    inventory_id: uuid.UUID
+    product_id: uuid.UUID
+    variant_id: uuid.UUID | None
+    warehouse_id: uuid.UUID
+    balance: int
+    snapshot_taken_at: datetime | None = None
+
+    model_config = {"from_attributes": True}
+
+
+class SnapshotCompactionResult(BaseModel):
+    created: int
+    pruned: int
+
+
+class InventoryDrift(BaseModel):
+    inventory_id: uuid.UUID
+    warehouse_id: uuid.UUID
+    available: int
+    reserved: int
+    expected_available: int
+    expected_reserved: int
+
+
+class ReconciliationPartition(BaseModel):
+    warehouse_id: uuid.UUID
+    inventories_checked: int
+    movements_scanned: int
+    drifted: int
+    repaired: int
+    elapsed_ms: float
+
+
+class ReconciliationReport(BaseModel):
+    inventories_checked: int
+    movements_scanned: int
+    drifted: int
+    repaired: int
+    elapsed_ms: float
+    partitions: List[ReconciliationPartition]
+    drift: List[InventoryDrift]
+
+
+class StockThresholdCreate(BaseModel):
+    product_id: uuid.UUID
+    warehouse_id: uuid.UUID
+    min_available: int = Field(..., ge=0)
+
+
+class StockThresholdOut(StockThresholdCreate):
+    id: uuid.UUID
+    is_below: bool
+
+    model_config = {"from_attributes": True}
+
+
+class StockAlertOut(BaseModel):
+    id: uuid.UUID
+    threshold_id: uuid.UUID
+    product_id: uuid.UUID
+    warehouse_id: uuid.UUID
+    kind: StockAlertKind
+    available: int
+    min_available: int
+    created_at: datetime
+
+    model_config = {"from_attributes": True}
+
+
+class StockOverviewWarehouse(BaseModel):
+    warehouse_id: uuid.UUID
+    warehouse_name: str
+    available: int
+    reserved: int
+    last_movement_at: datetime | None = None
+
+
+class StockOverviewProduct(BaseModel):
+    product_id: uuid.UUID
+    product_name: str
+    available: int
+    reserved: int
+    last_movement_at: datetime | None = None
+    warehouses: List[StockOverviewWarehouse]
@@ -0,0 +1,121 @@
+import uuid
+from datetime import datetime
+from typing import Iterable, Optional
+
+from sqlalchemy import and_, func, select, update
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.models.stock import Inventory, StockAlert, StockAlertKind, StockThreshold
+from app.services.striping import stripe_totals
+
+
+async def check_thresholds(
+    db: AsyncSession, inventory_ids: Iterable[uuid.UUID]
+) -> list[StockAlert]:
+    """Evalúa solo los umbrales de los inventarios tocados y registra los cruces; no hace commit."""
+    inventory_ids = list(inventory_ids)
+    if not inventory_ids:
+        return []
+    affected = (
+        select(StockThreshold.id)
+        .join(
+            Inventory,
+            and_(
+                Inventory.product_id == StockThreshold.product_id,
+                Inventory.warehouse_id == StockThreshold.warehouse_id,
+            ),
+        )
+        .where(Inventory.id.in_(inventory_ids))
+    )
+    totals = stripe_totals()
+    stmt = (
+        select(
+            StockThreshold.id,
+            StockThreshold.product_id,
+            StockThreshold.warehouse_id,
+            StockThreshold.min_available,
+            StockThreshold.is_below,
+            func.sum(Inventory.available + func.coalesce(totals.c.available, 0)).label("available"),
+        )
+        .join(
+            Inventory,
+            and_(
+                Inventory.product_id == StockThreshold.product_id,
+                Inventory.warehouse_id == StockThreshold.warehouse_id,
+            ),
+        )
+        .outerjoin(totals, totals.c.inventory_id == Inventory.id)
+        .where(StockThreshold.id.in_(affected))
+        .group_by(
+            StockThreshold.id,
+            StockThreshold.product_id,
+            StockThreshold.warehouse_id,
+            StockThreshold.min_available,
+            StockThreshold.is_below,
+        )
+    )
+    alerts: list[StockAlert] = []
+    for row in (await db.execute(stmt)).all():
+        below = row.available < row.min_available
+        if below == bool(row.is_below):
+            continue
+        # UPDATE condicional: si dos escrituras cruzan a la vez, solo una emite la alerta
+        flipped = await db.execute(
+            update(StockThreshold)
+            .where(StockThreshold.id == row.id, StockThreshold.is_below.is_(not below))
+            .values(is_below=below)
+            .returning(StockThreshold.id)
+            .execution_options(synchronize_session=False)
+        )
+        if flipped.first() is None:
+            continue
+        alert = StockAlert(
+            threshold_id=row.id,
+            product_id=row.product_id,
+            warehouse_id=row.warehouse_id,
+            kind=StockAlertKind.low if below else StockAlertKind.recovered,
+            available=row.available,
+            min_available=row.min_available,
+        )
+        db.add(alert)
+        alerts.append(alert)
+    return alerts
+
+
+async def set_threshold(
+    db: AsyncSession, product_id: uuid.UUID, warehouse_id: uuid.UUID, min_available: int
+) -> StockThreshold:
+    result = await db.execute(
+        select(StockThreshold).where(
+            StockThreshold.product_id == product_id, StockThreshold.warehouse_id == warehouse_id
+        )
+    )
+    threshold = result.scalars().first()
+    if threshold:
+        threshold.min_available = min_available
+    else:
+        threshold = StockThreshold(
+            product_id=product_id,
+            warehouse_id=warehouse_id,
+            min_available=min_available,
+            is_below=False,
+        )
+        db.add(threshold)
+    await db.flush()
+    in_warehouse = select(Inventory.id).where(
+        Inventory.product_id == product_id, Inventory.warehouse_id == warehouse_id
+    )
+    inventory_ids = (await db.execute(in_warehouse)).scalars().all()
+    await check_thresholds(db, inventory_ids)
+    await db.commit()
+    await db.refresh(threshold)
+    return threshold
+
+
+async def list_alerts(
+    db: AsyncSession, since: Optional[datetime] = None, limit: int = 100
+) -> list[StockAlert]:
+    stmt = select(StockAlert).order_by(StockAlert.created_at, StockAlert.id).limit(limit)
+    if since:
+        stmt = stmt.where(StockAlert.created_at > since)
+    return list((await db.execute(stmt)).scalars().all())
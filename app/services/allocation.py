@@ -0,0 +1,200 @@
+import uuid
+from collections import defaultdict
+from itertools import combinations
+from typing import Iterable, NamedTuple, Optional
+
+from sqlalchemy import and_, func, or_, select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.models.stock import Inventory
+from app.schemas.order import AllocationPick, AllocationPlan, AllocationShortage
+from app.services.striping import stripe_totals
+
+# Hasta este número de depósitos candidatos se busca el mínimo exacto; por encima, set cover greedy
+MAX_EXACT_WAREHOUSES = 12
+
+# (product_id, variant_id): un item sin variante solo consume inventario sin variante
+StockKey = tuple[uuid.UUID, Optional[uuid.UUID]]
+
+
+class InventoryStock(NamedTuple):
+    id: uuid.UUID
+    product_id: uuid.UUID
+    variant_id: Optional[uuid.UUID]
+    warehouse_id: uuid.UUID
+    stripe_count: int
+    available: int
+
+
+def stock_key(item) -> StockKey:
+    return (item.product_id, item.variant_id)
+
+
+def variant_filter(keys: Iterable[StockKey]):
+    # Igualdad sobre los dos primeros campos de ix_inventories_product_variant_warehouse por clave
+    return or_(
+        *(
+            and_(
+                Inventory.product_id == product_id,
+                Inventory.variant_id.is_(None)
+                if variant_id is None
+                else Inventory.variant_id == variant_id,
+            )
+            for product_id, variant_id in keys
+        )
+    )
+
+
+async def load_inventories(db: AsyncSession, keys: Iterable[StockKey]) -> list[InventoryStock]:
+    """Stock por inventario para las claves pedidas, en una sola consulta y sin locks.
+
+    Una variante sin inventario propio en ningún depósito consume el inventario del producto sin
+    variante (así se cargó el stock antes de separarlo por variante); esas filas vuelven con el
+    variant_id pedido para que el plan las asigne a la clave correcta.
+    """
+    keys = list(keys)
+    if not keys:
+        return []
+    fallbacks = {(product_id, None) for product_id, variant_id in keys if variant_id is not None}
+    # Stock total por inventario (fila principal + stripes); la reserva descuenta después
+    # con UPDATE condicionales
+    totals = stripe_totals()
+    stmt = (
+        select(
+            Inventory.id,
+            Inventory.product_id,
+            Inventory.variant_id,
+            Inventory.warehouse_id,
+            Inventory.stripe_count,
+            (Inventory.available + func.coalesce(totals.c.available, 0)).label("available"),
+        )
+        .outerjoin(totals, totals.c.inventory_id == Inventory.id)
+        .where(variant_filter(set(keys) | fallbacks))
+        .order_by(Inventory.id)
+    )
+    rows = [InventoryStock(*row) for row in (await db.execute(stmt)).all()]
+    stocked = {stock_key(row) for row in rows}
+    wanted = set(keys)
+    inventories = [row for row in rows if stock_key(row) in wanted]
+    # Si el mismo pedido trae también el producto sin variante, el plan ve ese stock dos veces;
+    # take_stock descuenta con UPDATE condicional, así que a lo sumo la reserva falla, no sobrevende
+    for product_id, variant_id in wanted:
+        if variant_id is None or (product_id, variant_id) in stocked:
+            continue
+        inventories += [
+            row._replace(variant_id=variant_id)
+            for row in rows
+            if row.product_id == product_id and row.variant_id is None
+        ]
+    return inventories
+
+
+def _covers(
+    warehouses: Iterable[uuid.UUID],
+    stock: dict[uuid.UUID, dict[StockKey, int]],
+    demand: dict[StockKey, int],
+) -> bool:
+    return all(sum(stock[w].get(p, 0) for w in warehouses) >= qty for p, qty in demand.items())
+
+
+def _greedy_cover(
+    candidates: list[uuid.UUID],
+    stock: dict[uuid.UUID, dict[StockKey, int]],
+    demand: dict[StockKey, int],
+) -> list[uuid.UUID]:
+    remaining = dict(demand)
+    chosen: list[uuid.UUID] = []
+    pool = list(candidates)
+    while pool and any(qty > 0 for qty in remaining.values()):
+        best = max(
+            pool, key=lambda w: sum(min(stock[w].get(p, 0), qty) for p, qty in remaining.items())
+        )
+        gain = {p: min(stock[best].get(p, 0), qty) for p, qty in remaining.items()}
+        if not any(gain.values()):
+            break
+        chosen.append(best)
+        pool.remove(best)
+        remaining = {p: qty - gain[p] for p, qty in remaining.items()}
+    return chosen
+
+
+def _select_warehouses(
+    candidates: list[uuid.UUID],
+    stock: dict[uuid.UUID, dict[StockKey, int]],
+    demand: dict[StockKey, int],
+) -> Optional[list[uuid.UUID]]:
+    if not _covers(candidates, stock, demand):
+        return None
+    if len(candidates) > MAX_EXACT_WAREHOUSES:
+        return _greedy_cover(candidates, stock, demand)
+    # candidates viene ordenado (preferido primero): a igual tamaño gana el subconjunto con él
+    for size in range(1, len(candidates) + 1):
+        for subset in combinations(candidates, size):
+            if _covers(subset, stock, demand):
+                return list(subset)
+    return None
+
+
+def plan_allocation(
+    demand: dict[StockKey, int],
+    inventories: Iterable[Inventory | InventoryStock],
+    preferred_warehouse_id: Optional[uuid.UUID] = None,
+) -> AllocationPlan:
+    """Reparte la demanda por producto y variante tocando la menor cantidad de depósitos posible."""
+    demand = {key: qty for key, qty in demand.items() if qty > 0}
+    inventories = [
+        inv for inv in inventories if stock_key(inv) in demand and (inv.available or 0) > 0
+    ]
+    stock: dict[uuid.UUID, dict[StockKey, int]] = defaultdict(lambda: defaultdict(int))
+    for inv in inventories:
+        stock[inv.warehouse_id][stock_key(inv)] += inv.available
+
+    candidates = sorted(
+        stock,
+        key=lambda w: (
+            w != preferred_warehouse_id,
+            -sum(min(stock[w].get(p, 0), q) for p, q in demand.items()),
+            str(w),
+        ),
+    )
+    selected = _select_warehouses(candidates, stock, demand)
+    feasible = selected is not None
+    allowed = set(selected if feasible else candidates)
+
+    picks: list[AllocationPick] = []
+    shortages: list[AllocationShortage] = []
+    for key, quantity in demand.items():
+        product_id, variant_id = key
+        remaining = quantity
+        sources = sorted(
+            (inv for inv in inventories if stock_key(inv) == key and inv.warehouse_id in allowed),
+            key=lambda inv: (
+                inv.warehouse_id != preferred_warehouse_id,
+                -stock[inv.warehouse_id][key],
+                -inv.available,
+                str(inv.id),
+            ),
+        )
+        for inv in sources:
+            if remaining == 0:
+                break
+            take = min(inv.available, remaining)
+            picks.append(
+                AllocationPick(
+                    inventory_id=inv.id,
+                    warehouse_id=inv.warehouse_id,
+                    product_id=product_id,
+                    variant_id=variant_id,
+                    quantity=take,
+                )
+            )
+            remaining -= take
+        if remaining:
+            shortages.append(
+                AllocationShortage(product_id=product_id, variant_id=variant_id, quantity=remaining)
+            )
+
+    used = list(dict.fromkeys(pick.warehouse_id for pick in picks))
+    return AllocationPlan(
+        feasible=feasible and not shortages, warehouse_ids=used, picks=picks, shortages=shortages
+    )
@@ -0,0 +1,105 @@
+import uuid
+from datetime import datetime, timedelta
+from typing import Optional
+
+from sqlalchemy import delete, insert, select
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import selectinload
+
+from app.models.order import (
+    ArchivedOrder,
+    ArchivedOrderItem,
+    Order,
+    OrderItem,
+    OrderReturn,
+    OrderStatus,
+    order_items_archive,
+    order_returns_archive,
+    orders_archive,
+)
+
+CLOSED_STATUSES = (OrderStatus.returned, OrderStatus.cancelled)
+ARCHIVE_BATCH_SIZE = 500
+
+_orders = Order.__table__
+_items = OrderItem.__table__
+_returns = OrderReturn.__table__
+
+
+def _copy(target, source, ids):
+    # INSERT ... SELECT: las filas pasan de tabla a tabla sin viajar a Python
+    names = [c.name for c in source.columns]
+    key = source.c.id if source is _orders else source.c.order_id
+    return insert(target).from_select(
+        names, select(*(source.c[name] for name in names)).where(key.in_(ids))
+    )
+
+
+async def archive_closed_orders(
+    db: AsyncSession,
+    older_than_days: int,
+    batch_size: int = ARCHIVE_BATCH_SIZE,
+    now: Optional[datetime] = None,
+) -> int:
+    """Mueve a *_archive los pedidos devueltos o cancelados sin cambios hace older_than_days."""
+    cutoff = (now or datetime.utcnow()) - timedelta(days=older_than_days)
+    archived = 0
+    while True:
+        ids = (
+            await db.execute(
+                select(Order.id)
+                .where(Order.status.in_(CLOSED_STATUSES), Order.updated_at < cutoff)
+                .order_by(Order.updated_at)
+                .limit(batch_size)
+                .with_for_update(skip_locked=True)
+            )
+        ).scalars().all()
+        if not ids:
+            return archived
+        await db.execute(_copy(orders_archive, _orders, ids))
+        await db.execute(_copy(order_items_archive, _items, ids))
+        await db.execute(_copy(order_returns_archive, _returns, ids))
+        await db.execute(
+            delete(OrderReturn)
+            .where(OrderReturn.order_id.in_(ids))
+            .execution_options(synchronize_session=False)
+        )
+        await db.execute(
+            delete(OrderItem)
+            .where(OrderItem.order_id.in_(ids))
+            .execution_options(synchronize_session=False)
+        )
+        await db.execute(
+            delete(Order).where(Order.id.in_(ids)).execution_options(synchronize_session=False)
+        )
+        # Commit por lote: transacciones cortas y locks acotados
+        await db.commit()
+        archived += len(ids)
+        if len(ids) < batch_size:
+            return archived
+
+
+def _archived_load_options():
+    items = selectinload(ArchivedOrder.items)
+    return (
+        items.selectinload(ArchivedOrderItem.product),
+        items.selectinload(ArchivedOrderItem.variant),
+    )
+
+
+async def list_archived_orders(
+    db: AsyncSession, user_id: Optional[uuid.UUID] = None
+) -> list[ArchivedOrder]:
+    stmt = select(ArchivedOrder).options(*_archived_load_options())
+    if user_id:
+        stmt = stmt.where(ArchivedOrder.user_id == user_id)
+    return list(
+        (await db.execute(stmt.order_by(ArchivedOrder.created_at.desc()))).scalars().unique().all()
+    )
+
+
+async def get_archived_order(db: AsyncSession, order_id: uuid.UUID) -> Optional[ArchivedOrder]:
+    result = await db.execute(
+        select(ArchivedOrder).options(*_archived_load_options()).where(ArchivedOrder.id == order_id)
+    )
+    return result.scalars().first()
@@ -11,6 +11,7 @@ from app.models.cart import Cart, CartItem
 from app.models.catalog import Product, ProductVariant
 from app.models.shared import DeliveryMethod
 from app.schemas.cart import CartItemCreate
+from app.services.holds import place_holds, refresh_holds, release_holds
 
 
 def calculate_days(event_start: Optional[date], event_end: Optional[date], fallback: int = 1) -> int:
@@ -37,7 +38,13 @@ async def create_cart(db: AsyncSession, session_token: str, user_id: Optional[uu
     return cart
 
 
-async def add_item(db: AsyncSession, cart: Cart, payload: CartItemCreate) -> Cart:
+async def add_item(
+    db: AsyncSession,
+    cart: Cart,
+    payload: CartItemCreate,
+    hold_minutes: int = 0,
+    preferred_warehouse_id: Optional[uuid.UUID] = None,
+) -> Cart:
     product = await db.get(Product, payload.product_id)
     if not product:
         raise ValueError("Product not found")
@@ -56,16 +63,41 @@ async def add_item(db: AsyncSession, cart: Cart, payload: CartItemCreate) -> Car
         units_per_box=product.units_per_box,
     )
     db.add(item)
+    if hold_minutes:
+        await db.flush()
+        try:
+            await place_holds(db, item, hold_minutes, preferred_warehouse_id)
+        except ValueError:
+            await db.rollback()
+            raise
+        await refresh_holds(db, cart.id, hold_minutes)
     await db.commit()
     await db.refresh(cart)
     return cart
 
 
-async def update_item(db: AsyncSession, item: CartItem, quantity: Optional[int] = None, days: Optional[int] = None) -> CartItem:
-    if quantity is not None:
+async def update_item(
+    db: AsyncSession,
+    item: CartItem,
+    quantity: Optional[int] = None,
+    days: Optional[int] = None,
+    hold_minutes: int = 0,
+    preferred_warehouse_id: Optional[uuid.UUID] = None,
+) -> CartItem:
+    if quantity is not None and quantity != item.quantity:
         item.quantity = quantity
+        if hold_minutes:
+            # Se rehace el hold completo con la nueva cantidad
+            try:
+                await release_holds(db, cart_item_id=item.id)
+                await place_holds(db, item, hold_minutes, preferred_warehouse_id)
+            except ValueError:
+                await db.rollback()
+                raise
     if days is not None:
         item.days = days
+    if hold_minutes:
+        await refresh_holds(db, item.cart_id, hold_minutes)
     await db.commit()
     await db.refresh(item)
     return item
@@ -92,6 +124,8 @@ async def merge_carts(db: AsyncSession, user_cart: Cart, guest_cart: Cart) -> Ca
                     units_per_box=guest_item.units_per_box,
                 )
             )
+    # Los holds del carrito invitado se devuelven; los items fusionados se retienen al editarlos
+    await release_holds(db, cart_id=guest_cart.id)
     await db.delete(guest_cart)
     await db.commit()
     refreshed = (
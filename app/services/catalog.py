@@ -1,12 +1,14 @@
 from typing import List, Optional
 
-from sqlalchemy import Select, func, or_, select
+from sqlalchemy import Select, or_, select
 from sqlalchemy.orm import selectinload
 from sqlalchemy.ext.asyncio import AsyncSession
 
 from app.models.catalog import Category, Product, ProductVariant, Tag, product_tag_table
 from app.models.stock import Inventory
 from app.schemas.catalog import ProductCreate, ProductUpdate
+from app.services.config import commit_config_change
+from app.services.striping import striped_available
 
 
 async def create_category(db: AsyncSession, name: str, description: str | None = None) -> Category:
@@ -25,6 +27,14 @@ async def create_tag(db: AsyncSession, name: str) -> Tag:
     return tag
 
 
+async def _commit_product(db: AsyncSession, category_changed: bool) -> None:
+    # El plan de precios compila producto -> categoría: si cambia la categoría hay que recompilarlo
+    if category_changed:
+        await commit_config_change(db, "catalog")
+    else:
+        await db.commit()
+
+
 async def create_product(db: AsyncSession, payload: ProductCreate) -> Product:
     product = Product(
         name=payload.name,
@@ -46,7 +56,7 @@ async def create_product(db: AsyncSession, payload: ProductCreate) -> Product:
     if payload.tag_ids:
         tags = await db.execute(select(Tag).where(Tag.id.in_(payload.tag_ids)))
         product.tags = list(tags.scalars())
-    await db.commit()
+    await _commit_product(db, payload.category_id is not None)
     await db.refresh(product, attribute_names=["variants", "tags"])
     return product
 
@@ -66,7 +76,7 @@ async def update_product(db: AsyncSession, product: Product, payload: ProductUpd
             product.tags = list(tags.scalars())
             continue
         setattr(product, field, value)
-    await db.commit()
+    await _commit_product(db, "category_id" in payload.model_fields_set)
     await db.refresh(product, attribute_names=["variants", "tags"])
     return product
 
@@ -101,6 +111,12 @@ async def list_products(
     if max_price is not None:
         query = query.where(Product.base_price <= max_price)
     if only_available:
-        query = query.join(Inventory).group_by(Product.id).having(func.sum(Inventory.available) > 0)
+        # EXISTS corta en la primera fila con stock; usa el índice
+        # (product_id, variant_id, warehouse_id)
+        in_stock = select(Inventory.id).where(
+            Inventory.product_id == Product.id,
+            Inventory.available + striped_available(Inventory.id) > 0,
+        )
+        query = query.where(in_stock.exists())
     result = await db.execute(query.order_by(Product.created_at.desc()))
     return list(result.scalars().unique())
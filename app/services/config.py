@@ -1,37 +1,328 @@
+import uuid
+from dataclasses import dataclass, field
+from datetime import date, datetime
+from decimal import Decimal
+from typing import Optional
+
+from sqlalchemy import event as sa_event
 from sqlalchemy import select
 from sqlalchemy.ext.asyncio import AsyncSession
 
-from app.models.config import GuaranteeConfig, LogisticsConfig, Season
+from app.core.money import Money
+from app.models.catalog import Product
+from app.models.config import (
+    ConfigVersion,
+    GuaranteeConfig,
+    LogisticsConfig,
+    PricingRule,
+    PricingRuleKind,
+    Season,
+)
+from app.services import realtime
+from app.services.pricing_rules import EMPTY_PLAN, PricingPlan, PricingRuleSnapshot
+from app.services.seasons import SeasonIndex
 
+CONFIG_TOPIC = "config"
 
-async def upsert_logistics(db: AsyncSession, payload: LogisticsConfig) -> LogisticsConfig:
-    db.add(payload)
+
+@dataclass(frozen=True)
+class LogisticsSnapshot:
+    id: uuid.UUID
+    base_fee: Money
+    hourly_vehicle_fee: Money
+    default_tolls: Money
+    notes: Optional[str]
+    updated_at: datetime
+
+
+@dataclass(frozen=True)
+class GuaranteeSnapshot:
+    id: uuid.UUID
+    percentage: Decimal
+    apply_tax: bool
+    tax_rate: Decimal
+    updated_at: datetime
+
+
+@dataclass(frozen=True)
+class ConfigVersionSnapshot:
+    id: uuid.UUID
+    effective_from: datetime
+    logistics: LogisticsSnapshot
+    guarantee: GuaranteeSnapshot
+
+
+@dataclass(frozen=True)
+class SeasonSnapshot:
+    id: uuid.UUID
+    name: str
+    start_date: date
+    end_date: date
+    high_season: bool
+    deposit_ratio: Decimal
+
+
+@dataclass(frozen=True)
+class PricingConfig:
+    """Foto inmutable de la configuración de precios; version cambia con cada recarga.
+
+    config_version_id identifica la versión persistida de logística y garantía, la que queda en el
+    pedido.
+    """
+
+    version: int
+    logistics: LogisticsSnapshot
+    guarantee: GuaranteeSnapshot
+    seasons: tuple[SeasonSnapshot, ...]
+    season_index: SeasonIndex = field(compare=False, repr=False)
+    plan: PricingPlan = field(default=EMPTY_PLAN, compare=False, repr=False)
+    config_version_id: Optional[uuid.UUID] = None
+
+
+class PricingConfigCache:
+    def __init__(self):
+        self._snapshot: Optional[PricingConfig] = None
+        self._generation = 0
+        self._version = 0
+        self._season_index: Optional[SeasonIndex] = None
+        self._indexed_seasons: tuple[SeasonSnapshot, ...] = ()
+        self._plan = EMPTY_PLAN
+        self._plan_source: tuple = ((), frozenset(), ())
+
+    def invalidate(self, event=None) -> None:
+        self._generation += 1
+        self._snapshot = None
+
+    async def get(self, db: AsyncSession) -> PricingConfig:
+        snapshot = self._snapshot
+        if snapshot is not None:
+            return snapshot
+        generation = self._generation
+        current, uncommitted = await _current_config_version(db)
+        seasons = tuple(
+            SeasonSnapshot(
+                id=s.id,
+                name=s.name,
+                start_date=s.start_date,
+                end_date=s.end_date,
+                high_season=bool(s.high_season),
+                deposit_ratio=Decimal(s.deposit_ratio or 0),
+            )
+            for s in await list_seasons(db)
+        )
+        # El índice solo se reconstruye si cambiaron las temporadas, no en cada recarga
+        if self._season_index is None or seasons != self._indexed_seasons:
+            self._season_index = SeasonIndex(seasons)
+            self._indexed_seasons = seasons
+        rules = tuple(
+            PricingRuleSnapshot(
+                id=r.id,
+                kind=r.kind,
+                multiplier=Decimal(r.multiplier),
+                threshold=r.threshold,
+                category_id=r.category_id,
+                season_id=r.season_id,
+            )
+            for r in await list_pricing_rules(db)
+        )
+        category_ids = {r.category_id for r in rules if r.category_id}
+        product_categories = {}
+        if category_ids:
+            rows = await db.execute(
+                select(Product.id, Product.category_id).where(Product.category_id.in_(category_ids))
+            )
+            product_categories = dict(rows.all())
+        # El plan compilado se reutiliza mientras no cambien reglas, productos ni temporadas
+        plan_source = (rules, frozenset(product_categories.items()), seasons)
+        if plan_source != self._plan_source:
+            self._plan = PricingPlan(rules, product_categories, seasons)
+            self._plan_source = plan_source
+        self._version += 1
+        snapshot = PricingConfig(
+            version=self._version,
+            logistics=current.logistics,
+            guarantee=current.guarantee,
+            seasons=seasons,
+            season_index=self._season_index,
+            plan=self._plan,
+            config_version_id=current.id,
+        )
+        # Si llegó una invalidación mientras se cargaba, o la versión aún no tiene commit y puede
+        # deshacerse, la foto se usa pero no se guarda
+        if generation == self._generation and not uncommitted:
+            self._snapshot = snapshot
+        return snapshot
+
+
+pricing_config_cache = PricingConfigCache()
+# Cambios hechos por cualquier worker llegan por el broker de realtime (LISTEN/NOTIFY en Postgres)
+realtime.hub.add_listener(CONFIG_TOPIC, pricing_config_cache.invalidate)
+
+
+async def get_pricing_config(db: AsyncSession) -> PricingConfig:
+    return await pricing_config_cache.get(db)
+
+
+async def commit_config_change(db: AsyncSession, section: str) -> None:
+    # La invalidación viaja con la transacción: los demás workers solo la reciben si hace commit
+    await realtime.publish(db, CONFIG_TOPIC, [{"section": section}])
     await db.commit()
+    pricing_config_cache.invalidate()
+
+
+# Versión creada por get_current_config_version que espera el commit del llamador
+_UNCOMMITTED_KEY = "config_version_uncommitted"
+
+
+def _forget_uncommitted(session) -> None:
+    session.info.pop(_UNCOMMITTED_KEY, None)
+
+
+# Las versiones no cambian nunca: una vez leídas quedan en memoria por id sin invalidación
+_config_versions: dict[uuid.UUID, ConfigVersionSnapshot] = {}
+
+
+async def _load_config_versions(
+    db: AsyncSession, *criteria, limit: Optional[int] = None
+) -> list[ConfigVersionSnapshot]:
+    stmt = (
+        select(ConfigVersion.id, ConfigVersion.effective_from, LogisticsConfig, GuaranteeConfig)
+        .join(LogisticsConfig, LogisticsConfig.id == ConfigVersion.logistics_id)
+        .join(GuaranteeConfig, GuaranteeConfig.id == ConfigVersion.guarantee_id)
+        .where(*criteria)
+        .order_by(ConfigVersion.effective_from.desc(), ConfigVersion.id.desc())
+        .limit(limit)
+    )
+    versions = []
+    for version_id, effective_from, logistics, guarantee in (await db.execute(stmt)).all():
+        snapshot = _config_versions.get(version_id)
+        if snapshot is None:
+            snapshot = ConfigVersionSnapshot(
+                id=version_id,
+                effective_from=effective_from,
+                logistics=LogisticsSnapshot(
+                    id=logistics.id,
+                    base_fee=Money.of(logistics.base_fee or 0),
+                    hourly_vehicle_fee=Money.of(logistics.hourly_vehicle_fee or 0),
+                    default_tolls=Money.of(logistics.default_tolls or 0),
+                    notes=logistics.notes,
+                    updated_at=logistics.updated_at,
+                ),
+                guarantee=GuaranteeSnapshot(
+                    id=guarantee.id,
+                    percentage=Decimal(guarantee.percentage or 0),
+                    apply_tax=bool(guarantee.apply_tax),
+                    tax_rate=Decimal(guarantee.tax_rate or 0),
+                    updated_at=guarantee.updated_at,
+                ),
+            )
+            _config_versions[version_id] = snapshot
+        versions.append(snapshot)
+    return versions
+
+
+async def get_config_version(
+    db: AsyncSession, version_id: uuid.UUID
+) -> Optional[ConfigVersionSnapshot]:
+    snapshot = _config_versions.get(version_id)
+    if snapshot is not None:
+        return snapshot
+    versions = await _load_config_versions(db, ConfigVersion.id == version_id)
+    return versions[0] if versions else None
+
+
+async def get_config_version_at(
+    db: AsyncSession, moment: datetime
+) -> Optional[ConfigVersionSnapshot]:
+    """Versión vigente en un momento dado (p. ej. para un pedido anterior a config_version_id)."""
+    version_id = (
+        await db.execute(
+            select(ConfigVersion.id)
+            .where(ConfigVersion.effective_from <= moment)
+            .order_by(ConfigVersion.effective_from.desc(), ConfigVersion.id.desc())
+            .limit(1)
+        )
+    ).scalar_one_or_none()
+    return await get_config_version(db, version_id) if version_id else None
+
+
+async def list_config_versions(db: AsyncSession, limit: int = 100) -> list[ConfigVersionSnapshot]:
+    return await _load_config_versions(db, limit=limit)
+
+
+async def _current_config_version(db: AsyncSession) -> tuple[ConfigVersionSnapshot, bool]:
+    """Versión vigente y si todavía no tiene commit (se creó en esta transacción).
+
+    Una base sin versión (el seed la crea al arrancar) recibe una con valores por defecto, solo con
+    flush: el commit es del llamador, que puede estar a mitad de un pedido.
+    """
+    # Una lectura por índice para el id vigente; logística y garantía salen de la caché por id
+    version_id = (
+        await db.execute(select(ConfigVersion.id).where(ConfigVersion.is_current.is_(True)))
+    ).scalar_one_or_none()
+    if version_id is None:
+        version_id = (await _append_config_version(db)).id
+        db.info[_UNCOMMITTED_KEY] = version_id
+        sa_event.listen(db.sync_session, "after_commit", _forget_uncommitted, once=True)
+    return await get_config_version(db, version_id), db.info.get(_UNCOMMITTED_KEY) == version_id
+
+
+async def get_current_config_version(db: AsyncSession) -> ConfigVersionSnapshot:
+    return (await _current_config_version(db))[0]
+
+
+async def _append_config_version(
+    db: AsyncSession,
+    logistics: Optional[LogisticsConfig] = None,
+    guarantee: Optional[GuaranteeConfig] = None,
+) -> ConfigVersion:
+    """Agrega una versión que reemplaza a la vigente; lo que no se pasa se hereda de ella.
+
+    La vigente se lee con FOR UPDATE: dos cambios simultáneos se serializan y, si uno llega a
+    basarse en un puntero ya movido, el índice único de is_current rechaza el commit en vez de
+    perder un cambio.
+    """
+    locked = select(ConfigVersion).where(ConfigVersion.is_current.is_(True)).with_for_update()
+    current = (await db.execute(locked)).scalars().first()
+    if logistics is None and current is None:
+        logistics = LogisticsConfig()
+    if guarantee is None and current is None:
+        guarantee = GuaranteeConfig()
+    db.add_all([row for row in (logistics, guarantee) if row is not None])
+    if current is not None:
+        # Primero se baja el puntero: el índice único no admite dos versiones vigentes
+        current.is_current = False
+    await db.flush()
+    version = ConfigVersion(
+        logistics_id=logistics.id if logistics is not None else current.logistics_id,
+        guarantee_id=guarantee.id if guarantee is not None else current.guarantee_id,
+        effective_from=datetime.utcnow(),
+        is_current=True,
+    )
+    db.add(version)
+    await db.flush()
+    return version
+
+
+async def upsert_logistics(db: AsyncSession, payload: LogisticsConfig) -> LogisticsConfig:
+    await _append_config_version(db, logistics=payload)
+    await commit_config_change(db, "logistics")
     await db.refresh(payload)
     return payload
 
 
-async def get_logistics(db: AsyncSession) -> LogisticsConfig:
-    result = await db.execute(select(LogisticsConfig).order_by(LogisticsConfig.updated_at.desc()))
-    current = result.scalars().first()
-    if current:
-        return current
-    config = LogisticsConfig()
-    db.add(config)
-    await db.commit()
-    await db.refresh(config)
-    return config
+async def get_logistics(db: AsyncSession) -> LogisticsSnapshot:
+    return (await get_current_config_version(db)).logistics
 
 
 async def set_logistics(db: AsyncSession, base_fee: float, hourly_vehicle_fee: float, default_tolls: float, notes: str | None = None) -> LogisticsConfig:
-    config = await get_logistics(db)
-    config.base_fee = base_fee
-    config.hourly_vehicle_fee = hourly_vehicle_fee
-    config.default_tolls = default_tolls
-    config.notes = notes
-    await db.commit()
-    await db.refresh(config)
-    return config
+    config = LogisticsConfig(
+        base_fee=base_fee,
+        hourly_vehicle_fee=hourly_vehicle_fee,
+        default_tolls=default_tolls,
+        notes=notes,
+    )
+    return await upsert_logistics(db, config)
 
 
 async def list_seasons(db: AsyncSession):
@@ -41,28 +332,55 @@ async def list_seasons(db: AsyncSession):
 
 async def create_season(db: AsyncSession, payload: Season) -> Season:
     db.add(payload)
-    await db.commit()
+    await commit_config_change(db, "seasons")
     await db.refresh(payload)
     return payload
 
 
-async def get_guarantee(db: AsyncSession) -> GuaranteeConfig:
-    result = await db.execute(select(GuaranteeConfig).order_by(GuaranteeConfig.updated_at.desc()))
-    instance = result.scalars().first()
-    if instance:
-        return instance
-    instance = GuaranteeConfig()
-    db.add(instance)
-    await db.commit()
-    await db.refresh(instance)
-    return instance
+async def get_guarantee(db: AsyncSession) -> GuaranteeSnapshot:
+    return (await get_current_config_version(db)).guarantee
 
 
 async def set_guarantee(db: AsyncSession, percentage: float, apply_tax: bool, tax_rate: float) -> GuaranteeConfig:
-    config = await get_guarantee(db)
-    config.percentage = percentage
-    config.apply_tax = apply_tax
-    config.tax_rate = tax_rate
-    await db.commit()
+    config = GuaranteeConfig(percentage=percentage, apply_tax=apply_tax, tax_rate=tax_rate)
+    await _append_config_version(db, guarantee=config)
+    await commit_config_change(db, "guarantee")
     await db.refresh(config)
     return config
+
+
+async def list_pricing_rules(db: AsyncSession) -> list[PricingRule]:
+    # En orden de alta: ante reglas repetidas el plan se queda con la última
+    result = await db.execute(
+        select(PricingRule)
+        .where(PricingRule.active.is_(True))
+        .order_by(PricingRule.created_at, PricingRule.id)
+    )
+    return list(result.scalars().all())
+
+
+# Qué campo necesita cada tipo de regla para poder compilarse
+RULE_TARGETS = {
+    PricingRuleKind.volume_discount: "threshold",
+    PricingRuleKind.duration_curve: "threshold",
+    PricingRuleKind.category_multiplier: "category_id",
+    PricingRuleKind.season_multiplier: "season_id",
+}
+
+
+async def create_pricing_rule(db: AsyncSession, payload: PricingRule) -> PricingRule:
+    target = RULE_TARGETS[payload.kind]
+    if getattr(payload, target) is None:
+        raise ValueError(f"{payload.kind.value} rules require {target}")
+    db.add(payload)
+    await commit_config_change(db, "pricing_rules")
+    await db.refresh(payload)
+    return payload
+
+
+async def deactivate_pricing_rule(db: AsyncSession, rule: PricingRule) -> PricingRule:
+    # Se desactiva en vez de borrar: queda el rastro de qué reglas existieron
+    rule.active = False
+    await commit_config_change(db, "pricing_rules")
+    await db.refresh(rule)
+    return rule
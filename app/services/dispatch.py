@@ -0,0 +1,175 @@
+from collections import defaultdict
+from datetime import date
+from typing import Optional
+
+from sqlalchemy import delete, func, insert, or_, select
+from sqlalchemy.dialects import postgresql, sqlite
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.inspection import inspect
+
+from app.models.order import (
+    DispatchDailyLoad,
+    DispatchLeg,
+    Order,
+    OrderItem,
+    OrderStatus,
+    order_items_archive,
+    orders_archive,
+)
+from app.models.shared import DeliveryMethod
+from app.schemas.order import DispatchDay, DispatchSlotLoad
+
+# Pedidos que ocupan camión, desde que se reservan hasta que se retiran; draft y cancelled
+# no cuentan
+DISPATCH_STATUSES = frozenset(
+    {
+        OrderStatus.pending_reservation,
+        OrderStatus.reservation_confirmed,
+        OrderStatus.ready_for_delivery,
+        OrderStatus.delivered,
+        OrderStatus.returned,
+    }
+)
+LOAD_FIELDS = ("orders", "vehicle_hours", "items", "boxes")
+
+_load = DispatchDailyLoad.__table__
+
+
+def boxes_for(quantity: int, units_per_box: Optional[int]) -> int:
+    return -(-quantity // max(units_per_box or 1, 1))
+
+
+def _legs(order) -> list[tuple[DispatchLeg, date, str]]:
+    legs = [
+        (DispatchLeg.delivery, order.event_start, order.delivery_window),
+        (DispatchLeg.pickup, order.event_end, order.return_window),
+    ]
+    return [(leg, day, window or "") for leg, day, window in legs if day is not None]
+
+
+def _upsert(db: AsyncSession, rows: list[dict]):
+    dialect = postgresql if db.get_bind().dialect.name == "postgresql" else sqlite
+    stmt = dialect.insert(_load).values(rows)
+    # Suma atómica sobre la fila del día: pedidos concurrentes del mismo día no se pisan
+    return stmt.on_conflict_do_update(
+        index_elements=[_load.c.day, _load.c.leg, _load.c.window],
+        set_={name: _load.c[name] + stmt.excluded[name] for name in LOAD_FIELDS},
+    )
+
+
+async def track_dispatch(db: AsyncSession, order: Order, previous: Optional[OrderStatus]) -> None:
+    """Suma o resta el pedido en dispatch_daily_load si el cambio lo mete o lo saca del reparto.
+
+    Va en la misma transacción que el cambio de estado.
+    """
+    if order.delivery_type != DeliveryMethod.delivery:
+        return
+    sign = (order.status in DISPATCH_STATUSES) - (previous in DISPATCH_STATUSES)
+    legs = _legs(order)
+    if not sign or not legs:
+        return
+    if "items" in inspect(order).unloaded:
+        lines = (
+            await db.execute(
+                select(OrderItem.quantity, OrderItem.units_per_box).where(
+                    OrderItem.order_id == order.id
+                )
+            )
+        ).all()
+    else:
+        lines = [(item.quantity, item.units_per_box) for item in order.items]
+    items = sum(quantity for quantity, _ in lines)
+    boxes = sum(boxes_for(quantity, units_per_box) for quantity, units_per_box in lines)
+    rows = [
+        {
+            "day": day,
+            "leg": leg,
+            "window": window,
+            "orders": sign,
+            "vehicle_hours": sign * (order.logistics_hours or 0),
+            "items": sign * items,
+            "boxes": sign * boxes,
+        }
+        for leg, day, window in legs
+    ]
+    await db.execute(_upsert(db, rows))
+
+
+async def dispatch_board(db: AsyncSession, start: date, end: date) -> list[DispatchDay]:
+    """Tablero de reparto entre start y end leyendo solo la tabla de carga diaria."""
+    result = await db.execute(
+        select(DispatchDailyLoad)
+        .where(DispatchDailyLoad.day.between(start, end), DispatchDailyLoad.orders > 0)
+        .order_by(DispatchDailyLoad.day, DispatchDailyLoad.leg, DispatchDailyLoad.window)
+    )
+    days: dict[date, DispatchDay] = {}
+    for load in result.scalars().all():
+        board = days.get(load.day)
+        if board is None:
+            board = days[load.day] = DispatchDay(
+                day=load.day, orders=0, vehicle_hours=0, items=0, boxes=0, slots=[]
+            )
+        slot = DispatchSlotLoad(
+            leg=load.leg,
+            window=load.window or None,
+            **{name: getattr(load, name) for name in LOAD_FIELDS},
+        )
+        board.slots.append(slot)
+        for name in LOAD_FIELDS:
+            setattr(board, name, getattr(board, name) + getattr(slot, name))
+    return list(days.values())
+
+
+def _order_lines(orders, items, start: date, end: date):
+    boxes = (items.c.quantity + func.coalesce(items.c.units_per_box, 1) - 1) // func.coalesce(
+        items.c.units_per_box, 1
+    )
+    return (
+        select(
+            orders.c.id,
+            orders.c.event_start,
+            orders.c.event_end,
+            orders.c.delivery_window,
+            orders.c.return_window,
+            orders.c.logistics_hours,
+            func.coalesce(func.sum(items.c.quantity), 0).label("items"),
+            func.coalesce(func.sum(boxes), 0).label("boxes"),
+        )
+        .outerjoin(items, items.c.order_id == orders.c.id)
+        .where(
+            orders.c.delivery_type == DeliveryMethod.delivery,
+            orders.c.status.in_(DISPATCH_STATUSES),
+            or_(orders.c.event_start.between(start, end), orders.c.event_end.between(start, end)),
+        )
+        .group_by(orders.c.id)
+    )
+
+
+async def rebuild_dispatch_load(db: AsyncSession, start: date, end: date) -> int:
+    """Recalcula desde pedidos (activos y archivados) las filas de start a end, para repararlas."""
+    totals: dict[tuple, dict[str, int]] = defaultdict(lambda: dict.fromkeys(LOAD_FIELDS, 0))
+    for orders, items in (
+        (Order.__table__, OrderItem.__table__),
+        (orders_archive, order_items_archive),
+    ):
+        for row in (await db.execute(_order_lines(orders, items, start, end))).all():
+            for leg, day, window in _legs(row):
+                if not start <= day <= end:
+                    continue
+                load = totals[(day, leg, window)]
+                load["orders"] += 1
+                load["vehicle_hours"] += row.logistics_hours or 0
+                load["items"] += row.items
+                load["boxes"] += row.boxes
+    await db.execute(delete(DispatchDailyLoad).where(DispatchDailyLoad.day.between(start, end)))
+    if totals:
+        await db.execute(
+            insert(DispatchDailyLoad),
+            [
+                {"day": day, "leg": leg, "window": window, **load}
+                for (day, leg, window), load in totals.items()
+            ],
+        )
+    await db.commit()
+    return len(totals)
+
@@ -0,0 +1,72 @@
+from datetime import datetime, timedelta
+from typing import Optional
+
+from sqlalchemy import func, or_, select
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import selectinload
+
+from app.models.order import Order, OrderStatus
+from app.services.order import apply_status_change
+
+EXPIRY_BATCH_SIZE = 200
+
+
+async def expire_orders(
+    db: AsyncSession,
+    pending_hours: int,
+    overdue_days: int,
+    batch_size: int = EXPIRY_BATCH_SIZE,
+    now: Optional[datetime] = None,
+) -> dict[str, int]:
+    """Cancela reservas sin pagar y cuenta las entregas cuya devolución está vencida.
+
+    Solo se cancelan pedidos en pending_reservation sin cambios hace más de pending_hours o cuyo
+    evento ya empezó; lo confirmado o listo para entregar no se toca. Los entregados cuyo evento
+    terminó hace más de overdue_days se informan en overdue_deliveries y siguen en delivered:
+    cerrarlos necesita el acta de devolución de register_return.
+
+    Trabaja en tandas de batch_size con commit por tanda; las filas se toman con
+    FOR UPDATE SKIP LOCKED, así varios workers pueden barrer a la vez sin pisarse.
+    """
+    now = now or datetime.utcnow()
+    today = now.date()
+    stale_before = now - timedelta(hours=pending_hours)
+    stale = (Order.status == OrderStatus.pending_reservation) & or_(
+        Order.updated_at < stale_before, Order.event_start < today
+    )
+    counts = {"cancelled": 0, "released_units": 0}
+    while True:
+        ids = (
+            await db.execute(
+                select(Order.id)
+                .where(stale)
+                .order_by(Order.id)
+                .limit(batch_size)
+                .with_for_update(skip_locked=True)
+            )
+        ).scalars().all()
+        if not ids:
+            break
+        orders = (
+            await db.execute(
+                select(Order)
+                .options(selectinload(Order.items))
+                .where(Order.id.in_(ids))
+                .execution_options(populate_existing=True)
+            )
+        ).scalars().all()
+        for order in orders:
+            # Las filas siguen bloqueadas desde la selección: siguen en pending_reservation
+            released = await apply_status_change(db, order, OrderStatus.cancelled)
+            counts["cancelled"] += 1
+            counts["released_units"] += sum(released.values())
+        await db.commit()
+        if len(ids) < batch_size:
+            break
+    overdue_before = today - timedelta(days=overdue_days)
+    counts["overdue_deliveries"] = await db.scalar(
+        select(func.count())
+        .select_from(Order)
+        .where(Order.status == OrderStatus.delivered, Order.event_end < overdue_before)
+    )
+    return counts
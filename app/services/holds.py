@@ -0,0 +1,166 @@
+import uuid
+from collections import defaultdict
+from datetime import datetime, timedelta
+from typing import Optional
+
+from sqlalchemy import bindparam, delete, select, update
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.models.cart import Cart, CartItem
+from app.models.order import Order
+from app.models.stock import Inventory, StockHold, StockMovement, StockMovementReason
+from app.services.alerts import check_thresholds
+from app.services.allocation import load_inventories, plan_allocation, stock_key
+from app.services.realtime import publish_inventory_deltas
+from app.services.stock import InsufficientStockError
+from app.services.striping import take_stock
+
+SWEEP_BATCH_SIZE = 500
+
+_inventories = Inventory.__table__
+_return_available = (
+    update(_inventories)
+    .where(_inventories.c.id == bindparam("inventory_id"))
+    .values(available=_inventories.c.available + bindparam("quantity"))
+)
+_add_reserved = (
+    update(_inventories)
+    .where(_inventories.c.id == bindparam("inventory_id"))
+    .values(reserved=_inventories.c.reserved + bindparam("quantity"))
+)
+
+
+async def place_holds(
+    db: AsyncSession,
+    item: CartItem,
+    minutes: int,
+    preferred_warehouse_id: Optional[uuid.UUID] = None,
+) -> list[StockHold]:
+    """Descuenta available para el item y registra los holds; no hace commit."""
+    inventories = await load_inventories(db, [stock_key(item)])
+    plan = plan_allocation({stock_key(item): item.quantity}, inventories, preferred_warehouse_id)
+    if not plan.feasible:
+        raise InsufficientStockError("Insufficient stock for this item")
+    stripe_counts = {inv.id: inv.stripe_count for inv in inventories}
+    expires_at = datetime.utcnow() + timedelta(minutes=minutes)
+    holds = []
+    for pick in plan.picks:
+        if not await take_stock(
+            db, pick.inventory_id, pick.quantity, stripe_counts[pick.inventory_id], reserve=False
+        ):
+            raise InsufficientStockError("Insufficient stock for this item")
+        holds.append(
+            StockHold(
+                cart_id=item.cart_id,
+                cart_item_id=item.id,
+                inventory_id=pick.inventory_id,
+                quantity=pick.quantity,
+                expires_at=expires_at,
+            )
+        )
+    db.add_all(holds)
+    await check_thresholds(db, {hold.inventory_id for hold in holds})
+    await publish_inventory_deltas(
+        db, {pick.inventory_id: (-pick.quantity, 0) for pick in plan.picks}
+    )
+    return holds
+
+
+async def _release(db: AsyncSession, holds) -> int:
+    returned: dict[uuid.UUID, int] = defaultdict(int)
+    for hold in holds:
+        returned[hold.inventory_id] += hold.quantity
+    if not returned:
+        return 0
+    await db.execute(
+        _return_available,
+        [{"inventory_id": inv, "quantity": qty} for inv, qty in sorted(returned.items())],
+    )
+    await db.execute(
+        delete(StockHold)
+        .where(StockHold.id.in_([hold.id for hold in holds]))
+        .execution_options(synchronize_session=False)
+    )
+    await check_thresholds(db, returned)
+    await publish_inventory_deltas(db, {inv: (qty, 0) for inv, qty in returned.items()})
+    return len(holds)
+
+
+async def release_holds(
+    db: AsyncSession, cart_id: Optional[uuid.UUID] = None, cart_item_id: Optional[uuid.UUID] = None
+) -> int:
+    """Devuelve al stock los holds del carrito o del item; no hace commit."""
+    stmt = select(StockHold.id, StockHold.inventory_id, StockHold.quantity).with_for_update()
+    if cart_item_id:
+        stmt = stmt.where(StockHold.cart_item_id == cart_item_id)
+    elif cart_id:
+        stmt = stmt.where(StockHold.cart_id == cart_id)
+    else:
+        raise ValueError("cart_id or cart_item_id required")
+    return await _release(db, (await db.execute(stmt)).all())
+
+
+async def refresh_holds(db: AsyncSession, cart_id: uuid.UUID, minutes: int) -> None:
+    await db.execute(
+        update(StockHold)
+        .where(StockHold.cart_id == cart_id)
+        .values(expires_at=datetime.utcnow() + timedelta(minutes=minutes))
+        .execution_options(synchronize_session=False)
+    )
+
+
+async def convert_holds(db: AsyncSession, cart: Cart, order: Order) -> int:
+    """Pasa los holds del carrito a reserved del pedido sin volver a leer stock; no hace commit."""
+    locked = select(StockHold).where(StockHold.cart_id == cart.id).with_for_update()
+    holds = (await db.execute(locked)).scalars().all()
+    if not holds:
+        return 0
+    reserved: dict[uuid.UUID, int] = defaultdict(int)
+    held_by_item: dict[uuid.UUID, int] = defaultdict(int)
+    for hold in holds:
+        reserved[hold.inventory_id] += hold.quantity
+        held_by_item[hold.cart_item_id] += hold.quantity
+        db.add(
+            StockMovement(
+                inventory_id=hold.inventory_id,
+                quantity_change=-hold.quantity,
+                reason=StockMovementReason.reservation,
+                reference=str(order.code),
+            )
+        )
+    await db.execute(
+        _add_reserved,
+        [{"inventory_id": inv, "quantity": qty} for inv, qty in sorted(reserved.items())],
+    )
+    # Los items del pedido se crean en el mismo orden que los del carrito
+    for cart_item, order_item in zip(cart.items, order.items, strict=True):
+        order_item.reserved_quantity = min(held_by_item.get(cart_item.id, 0), order_item.quantity)
+    await db.execute(
+        delete(StockHold)
+        .where(StockHold.cart_id == cart.id)
+        .execution_options(synchronize_session=False)
+    )
+    await publish_inventory_deltas(db, {inv: (0, qty) for inv, qty in reserved.items()})
+    return len(holds)
+
+
+async def release_expired_holds(
+    db: AsyncSession, batch_size: int = SWEEP_BATCH_SIZE, now: Optional[datetime] = None
+) -> int:
+    now = now or datetime.utcnow()
+    released = 0
+    while True:
+        # SKIP LOCKED permite correr varios sweepers en paralelo sin pisarse
+        batch = (
+            await db.execute(
+                select(StockHold.id, StockHold.inventory_id, StockHold.quantity)
+                .where(StockHold.expires_at < now)
+                .order_by(StockHold.expires_at)
+                .limit(batch_size)
+                .with_for_update(skip_locked=True)
+            )
+        ).all()
+        released += await _release(db, batch)
+        await db.commit()
+        if len(batch) < batch_size:
+            return released
@@ -1,20 +1,33 @@
 import math
 import time
 import uuid
+from collections import defaultdict
 from datetime import date
 from decimal import Decimal
 from typing import Iterable, List, Optional
 
-from sqlalchemy import inspect, select
+from sqlalchemy import bindparam, func, inspect, select, update
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import selectinload
 
+from app.core.money import Money
 from app.models.cart import Cart
 from app.models.config import GuaranteeConfig, LogisticsConfig, Season
 from app.models.order import Order, OrderItem, OrderReturn, OrderStatus
 from app.models.shared import DeliveryMethod
 from app.models.stock import Inventory, StockMovement, StockMovementReason
-from app.schemas.order import OrderReturnCreate
+from app.schemas.order import AllocationPlan, OrderReturnCreate
+from app.services.alerts import check_thresholds
+from app.services.allocation import StockKey, load_inventories, plan_allocation, stock_key
+from app.services.config import PricingConfig, get_pricing_config
+from app.services.dispatch import track_dispatch
+from app.services.holds import convert_holds
+from app.services.pricing_rules import EMPTY_PLAN, PricingPlan
+from app.services.quote_cache import quote_key, quote_memo
+from app.services.realtime import publish_inventory_deltas, publish_order_status
+from app.services.seasons import SeasonIndex, season_priority
+from app.services.slots import book_slot, release_slot
+from app.services.striping import fold_stripes, take_stock
 
 
 def generate_order_code() -> str:
@@ -22,76 +35,122 @@ def generate_order_code() -> str:
 
 
 def overlaps_high_season(event_start: Optional[date], event_end: Optional[date], seasons: Iterable[Season]) -> Optional[Season]:
+    """Recorrido lineal; para muchas temporadas usar SeasonIndex, que aplica la misma regla."""
     if not event_start or not event_end:
         return None
-    for season in seasons:
-        if season.start_date <= event_end and event_start <= season.end_date:
-            if season.high_season:
-                return season
-    return None
+    overlapping = (
+        season
+        for season in seasons
+        if season.high_season and season.start_date <= event_end and event_start <= season.end_date
+    )
+    return min(overlapping, key=season_priority, default=None)
+
+
+def line_prices(cart: Cart, plan: PricingPlan = EMPTY_PLAN) -> list[int]:
+    """Total en centavos de cada línea del carrito, con las reglas de precio del plan aplicadas."""
+    # price_per_day ya es Money (CartItem lo normaliza al asignarlo); sin reglas basta el bruto
+    if not plan.rules:
+        return [item.price_per_day.cents * item.quantity * item.days for item in cart.items]
+    season_factor = plan.season_factor(cart.event_start, cart.event_end)
+    return [
+        plan.line_cents(
+            item.price_per_day.cents,
+            item.quantity,
+            item.days,
+            item.units_per_box,
+            item.product_id,
+            season_factor,
+        )
+        for item in cart.items
+    ]
 
 
 def calculate_totals(
     cart: Cart,
     logistics_config: LogisticsConfig,
     guarantee_config: GuaranteeConfig,
-    seasons: Iterable[Season],
-) -> dict[str, Decimal | int | bool]:
-    subtotal = Decimal("0")
-    guarantee_base = Decimal("0")
+    seasons: Iterable[Season] | SeasonIndex,
+    plan: PricingPlan = EMPTY_PLAN,
+) -> dict[str, Money | int | bool]:
+    """Totales en centavos exactos; los coeficientes (garantía, impuesto, seña) redondean a la par.
+
+    El total es la suma de las partes ya redondeadas y el saldo es total - seña, así lo que se
+    muestra siempre cierra al centavo.
+    """
+    # Por línea se acumulan centavos sueltos; Money se arma una vez por importe. Sin reglas el
+    # bruto se calcula en la misma pasada para leer cada atributo del ORM una sola vez
+    subtotal_cents = 0
+    guarantee_cents = 0
     days = 1
-    for item in cart.items:
-        days = max(days, item.days)
-        line_subtotal = Decimal(item.price_per_day) * item.quantity * item.days
-        subtotal += line_subtotal
+    lines = line_prices(cart, plan) if plan.rules else None
+    for position, item in enumerate(cart.items):
+        item_days = item.days
+        if item_days > days:
+            days = item_days
+        if lines is None:
+            line_cents = item.price_per_day.cents * item.quantity * item_days
+        else:
+            line_cents = lines[position]
+        subtotal_cents += line_cents
         if item.requires_guarantee:
-            guarantee_base += line_subtotal
-    logistics_cost = Decimal(logistics_config.base_fee or 0) + Decimal(logistics_config.default_tolls or 0)
-    logistics_cost += Decimal(logistics_config.hourly_vehicle_fee or 0) * Decimal(cart.logistics_hours or 1)
-    logistics_cost += Decimal(cart.tolls or 0)
+            guarantee_cents += line_cents
+    subtotal = Money(subtotal_cents)
+    guarantee_base = Money(guarantee_cents)
+    hours = cart.logistics_hours or 1
+    logistics_cost = Money.of(logistics_config.base_fee or 0)
+    logistics_cost += Money.of(logistics_config.default_tolls or 0)
+    logistics_cost += Money.of(logistics_config.hourly_vehicle_fee or 0) * hours
+    logistics_cost += Money.of(cart.tolls or 0)
 
-    guarantee_amount = guarantee_base * Decimal(guarantee_config.percentage or 0)
+    guarantee_ratio = Decimal(guarantee_config.percentage or 0)
     if guarantee_config.apply_tax:
-        guarantee_amount *= Decimal(1) + Decimal(guarantee_config.tax_rate or 0)
+        guarantee_ratio *= Decimal(1) + Decimal(guarantee_config.tax_rate or 0)
+    guarantee_amount = guarantee_base.scale(guarantee_ratio)
 
-    season = overlaps_high_season(cart.event_start, cart.event_end, seasons)
-    requires_deposit = season is not None
-    deposit_ratio = Decimal(season.deposit_ratio) if season else Decimal("0")
-    reservation_required = (subtotal + logistics_cost + guarantee_amount) * deposit_ratio if requires_deposit else Decimal("0")
+    if isinstance(seasons, SeasonIndex):
+        season = seasons.winner(cart.event_start, cart.event_end)
+    else:
+        season = overlaps_high_season(cart.event_start, cart.event_end, seasons)
     total = subtotal + logistics_cost + guarantee_amount
-    outstanding_balance = total - reservation_required
+    reservation_required = total.scale(season.deposit_ratio) if season else Money(0)
 
     return {
         "days": days,
-        "subtotal": subtotal.quantize(Decimal("0.01")),
-        "logistics_cost": logistics_cost.quantize(Decimal("0.01")),
-        "guarantee_amount": guarantee_amount.quantize(Decimal("0.01")),
-        "total": total.quantize(Decimal("0.01")),
-        "reservation_required": reservation_required.quantize(Decimal("0.01")),
-        "outstanding_balance": outstanding_balance.quantize(Decimal("0.01")),
-        "requires_guarantee": guarantee_base > 0,
+        "subtotal": subtotal,
+        "logistics_cost": logistics_cost,
+        "guarantee_amount": guarantee_amount,
+        "total": total,
+        "reservation_required": reservation_required,
+        "outstanding_balance": total - reservation_required,
+        "requires_guarantee": guarantee_cents > 0,
         "high_season": bool(season),
     }
 
 
-async def get_singleton(db: AsyncSession, model):
-    result = await db.execute(select(model).order_by(model.updated_at.desc())) if hasattr(model, "updated_at") else await db.execute(select(model))
-    instance = result.scalars().first()
-    if instance:
-        return instance
-    if model is LogisticsConfig:
-        instance = LogisticsConfig(base_fee=0, hourly_vehicle_fee=0, default_tolls=0)
-    elif model is GuaranteeConfig:
-        instance = GuaranteeConfig(percentage=0.15, apply_tax=True, tax_rate=0.21)
-    else:
-        instance = model()
-    db.add(instance)
-    await db.commit()
-    await db.refresh(instance)
-    return instance
+def quote_cart(cart: Cart, config: PricingConfig) -> dict[str, Money | int | bool]:
+    """calculate_totals memoizado por contenido del carrito y versión de la configuración."""
+    key = quote_key(cart, config.version)
+    totals = quote_memo.get(key)
+    if totals is None:
+        totals = calculate_totals(
+            cart, config.logistics, config.guarantee, config.season_index, config.plan
+        )
+        quote_memo.put(key, totals)
+    return totals
+
 
+def _slot_day(day: Optional[date]) -> date:
+    if day is None:
+        raise ValueError("Booking a delivery slot requires event dates")
+    return day
 
-async def create_order_from_cart(db: AsyncSession, cart: Cart) -> Order:
+
+async def create_order_from_cart(
+    db: AsyncSession,
+    cart: Cart,
+    delivery_slot_id: Optional[uuid.UUID] = None,
+    return_slot_id: Optional[uuid.UUID] = None,
+) -> Order:
     if "items" in inspect(cart).unloaded:
         result = await db.execute(select(Cart).options(selectinload(Cart.items)).where(Cart.id == cart.id))
         cart = result.scalars().first() or cart
@@ -102,11 +161,25 @@ async def create_order_from_cart(db: AsyncSession, cart: Cart) -> Order:
     if found:
         return found
 
-    logistics_config = await get_singleton(db, LogisticsConfig)
-    guarantee_config = await get_singleton(db, GuaranteeConfig)
-    seasons = (await db.execute(select(Season))).scalars().all()
+    # Las franjas se toman primero: si alguna está llena no queda nada a medio escribir
+    try:
+        delivery_slot = (
+            await book_slot(db, delivery_slot_id, _slot_day(cart.event_start))
+            if delivery_slot_id
+            else None
+        )
+        return_slot = (
+            await book_slot(db, return_slot_id, _slot_day(cart.event_end))
+            if return_slot_id
+            else None
+        )
+    except ValueError:
+        await db.rollback()
+        raise
 
-    totals = calculate_totals(cart, logistics_config, guarantee_config, seasons)
+    # Foto cacheada: sin consultas de configuración en el camino del checkout
+    config = await get_pricing_config(db)
+    totals = quote_cart(cart, config)
     initial_status = OrderStatus.pending_reservation
     order = Order(
         code=generate_order_code(),
@@ -114,6 +187,10 @@ async def create_order_from_cart(db: AsyncSession, cart: Cart) -> Order:
         user_id=cart.user_id,
         delivery_type=cart.delivery_type,
         delivery_address=cart.delivery_address,
+        delivery_window=delivery_slot.label if delivery_slot else None,
+        return_window=return_slot.label if return_slot else None,
+        delivery_slot_id=delivery_slot_id,
+        return_slot_id=return_slot_id,
         event_start=cart.event_start,
         event_end=cart.event_end,
         days=totals["days"],
@@ -127,6 +204,7 @@ async def create_order_from_cart(db: AsyncSession, cart: Cart) -> Order:
         outstanding_balance=totals["outstanding_balance"],
         requires_guarantee=totals["requires_guarantee"],
         high_season=totals["high_season"],
+        config_version_id=config.config_version_id,
         status=initial_status,
     )
     # Inicializar la relación para evitar lazy loads en async
@@ -134,7 +212,7 @@ async def create_order_from_cart(db: AsyncSession, cart: Cart) -> Order:
     db.add(order)
     await db.flush()
 
-    for item in cart.items:
+    for item, line_cents in zip(cart.items, line_prices(cart, config.plan), strict=True):
         order.items.append(
             OrderItem(
                 product_id=item.product_id,
@@ -142,16 +220,29 @@ async def create_order_from_cart(db: AsyncSession, cart: Cart) -> Order:
                 quantity=item.quantity,
                 days=item.days,
                 unit_price=item.price_per_day,
-                total_price=Decimal(item.price_per_day) * item.quantity * item.days,
+                total_price=Money(line_cents),
                 requires_guarantee=item.requires_guarantee,
                 units_per_box=item.units_per_box,
             )
         )
+    await convert_holds(db, cart, order)
+    await track_dispatch(db, order, None)
+    await publish_order_status(db, order, None)
     await db.commit()
     await db.refresh(order)
     return order
 
 
+_inventories = Inventory.__table__
+_release_reserved = (
+    update(_inventories)
+    .where(_inventories.c.id == bindparam("inventory_id"))
+    .values(
+        available=_inventories.c.available + bindparam("quantity"),
+        reserved=_inventories.c.reserved - bindparam("quantity"),
+    )
+)
+
 ALLOWED_TRANSITIONS = {
     OrderStatus.draft: {OrderStatus.pending_reservation, OrderStatus.cancelled},
     OrderStatus.pending_reservation: {OrderStatus.reservation_confirmed, OrderStatus.cancelled},
@@ -168,9 +259,29 @@ def ensure_transition(current: OrderStatus, new: OrderStatus):
         raise ValueError(f"Cannot transition from {current} to {new}")
 
 
-async def update_order_status(db: AsyncSession, order: Order, new_status: OrderStatus) -> Order:
+async def apply_status_change(
+    db: AsyncSession, order: Order, new_status: OrderStatus
+) -> dict[uuid.UUID, int]:
+    """Transición con sus efectos (franjas, stock reservado, reparto, evento); no hace commit.
+
+    Devuelve lo liberado por inventario.
+    """
     ensure_transition(order.status, new_status)
+    previous = order.status
     order.status = new_status
+    released: dict[uuid.UUID, int] = {}
+    if new_status == OrderStatus.cancelled:
+        await release_slot(db, order.delivery_slot_id, order.event_start)
+        await release_slot(db, order.return_slot_id, order.event_end)
+        # Lo que el checkout convirtió en reserva o tomó confirm-reservation vuelve al stock
+        released = await release_reserved_stock(db, [order])
+    await track_dispatch(db, order, previous)
+    await publish_order_status(db, order, previous)
+    return released
+
+
+async def update_order_status(db: AsyncSession, order: Order, new_status: OrderStatus) -> Order:
+    await apply_status_change(db, order, new_status)
     await db.commit()
     await db.refresh(order)
     return order
@@ -181,41 +292,140 @@ async def register_return(db: AsyncSession, order: Order, payload: OrderReturnCr
     db.add(report)
     adjustment = payload.breakage_cost + payload.missing_cost
     if adjustment > 0:
-        original_guarantee = Decimal(order.guarantee_amount)
-        remaining_guarantee = max(original_guarantee - adjustment, Decimal(0))
-        order.guarantee_amount = remaining_guarantee
+        original_guarantee = order.guarantee_amount
+        order.guarantee_amount = max(original_guarantee - adjustment, Money(0))
         if adjustment > original_guarantee:
-            order.outstanding_balance = Decimal(order.outstanding_balance) + (adjustment - original_guarantee)
+            order.outstanding_balance += adjustment - original_guarantee
+    previous = order.status
     order.status = OrderStatus.returned
+    # Lo devuelto vuelve a estar disponible: misma liberación que al cancelar
+    await release_reserved_stock(db, [order])
+    await track_dispatch(db, order, previous)
+    await publish_order_status(db, order, previous)
     await db.commit()
     await db.refresh(order)
     return order
 
 
-async def reserve_stock(db: AsyncSession, order: Order) -> None:
+def _pending_demand(order: Order) -> dict[StockKey, int]:
+    demand: dict[StockKey, int] = defaultdict(int)
+    for item in order.items:
+        # Lo retenido en el carrito ya se convirtió en reserva durante el checkout
+        pending = item.quantity - (item.reserved_quantity or 0)
+        if pending > 0:
+            demand[stock_key(item)] += pending
+    return demand
+
+
+async def reserve_stock(
+    db: AsyncSession, order: Order, preferred_warehouse_id: Optional[uuid.UUID] = None
+) -> AllocationPlan:
+    demand = _pending_demand(order)
+    if not demand:
+        return AllocationPlan(feasible=True, warehouse_ids=[], picks=[])
+    # Una sola consulta para todo el pedido; el plan se arma en memoria
+    inventories = await load_inventories(db, demand)
+    stocked = {stock_key(inv) for inv in inventories}
+    if any(key not in stocked for key in demand):
+        raise ValueError("No inventory for product")
+    plan = plan_allocation(demand, inventories, preferred_warehouse_id)
+    if not plan.feasible:
+        raise ValueError("Insufficient stock for reservation")
+    stripe_counts = {inv.id: inv.stripe_count for inv in inventories}
+    try:
+        for pick in plan.picks:
+            # UPDATE condicional: si otro pedido se llevó el stock desde el plan, se aborta todo
+            if not await take_stock(
+                db, pick.inventory_id, pick.quantity, stripe_counts[pick.inventory_id]
+            ):
+                raise ValueError("Insufficient stock for reservation")
+            db.add(
+                StockMovement(
+                    inventory_id=pick.inventory_id,
+                    quantity_change=-pick.quantity,
+                    reason=StockMovementReason.reservation,
+                    reference=str(order.code),
+                )
+            )
+    except ValueError:
+        await db.rollback()
+        raise
     for item in order.items:
-        remaining = item.quantity
-        inventories = (await db.execute(select(Inventory).where(Inventory.product_id == item.product_id))).scalars().all()
-        if not inventories:
-            raise ValueError("No inventory for product")
-        for inv in inventories:
-            available = inv.available
-            take = min(available, remaining)
-            inv.available -= take
-            inv.reserved += take
-            db.add(StockMovement(inventory_id=inv.id, quantity_change=-take, reason=StockMovementReason.reservation, reference=str(order.code)))
-            remaining -= take
-            if remaining == 0:
-                break
-        if remaining > 0:
-            raise ValueError("Insufficient stock for reservation")
+        item.reserved_quantity = item.quantity
+    await check_thresholds(db, {pick.inventory_id for pick in plan.picks})
+    await publish_inventory_deltas(
+        db, {pick.inventory_id: (-pick.quantity, pick.quantity) for pick in plan.picks}
+    )
     await db.commit()
+    return plan
+
+
+async def preview_allocation(
+    db: AsyncSession, order: Order, preferred_warehouse_id: Optional[uuid.UUID] = None
+) -> AllocationPlan:
+    demand = _pending_demand(order)
+    inventories = await load_inventories(db, demand)
+    return plan_allocation(demand, inventories, preferred_warehouse_id)
+
+
+async def release_reserved_stock(db: AsyncSession, orders: list[Order]) -> dict[uuid.UUID, int]:
+    """Devuelve a available lo que estos pedidos tienen reservado; no hace commit.
+
+    Lo reservado por pedido sale del ledger: movimientos de reserva con reference = código del
+    pedido (negativos al reservar, positivos al liberar). Así se libera solo lo de estos pedidos y
+    no el reserved completo del inventario, que puede ser de otros.
+    """
+    if not orders:
+        return {}
+    codes = [str(order.code) for order in orders]
+    net = (
+        await db.execute(
+            select(
+                StockMovement.reference,
+                StockMovement.inventory_id,
+                func.sum(StockMovement.quantity_change),
+            )
+            .where(
+                StockMovement.reference.in_(codes),
+                StockMovement.reason == StockMovementReason.reservation,
+                # Las reservas son posteriores al alta del pedido: poda particiones viejas
+                StockMovement.created_at >= min(order.created_at for order in orders),
+            )
+            .group_by(StockMovement.reference, StockMovement.inventory_id)
+        )
+    ).all()
+    released: dict[uuid.UUID, int] = defaultdict(int)
+    for reference, inventory_id, change in net:
+        if change < 0:
+            released[inventory_id] -= change
+            db.add(
+                StockMovement(
+                    inventory_id=inventory_id,
+                    quantity_change=-change,
+                    reason=StockMovementReason.reservation,
+                    reference=reference,
+                )
+            )
+    await db.execute(
+        update(OrderItem)
+        .where(OrderItem.order_id.in_([order.id for order in orders]))
+        .values(reserved_quantity=0)
+    )
+    if not released:
+        return {}
+    # Lo reservado en stripes vuelve primero a la fila principal
+    await fold_stripes(db, list(released), respread=False)
+    await db.execute(
+        _release_reserved,
+        [{"inventory_id": inv, "quantity": qty} for inv, qty in sorted(released.items())],
+    )
+    await check_thresholds(db, list(released))
+    await publish_inventory_deltas(db, {inv: (qty, -qty) for inv, qty in released.items()})
+    # Movimientos escritos: una segunda llamada ya no encuentra reserva neta que liberar
+    await db.flush()
+    return dict(released)
 
 
 async def release_stock(db: AsyncSession, order: Order) -> None:
-    for item in order.items:
-        inventories = (await db.execute(select(Inventory).where(Inventory.product_id == item.product_id))).scalars().all()
-        for inv in inventories:
-            inv.available += inv.reserved
-            inv.reserved = 0
+    await release_reserved_stock(db, [order])
     await db.commit()
@@ -0,0 +1,144 @@
+from datetime import datetime, timedelta, timezone
+from typing import Optional
+
+from sqlalchemy import text
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.services.snapshots import write_snapshots
+
+PARENT = "stock_movements"
+# Recibe los inserts sin partición mensual (migración 0018); ensure_movement_partitions la vacía
+DEFAULT_PARTITION = f"{PARENT}_default"
+MONTHS_AHEAD = 3
+RETAIN_MONTHS = 24
+
+
+def _month_start(value: datetime) -> datetime:
+    return datetime(value.year, value.month, 1)
+
+
+def _add_months(value: datetime, months: int) -> datetime:
+    years, month = divmod(value.month - 1 + months, 12)
+    return value.replace(year=value.year + years, month=month + 1)
+
+
+def partition_name(month: datetime) -> str:
+    return f"{PARENT}_p{month:%Y%m}"
+
+
+def _partition_month(name: str) -> datetime:
+    return datetime.strptime(name.rsplit("_p", 1)[1], "%Y%m")
+
+
+def _is_partitioned(db: AsyncSession) -> bool:
+    # SQLite (tests) no tiene particiones; ahí todo esto es un no-op
+    return db.get_bind().dialect.name == "postgresql"
+
+
+async def attached_partitions(db: AsyncSession) -> list[str]:
+    rows = await db.execute(
+        text(
+            "SELECT c.relname FROM pg_inherits i JOIN pg_class c ON c.oid = i.inhrelid "
+            "WHERE i.inhparent = CAST(:parent AS regclass) AND c.relname <> :default "
+            "ORDER BY c.relname"
+        ),
+        {"parent": PARENT, "default": DEFAULT_PARTITION},
+    )
+    return list(rows.scalars().all())
+
+
+async def _default_partition_months(db: AsyncSession) -> set[datetime]:
+    rows = await db.execute(
+        text(
+            "SELECT DISTINCT date_trunc('month', created_at AT TIME ZONE 'UTC') "
+            f"FROM {DEFAULT_PARTITION}"
+        )
+    )
+    return set(rows.scalars().all())
+
+
+async def ensure_movement_partitions(
+    db: AsyncSession, months_ahead: int = MONTHS_AHEAD, now: Optional[datetime] = None
+) -> list[str]:
+    """Crea las particiones mensuales del mes actual y los months_ahead siguientes que falten.
+
+    También crea la de cada mes con filas en la partición DEFAULT (inserts de cuando el job no
+    corrió a tiempo) y mueve esas filas a su mes antes de adjuntarla.
+    """
+    if not _is_partitioned(db):
+        return []
+    # Frena los inserts en DEFAULT mientras se vacía y serializa workers que arrancan a la vez
+    await db.execute(text(f"LOCK TABLE {DEFAULT_PARTITION} IN SHARE ROW EXCLUSIVE MODE"))
+    current = _month_start(now or datetime.utcnow())
+    months = {_add_months(current, offset) for offset in range(months_ahead + 1)}
+    months |= await _default_partition_months(db)
+    existing = set(await attached_partitions(db))
+    created = []
+    for start in sorted(months):
+        name = partition_name(start)
+        if name in existing:
+            continue
+        end = _add_months(start, 1)
+        # DDL sin parámetros: nombre y límites salen de fechas, no de input externo
+        await db.execute(text(f"CREATE TABLE {name} (LIKE {PARENT} INCLUDING DEFAULTS)"))
+        await db.execute(
+            text(
+                f"WITH moved AS (DELETE FROM {DEFAULT_PARTITION} "
+                "WHERE created_at >= :start AND created_at < :end RETURNING *) "
+                f"INSERT INTO {name} SELECT * FROM moved"
+            ),
+            {"start": start.replace(tzinfo=timezone.utc), "end": end.replace(tzinfo=timezone.utc)},
+        )
+        await db.execute(
+            text(
+                f"ALTER TABLE {PARENT} ATTACH PARTITION {name} "
+                f"FOR VALUES FROM ('{start:%Y-%m-%d} 00:00:00+00') "
+                f"TO ('{end:%Y-%m-%d} 00:00:00+00')"
+            )
+        )
+        created.append(name)
+    await db.commit()
+    return created
+
+
+async def detach_movement_partitions(
+    db: AsyncSession, retain_months: int = RETAIN_MONTHS, now: Optional[datetime] = None
+) -> list[str]:
+    """Desacopla (sin borrar) las particiones que terminan antes del horizonte de retención.
+
+    Antes de cada una se toman snapshots al cierre de su mes y se acumulan sus sumas en
+    stock_ledger_baselines, así as-of y la reconciliación siguen cuadrando sin esas filas.
+    Las tablas desacopladas quedan con su nombre para archivarlas o borrarlas aparte.
+    """
+    if not _is_partitioned(db):
+        return []
+    cutoff = _add_months(_month_start(now or datetime.utcnow()), -retain_months)
+    detached = []
+    for name in await attached_partitions(db):
+        end = _add_months(_partition_month(name), 1)
+        if end > cutoff:
+            break
+        # Último instante del mes: prune_snapshots conserva el último snapshot de cada mes
+        await write_snapshots(db, taken_at=end - timedelta(microseconds=1))
+        await db.execute(
+            text(
+                "INSERT INTO stock_ledger_baselines "
+                "(inventory_id, quantity_change, reserved_change, movement_count, through) "
+                "SELECT inventory_id, sum(quantity_change), "
+                "sum(CASE WHEN reason = 'reservation' THEN quantity_change ELSE 0 END), "
+                f"count(*), :through FROM {name} GROUP BY inventory_id "
+                "ON CONFLICT (inventory_id) DO UPDATE SET "
+                "quantity_change = "
+                "stock_ledger_baselines.quantity_change + excluded.quantity_change, "
+                "reserved_change = "
+                "stock_ledger_baselines.reserved_change + excluded.reserved_change, "
+                "movement_count = stock_ledger_baselines.movement_count + excluded.movement_count, "
+                "through = greatest(stock_ledger_baselines.through, excluded.through)"
+            ),
+            {"through": end},
+        )
+        # Snapshots, baseline y DETACH en la misma transacción: o pasa todo o nada
+        await db.execute(text(f"ALTER TABLE {PARENT} DETACH PARTITION {name}"))
+        await db.commit()
+        detached.append(name)
+    return detached
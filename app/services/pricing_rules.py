@@ -0,0 +1,130 @@
+import uuid
+from dataclasses import dataclass
+from datetime import date
+from decimal import Decimal
+from typing import Iterable, Optional
+
+import xxhash
+
+from app.core.money import divide_rounded
+from app.models.config import PricingRuleKind
+from app.services.seasons import SeasonIndex
+
+# multiplier es Numeric(6,4): cada factor es un entero exacto en diezmilésimos
+FACTOR_SCALE = 10_000
+# Volumen, categoría, duración y temporada se multiplican antes de redondear la línea
+LINE_SCALE = FACTOR_SCALE**4
+
+
+@dataclass(frozen=True)
+class PricingRuleSnapshot:
+    id: uuid.UUID
+    kind: PricingRuleKind
+    multiplier: Decimal
+    threshold: Optional[int]
+    category_id: Optional[uuid.UUID]
+    season_id: Optional[uuid.UUID]
+
+
+def _factor(multiplier: Decimal) -> int:
+    scaled = Decimal(multiplier).scaleb(4)
+    if scaled != scaled.to_integral_value():
+        raise ValueError(f"{multiplier} has more than 4 decimal places")
+    return int(scaled)
+
+
+def _step_table(steps: dict[int, int]) -> list[int]:
+    """Tabla densa umbral -> factor: posición n = factor del mayor umbral <= n."""
+    if not steps:
+        return [FACTOR_SCALE]
+    table = [FACTOR_SCALE] * (max(steps) + 1)
+    current = FACTOR_SCALE
+    for n in range(len(table)):
+        current = steps.get(n, current)
+        table[n] = current
+    return table
+
+
+class PricingPlan:
+    """Reglas de precio compiladas a tablas de consulta directa.
+
+    Por línea son cuatro lookups O(1) (volumen por cajas, categoría del producto, curva por días y
+    factor de temporada del evento) y un redondeo a la par: agregar reglas no agrega trabajo por
+    línea. Ante reglas repetidas para el mismo umbral, categoría o temporada gana la más reciente;
+    si el evento toca varias temporadas con multiplicador, se aplica el mayor.
+    """
+
+    def __init__(
+        self,
+        rules: Iterable[PricingRuleSnapshot],
+        product_categories: dict[uuid.UUID, uuid.UUID],
+        seasons: Iterable,
+    ):
+        self.rules = tuple(rules)
+        volume: dict[int, int] = {}
+        curve: dict[int, int] = {}
+        categories: dict[uuid.UUID, int] = {}
+        season_factors: dict[uuid.UUID, int] = {}
+        for rule in self.rules:
+            factor = _factor(rule.multiplier)
+            if rule.kind == PricingRuleKind.volume_discount:
+                volume[rule.threshold or 0] = factor
+            elif rule.kind == PricingRuleKind.duration_curve:
+                curve[rule.threshold or 0] = factor
+            elif rule.kind == PricingRuleKind.category_multiplier:
+                categories[rule.category_id] = factor
+            elif rule.kind == PricingRuleKind.season_multiplier:
+                season_factors[rule.season_id] = factor
+        self._volume = _step_table(volume)
+        self._curve = _step_table(curve)
+        self._products = {
+            product_id: categories[category_id]
+            for product_id, category_id in product_categories.items()
+            if category_id in categories
+        }
+        self._season_factors = season_factors
+        self._season_index = SeasonIndex(
+            (s for s in seasons if s.id in season_factors), high_only=False
+        )
+        source = repr(
+            (
+                sorted(map(repr, self.rules)),
+                sorted(map(str, self._products.items())),
+                self._season_index.seasons,
+            )
+        )
+        self.version = xxhash.xxh3_64_hexdigest(source.encode())
+
+    def __bool__(self) -> bool:
+        return bool(self.rules)
+
+    def season_factor(self, event_start: Optional[date], event_end: Optional[date]) -> int:
+        factors = [
+            self._season_factors[s.id]
+            for s in self._season_index.overlapping(event_start, event_end)
+        ]
+        return max(factors, default=FACTOR_SCALE)
+
+    def line_cents(
+        self,
+        price_cents: int,
+        quantity: int,
+        days: int,
+        units_per_box: Optional[int],
+        product_id,
+        season_factor: int,
+    ) -> int:
+        base = price_cents * quantity * days
+        if not self.rules:
+            return base
+        boxes = -(-quantity // max(units_per_box or 1, 1))
+        factor = (
+            self._volume[min(boxes, len(self._volume) - 1)]
+            * self._products.get(product_id, FACTOR_SCALE)
+            * self._curve[min(days, len(self._curve) - 1)]
+            * season_factor
+        )
+        return divide_rounded(base * factor, LINE_SCALE)
+
+
+EMPTY_PLAN = PricingPlan((), {}, ())
@@ -0,0 +1,77 @@
+from collections import OrderedDict
+from typing import Optional
+
+import xxhash
+
+from app.core.money import Money
+from app.models.cart import Cart
+
+QUOTE_MEMO_SIZE = 10_000
+
+Totals = dict[str, Money | int | bool]
+
+
+def quote_key(cart: Cart, config_version: int) -> str:
+    """Hash del contenido que afecta el precio: mismo carrito y misma config dan la misma clave.
+
+    Las líneas se ordenan para que el orden de carga no importe; los ids de carrito e ítems quedan
+    afuera, así dos carritos iguales comparten entrada.
+    """
+    lines = sorted(
+        f"{item.product_id}:{item.variant_id or ''}:{item.quantity}:{item.days}:"
+        f"{item.price_per_day.cents}:{item.units_per_box or 1}:{int(bool(item.requires_guarantee))}"
+        for item in cart.items
+    )
+    header = (
+        f"{cart.event_start}|{cart.event_end}|{cart.logistics_hours or 1}|{cart.tolls or 0}"
+        f"|v{config_version}"
+    )
+    return xxhash.xxh3_128_hexdigest("\n".join([header, *lines]).encode())
+
+
+class QuoteMemo:
+    """LRU acotado de totales ya calculados, con contadores para medir la tasa de aciertos."""
+
+    def __init__(self, maxsize: int = QUOTE_MEMO_SIZE):
+        self.maxsize = maxsize
+        self._entries: OrderedDict[str, Totals] = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def get(self, key: str) -> Optional[Totals]:
+        totals = self._entries.get(key)
+        if totals is None:
+            self.misses += 1
+            return None
+        self._entries.move_to_end(key)
+        self.hits += 1
+        # Copia: quien recibe los totales puede modificarlos sin tocar la entrada
+        return dict(totals)
+
+    def put(self, key: str, totals: Totals) -> None:
+        self._entries[key] = dict(totals)
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.maxsize:
+            self._entries.popitem(last=False)
+            self.evictions += 1
+
+    def clear(self) -> None:
+        self._entries.clear()
+
+    def stats(self) -> dict[str, int | float]:
+        lookups = self.hits + self.misses
+        return {
+            "size": len(self._entries),
+            "maxsize": self.maxsize,
+            "hits": self.hits,
+            "misses": self.misses,
+            "evictions": self.evictions,
+            "hit_rate": self.hits / lookups if lookups else 0.0,
+        }
+
+
+quote_memo = QuoteMemo()
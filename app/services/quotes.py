@@ -0,0 +1,331 @@
+import uuid
+from dataclasses import dataclass, field
+from datetime import date, datetime
+from decimal import Decimal
+from typing import Iterable, Optional
+
+from sqlalchemy import bindparam, exists, select, update
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.core.money import CENTS, Money, divide_rounded
+from app.models.cart import Cart, CartItem
+from app.models.order import Order, OrderItem, OrderStatus
+from app.schemas.order import OrderRequoteDiff, OrderRequoteReport, QuoteChange
+from app.services.config import PricingConfig, get_pricing_config
+from app.services.pricing_rules import EMPTY_PLAN, PricingPlan
+
+REQUOTE_BATCH_SIZE = 2000
+# percentage y tax_rate tienen 2 decimales (Numeric(5,2) y Numeric(4,2)):
+# base * percentage * (1 + tax) es exacta en centavos * 10^4
+GUARANTEE_SCALE = CENTS * CENTS
+QUOTED_FIELDS = (
+    "days",
+    "subtotal",
+    "logistics_cost",
+    "guarantee_amount",
+    "total",
+    "reservation_required",
+    "outstanding_balance",
+    "requires_guarantee",
+    "high_season",
+)
+
+_orders = Order.__table__
+_write_back_stmt = (
+    update(_orders)
+    # Si el pedido salió de pending_reservation entre la lectura y el UPDATE no se toca
+    .where(
+        _orders.c.id == bindparam("order_id"), _orders.c.status == OrderStatus.pending_reservation
+    )
+    .values(
+        **{name: bindparam(f"new_{name}") for name in QUOTED_FIELDS},
+        config_version_id=bindparam("new_config_version_id"),
+        updated_at=bindparam("new_updated_at"),
+    )
+)
+_items = OrderItem.__table__
+_line_write_back_stmt = (
+    update(_items)
+    .where(
+        _items.c.id == bindparam("item_id"),
+        exists().where(
+            _orders.c.id == _items.c.order_id,
+            _orders.c.status == OrderStatus.pending_reservation,
+        ),
+    )
+    .values(total_price=bindparam("new_total_price"))
+)
+
+
+def _hundredths(ratio) -> int:
+    scaled = Decimal(ratio or 0).scaleb(2)
+    if scaled != scaled.to_integral_value():
+        raise ValueError(f"{ratio} has more than 2 decimal places")
+    return int(scaled)
+
+
+@dataclass(frozen=True)
+class Quote:
+    id: uuid.UUID
+    days: int
+    subtotal: Money
+    logistics_cost: Money
+    guarantee_amount: Money
+    total: Money
+    reservation_required: Money
+    outstanding_balance: Money
+    requires_guarantee: bool
+    high_season: bool
+    # Total de cada línea por id de item; su suma es subtotal
+    lines: dict[uuid.UUID, Money] = field(default_factory=dict)
+
+    def totals(self) -> dict[str, Money | int | bool]:
+        """Mismo formato que calculate_totals."""
+        return {name: getattr(self, name) for name in QUOTED_FIELDS}
+
+
+@dataclass
+class QuoteColumns:
+    """Una posición por carrito o pedido; importes en centavos enteros."""
+
+    ids: list[uuid.UUID] = field(default_factory=list)
+    event_start: list[Optional[date]] = field(default_factory=list)
+    event_end: list[Optional[date]] = field(default_factory=list)
+    logistics_hours: list[Optional[int]] = field(default_factory=list)
+    tolls: list[Optional[int]] = field(default_factory=list)
+    days: list[int] = field(default_factory=list)
+    subtotal: list[int] = field(default_factory=list)
+    guarantee_base: list[int] = field(default_factory=list)
+    lines: list[dict[uuid.UUID, int]] = field(default_factory=list)
+
+    @classmethod
+    def from_rows(cls, rows: Iterable, plan: PricingPlan = EMPTY_PLAN) -> "QuoteColumns":
+        """Acumula filas cabecera + línea (outer join: sin líneas, price viene NULL)."""
+        columns = cls()
+        positions: dict[uuid.UUID, int] = {}
+        season_factor = 0
+        for row in rows:
+            position = positions.get(row.id)
+            if position is None:
+                season_factor = plan.season_factor(row.event_start, row.event_end)
+                position = positions[row.id] = len(columns.ids)
+                columns.ids.append(row.id)
+                columns.event_start.append(row.event_start)
+                columns.event_end.append(row.event_end)
+                columns.logistics_hours.append(row.logistics_hours)
+                columns.tolls.append(row.tolls)
+                columns.days.append(1)
+                columns.subtotal.append(0)
+                columns.guarantee_base.append(0)
+                columns.lines.append({})
+            if row.price is None:
+                continue
+            line = plan.line_cents(
+                row.price.cents,
+                row.quantity,
+                row.line_days,
+                row.units_per_box,
+                row.product_id,
+                season_factor,
+            )
+            columns.subtotal[position] += line
+            columns.lines[position][row.line_id] = line
+            if row.requires_guarantee:
+                columns.guarantee_base[position] += line
+            columns.days[position] = max(columns.days[position], row.line_days)
+        return columns
+
+
+def price_columns(columns: QuoteColumns, config: PricingConfig) -> list[Quote]:
+    """Mismas reglas que calculate_totals para toda la tanda, por columna y en centavos enteros."""
+    logistics, guarantee = config.logistics, config.guarantee
+    fixed = logistics.base_fee.cents + logistics.default_tolls.cents
+    hourly = logistics.hourly_vehicle_fee.cents
+    percentage = _hundredths(guarantee.percentage)
+    tax_factor = CENTS + _hundredths(guarantee.tax_rate) if guarantee.apply_tax else CENTS
+
+    logistics_cost = [
+        fixed + hourly * (hours or 1) + (tolls or 0) * CENTS
+        for hours, tolls in zip(columns.logistics_hours, columns.tolls, strict=True)
+    ]
+    guarantee_amount = [
+        divide_rounded(base * percentage * tax_factor, GUARANTEE_SCALE)
+        for base in columns.guarantee_base
+    ]
+    total = [
+        subtotal + cost + amount
+        for subtotal, cost, amount in zip(
+            columns.subtotal, logistics_cost, guarantee_amount, strict=True
+        )
+    ]
+    seasons = [
+        config.season_index.winner(start, end)
+        for start, end in zip(columns.event_start, columns.event_end, strict=True)
+    ]
+    reservation = [
+        divide_rounded(value * _hundredths(season.deposit_ratio), CENTS) if season else 0
+        for value, season in zip(total, seasons, strict=True)
+    ]
+
+    return [
+        Quote(
+            id=columns.ids[i],
+            days=columns.days[i],
+            subtotal=Money(columns.subtotal[i]),
+            logistics_cost=Money(logistics_cost[i]),
+            guarantee_amount=Money(guarantee_amount[i]),
+            total=Money(total[i]),
+            reservation_required=Money(reservation[i]),
+            outstanding_balance=Money(total[i] - reservation[i]),
+            requires_guarantee=columns.guarantee_base[i] > 0,
+            high_season=seasons[i] is not None,
+            lines={line_id: Money(line) for line_id, line in columns.lines[i].items()},
+        )
+        for i in range(len(columns.ids))
+    ]
+
+
+async def quote_carts(
+    db: AsyncSession, cart_ids: Optional[list[uuid.UUID]] = None
+) -> dict[uuid.UUID, Quote]:
+    """Cotiza en una consulta los carritos indicados o, sin cart_ids, los que no tienen pedido."""
+    stmt = (
+        select(
+            Cart.id,
+            Cart.event_start,
+            Cart.event_end,
+            Cart.logistics_hours,
+            Cart.tolls,
+            CartItem.id.label("line_id"),
+            CartItem.price_per_day.label("price"),
+            CartItem.quantity,
+            CartItem.days.label("line_days"),
+            CartItem.requires_guarantee,
+            CartItem.product_id,
+            CartItem.units_per_box,
+        )
+        .outerjoin(CartItem, CartItem.cart_id == Cart.id)
+        .order_by(Cart.id)
+    )
+    if cart_ids is None:
+        stmt = stmt.where(~exists().where(Order.cart_id == Cart.id))
+    else:
+        stmt = stmt.where(Cart.id.in_(cart_ids))
+    config = await get_pricing_config(db)
+    quotes = price_columns(
+        QuoteColumns.from_rows((await db.execute(stmt)).all(), config.plan), config
+    )
+    return {quote.id: quote for quote in quotes}
+
+
+def _diff(row, quote: Quote, current_lines: dict[uuid.UUID, Money]) -> list[QuoteChange]:
+    changes = [
+        QuoteChange(
+            field=name, current=getattr(row, f"current_{name}"), proposed=getattr(quote, name)
+        )
+        for name in QUOTED_FIELDS
+        if getattr(row, f"current_{name}") != getattr(quote, name)
+    ]
+    changes += [
+        QuoteChange(
+            field=f"items.{line_id}.total_price", current=current_lines[line_id], proposed=line
+        )
+        for line_id, line in quote.lines.items()
+        if current_lines[line_id] != line
+    ]
+    return changes
+
+
+async def requote_pending_orders(
+    db: AsyncSession, dry_run: bool = True, batch_size: int = REQUOTE_BATCH_SIZE
+) -> OrderRequoteReport:
+    """Recalcula los pedidos pending_reservation con la configuración vigente.
+
+    Cada tanda trae cabeceras y líneas en una sola consulta; con dry_run solo se informa qué
+    cambiaría, si no se escriben los pedidos y líneas modificados con un UPDATE en lote para cada
+    tabla y commit por tanda.
+    """
+    config = await get_pricing_config(db)
+    report = OrderRequoteReport(
+        dry_run=dry_run, config_version=config.version, scanned=0, changed=0, orders=[]
+    )
+    last_id: Optional[uuid.UUID] = None
+    while True:
+        ids_stmt = (
+            select(Order.id)
+            .where(Order.status == OrderStatus.pending_reservation)
+            .order_by(Order.id)
+            .limit(batch_size)
+        )
+        if last_id is not None:
+            ids_stmt = ids_stmt.where(Order.id > last_id)
+        if not dry_run:
+            ids_stmt = ids_stmt.with_for_update(skip_locked=True)
+        ids = (await db.execute(ids_stmt)).scalars().all()
+        if not ids:
+            break
+        last_id = ids[-1]
+        rows = (
+            await db.execute(
+                select(
+                    Order.id,
+                    Order.code,
+                    Order.event_start,
+                    Order.event_end,
+                    Order.logistics_hours,
+                    Order.tolls,
+                    *(_orders.c[name].label(f"current_{name}") for name in QUOTED_FIELDS),
+                    OrderItem.id.label("line_id"),
+                    OrderItem.total_price.label("current_line_total"),
+                    OrderItem.unit_price.label("price"),
+                    OrderItem.quantity,
+                    OrderItem.days.label("line_days"),
+                    OrderItem.requires_guarantee,
+                    OrderItem.product_id,
+                    OrderItem.units_per_box,
+                )
+                .outerjoin(OrderItem, OrderItem.order_id == Order.id)
+                .where(Order.id.in_(ids))
+                .order_by(Order.id)
+            )
+        ).all()
+        headers = {row.id: row for row in rows}
+        current_lines = {
+            row.line_id: row.current_line_total for row in rows if row.line_id is not None
+        }
+        columns = QuoteColumns.from_rows(rows, config.plan)
+        updates, line_updates = [], []
+        now = datetime.utcnow()
+        for quote in price_columns(columns, config):
+            row = headers[quote.id]
+            changes = _diff(row, quote, current_lines)
+            if not changes:
+                continue
+            report.orders.append(
+                OrderRequoteDiff(order_id=quote.id, code=row.code, changes=changes)
+            )
+            updates.append(
+                {
+                    "order_id": quote.id,
+                    "new_config_version_id": config.config_version_id,
+                    "new_updated_at": now,
+                    **{f"new_{name}": value for name, value in quote.totals().items()},
+                }
+            )
+            line_updates += [
+                {"item_id": line_id, "new_total_price": line}
+                for line_id, line in quote.lines.items()
+                if current_lines[line_id] != line
+            ]
+        report.scanned += len(ids)
+        report.changed += len(updates)
+        if not dry_run:
+            if updates:
+                await db.execute(_write_back_stmt, updates)
+            if line_updates:
+                await db.execute(_line_write_back_stmt, line_updates)
+            await db.commit()
+        if len(ids) < batch_size:
+            break
+    return report
+
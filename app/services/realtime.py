@@ -0,0 +1,254 @@
+import asyncio
+import json
+import logging
+import uuid
+from collections import defaultdict
+from typing import Any, Callable, Iterable, Optional
+
+from sqlalchemy import event as sa_event
+from sqlalchemy import func, select, text
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.models.stock import Inventory
+from app.services.striping import stripe_totals
+
+logger = logging.getLogger(__name__)
+
+CHANNEL = "rentware_events"
+QUEUE_SIZE = 256
+# Un suscriptor que pierde más eventos que esto se desconecta para que resincronice por REST
+MAX_DROPPED = 1024
+# Filtros de autorización: si el evento no trae la clave no se entrega (los demás son opcionales)
+REQUIRED_FILTERS = frozenset({"user_id"})
+# Espera entre reintentos del LISTEN, con backoff exponencial hasta el máximo
+RECONNECT_MIN_DELAY = 1.0
+RECONNECT_MAX_DELAY = 30.0
+_PENDING_KEY = "realtime_pending"
+
+
+class Subscription:
+    def __init__(
+        self,
+        topics: Iterable[str],
+        filters: Optional[dict[str, str]] = None,
+        queue_size: int = QUEUE_SIZE,
+    ):
+        self.topics = set(topics)
+        self.filters = {k: str(v) for k, v in (filters or {}).items() if v is not None}
+        self.queue: asyncio.Queue[dict[str, Any]] = asyncio.Queue(maxsize=queue_size)
+        self.dropped = 0
+
+    @property
+    def overflowed(self) -> bool:
+        return self.dropped > MAX_DROPPED
+
+    def matches(self, event: dict[str, Any]) -> bool:
+        if event.get("topic") not in self.topics:
+            return False
+        data = event.get("data", {})
+        return all(
+            str(data[key]) == value if key in data else key not in REQUIRED_FILTERS
+            for key, value in self.filters.items()
+        )
+
+    def offer(self, event: dict[str, Any]) -> None:
+        # Nunca bloquea al publicador: con la cola llena se descarta el evento más viejo
+        if self.queue.full():
+            self.queue.get_nowait()
+            self.dropped += 1
+        self.queue.put_nowait(event)
+
+
+class BroadcastHub:
+    def __init__(self):
+        self.subscriptions: set[Subscription] = set()
+        # Consumidores internos del proceso (p. ej. invalidación de caches); se llaman sin encolar
+        self.listeners: dict[str, list[Callable[[dict[str, Any]], None]]] = defaultdict(list)
+
+    def add_listener(self, topic: str, callback: Callable[[dict[str, Any]], None]) -> None:
+        self.listeners[topic].append(callback)
+
+    def subscribe(
+        self, topics: Iterable[str], filters: Optional[dict[str, str]] = None
+    ) -> Subscription:
+        subscription = Subscription(topics, filters)
+        self.subscriptions.add(subscription)
+        return subscription
+
+    def unsubscribe(self, subscription: Subscription) -> None:
+        self.subscriptions.discard(subscription)
+
+    def dispatch(self, events: Iterable[dict[str, Any]]) -> None:
+        for event in events:
+            for callback in self.listeners.get(event.get("topic"), ()):
+                callback(event)
+            for subscription in list(self.subscriptions):
+                if subscription.matches(event):
+                    subscription.offer(event)
+
+
+class InMemoryBroker:
+    """Reparte en el mismo proceso al hacer commit; sirve para tests y un solo worker."""
+
+    def __init__(self, hub: BroadcastHub):
+        self.hub = hub
+
+    async def publish(self, db: AsyncSession, events: list[dict[str, Any]]) -> None:
+        pending = db.info.setdefault(_PENDING_KEY, [])
+        if not pending and not db.info.get("realtime_hooked"):
+            sync_session = db.sync_session
+            sa_event.listen(
+                sync_session,
+                "after_commit",
+                lambda s: self.hub.dispatch(s.info.pop(_PENDING_KEY, [])),
+            )
+            sa_event.listen(
+                sync_session, "after_rollback", lambda s: s.info.pop(_PENDING_KEY, None)
+            )
+            db.info["realtime_hooked"] = True
+        pending.extend(events)
+
+    async def start(self) -> None:
+        return None
+
+    async def stop(self) -> None:
+        return None
+
+
+class PostgresBroker:
+    """NOTIFY dentro de la transacción (se entrega solo si hace commit) y LISTEN en cada worker."""
+
+    def __init__(self, hub: BroadcastHub, dsn: str, channel: str = CHANNEL):
+        self.hub = hub
+        self.dsn = dsn
+        self.channel = channel
+        self._connection = None
+        self._task: Optional[asyncio.Task] = None
+
+    async def publish(self, db: AsyncSession, events: list[dict[str, Any]]) -> None:
+        await db.execute(
+            text(
+                "SELECT pg_notify(:channel, payload) "
+                "FROM unnest(CAST(:payloads AS text[])) AS payload"
+            ),
+            {"channel": self.channel, "payloads": [json.dumps(e, default=str) for e in events]},
+        )
+
+    def _on_notify(self, connection, pid, channel, payload) -> None:
+        try:
+            self.hub.dispatch([json.loads(payload)])
+        except ValueError:
+            logger.warning("Discarding malformed realtime payload")
+
+    async def _listen(self) -> None:
+        import asyncpg
+
+        delay = RECONNECT_MIN_DELAY
+        while True:
+            lost = asyncio.Event()
+            try:
+                self._connection = await asyncpg.connect(self.dsn)
+                self._connection.add_termination_listener(lambda connection, lost=lost: lost.set())
+                await self._connection.add_listener(self.channel, self._on_notify)
+                delay = RECONNECT_MIN_DELAY
+                await lost.wait()
+                # Lo notificado sin LISTEN se pierde; los clientes resincronizan por REST
+                logger.warning("Realtime LISTEN connection lost, reconnecting in %.0fs", delay)
+            except (OSError, asyncpg.PostgresError, asyncpg.InterfaceError) as exc:
+                logger.warning("Realtime LISTEN failed (%s), retrying in %.0fs", exc, delay)
+            await self._close_connection()
+            await asyncio.sleep(delay)
+            delay = min(delay * 2, RECONNECT_MAX_DELAY)
+
+    async def _close_connection(self) -> None:
+        if self._connection is not None:
+            if not self._connection.is_closed():
+                await self._connection.close()
+            self._connection = None
+
+    async def start(self) -> None:
+        # El LISTEN vive en una tarea propia que reconecta si se cae la conexión
+        self._task = asyncio.create_task(self._listen())
+
+    async def stop(self) -> None:
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+        await self._close_connection()
+
+
+hub = BroadcastHub()
+broker: InMemoryBroker | PostgresBroker = InMemoryBroker(hub)
+
+
+def configure_broker(database_url: str) -> InMemoryBroker | PostgresBroker:
+    global broker
+    if database_url.startswith("postgresql"):
+        broker = PostgresBroker(hub, database_url.replace("+asyncpg", "", 1))
+    else:
+        broker = InMemoryBroker(hub)
+    return broker
+
+
+async def publish(db: AsyncSession, topic: str, items: Iterable[dict[str, Any]]) -> None:
+    events = [{"topic": topic, "data": item} for item in items]
+    if events:
+        await broker.publish(db, events)
+
+
+async def publish_inventory_deltas(
+    db: AsyncSession, deltas: dict[uuid.UUID, tuple[int, int]]
+) -> None:
+    """Publica por inventario el delta (available, reserved) y el total resultante; sin commit."""
+    if not deltas:
+        return
+    totals = stripe_totals()
+    rows = await db.execute(
+        select(
+            Inventory.id,
+            Inventory.product_id,
+            Inventory.variant_id,
+            Inventory.warehouse_id,
+            (Inventory.available + func.coalesce(totals.c.available, 0)).label("available"),
+            (Inventory.reserved + func.coalesce(totals.c.reserved, 0)).label("reserved"),
+        )
+        .outerjoin(totals, totals.c.inventory_id == Inventory.id)
+        .where(Inventory.id.in_(list(deltas)))
+    )
+    await publish(
+        db,
+        "inventory",
+        (
+            {
+                "inventory_id": str(row.id),
+                "product_id": str(row.product_id),
+                "variant_id": str(row.variant_id) if row.variant_id else None,
+                "warehouse_id": str(row.warehouse_id),
+                "available_delta": deltas[row.id][0],
+                "reserved_delta": deltas[row.id][1],
+                "available": row.available,
+                "reserved": row.reserved,
+            }
+            for row in rows.all()
+        ),
+    )
+
+
+async def publish_order_status(db: AsyncSession, order, previous) -> None:
+    await publish(
+        db,
+        "orders",
+        [
+            {
+                "order_id": str(order.id),
+                "code": order.code,
+                "user_id": str(order.user_id) if order.user_id else None,
+                "previous": previous.value if previous else None,
+                "status": order.status.value,
+            }
+        ],
+    )
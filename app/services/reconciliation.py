@@ -0,0 +1,156 @@
+import asyncio
+import time
+import uuid
+from typing import Optional
+
+from sqlalchemy import bindparam, case, func, select, update
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker
+
+from app.models.stock import (
+    Inventory,
+    StockHold,
+    StockLedgerBaseline,
+    StockMovement,
+    StockMovementReason,
+    Warehouse,
+)
+from app.schemas.stock import InventoryDrift, ReconciliationPartition, ReconciliationReport
+from app.services.striping import stripe_totals
+
+REPAIR_BATCH_SIZE = 500
+
+_inventories = Inventory.__table__
+# Se corrige por delta y no por valor absoluto: si entra un movimiento entre la lectura y el UPDATE,
+# contador y ledger avanzan juntos y la corrección sigue siendo válida.
+_repair_stmt = (
+    update(_inventories)
+    .where(_inventories.c.id == bindparam("inventory_id"))
+    .values(
+        available=_inventories.c.available + bindparam("available_delta"),
+        reserved=_inventories.c.reserved + bindparam("reserved_delta"),
+    )
+)
+
+
+async def _reconcile_warehouse(
+    db: AsyncSession, warehouse_id: uuid.UUID, repair: bool
+) -> tuple[ReconciliationPartition, list[InventoryDrift]]:
+    started = time.perf_counter()
+    # available esperado = suma del ledger; reserved esperado = reservas netas
+    # (las liberaciones son reservation positivas)
+    reserved_change = case(
+        (StockMovement.reason == StockMovementReason.reservation, StockMovement.quantity_change),
+        else_=0,
+    )
+    # Con stripes el contador observado es fila principal + stripes
+    totals = stripe_totals()
+    # Los holds de carrito descuentan available sin pasar por el ledger
+    held = (
+        select(StockHold.inventory_id, func.sum(StockHold.quantity).label("quantity"))
+        .group_by(StockHold.inventory_id)
+        .subquery()
+    )
+    stmt = (
+        select(
+            Inventory.id,
+            (Inventory.available + func.coalesce(totals.c.available, 0)).label("available"),
+            (Inventory.reserved + func.coalesce(totals.c.reserved, 0)).label("reserved"),
+            (
+                func.coalesce(StockLedgerBaseline.quantity_change, 0)
+                + func.coalesce(func.sum(StockMovement.quantity_change), 0)
+                - func.coalesce(held.c.quantity, 0)
+            ).label("expected_available"),
+            (
+                -func.coalesce(StockLedgerBaseline.reserved_change, 0)
+                - func.coalesce(func.sum(reserved_change), 0)
+            ).label("expected_reserved"),
+            func.count(StockMovement.id).label("movements"),
+        )
+        .outerjoin(totals, totals.c.inventory_id == Inventory.id)
+        .outerjoin(held, held.c.inventory_id == Inventory.id)
+        # Particiones desacopladas por retención: sus sumas viven en stock_ledger_baselines
+        .outerjoin(StockLedgerBaseline, StockLedgerBaseline.inventory_id == Inventory.id)
+        .outerjoin(StockMovement, StockMovement.inventory_id == Inventory.id)
+        .where(Inventory.warehouse_id == warehouse_id)
+        .group_by(
+            Inventory.id,
+            Inventory.available,
+            Inventory.reserved,
+            totals.c.available,
+            totals.c.reserved,
+            held.c.quantity,
+            StockLedgerBaseline.quantity_change,
+            StockLedgerBaseline.reserved_change,
+        )
+    )
+    rows = (await db.execute(stmt)).all()
+    drift = [
+        InventoryDrift(
+            inventory_id=row.id,
+            warehouse_id=warehouse_id,
+            available=row.available or 0,
+            reserved=row.reserved or 0,
+            expected_available=row.expected_available,
+            expected_reserved=row.expected_reserved,
+        )
+        for row in rows
+        if (row.available or 0) != row.expected_available
+        or (row.reserved or 0) != row.expected_reserved
+    ]
+    repaired = 0
+    if repair:
+        for start in range(0, len(drift), REPAIR_BATCH_SIZE):
+            batch = drift[start : start + REPAIR_BATCH_SIZE]
+            await db.execute(
+                _repair_stmt,
+                [
+                    {
+                        "inventory_id": d.inventory_id,
+                        "available_delta": d.expected_available - d.available,
+                        "reserved_delta": d.expected_reserved - d.reserved,
+                    }
+                    for d in batch
+                ],
+            )
+            await db.commit()
+            repaired += len(batch)
+    partition = ReconciliationPartition(
+        warehouse_id=warehouse_id,
+        inventories_checked=len(rows),
+        movements_scanned=sum(row.movements for row in rows),
+        drifted=len(drift),
+        repaired=repaired,
+        elapsed_ms=(time.perf_counter() - started) * 1000,
+    )
+    return partition, drift
+
+
+async def reconcile_inventory(
+    session_factory: async_sessionmaker,
+    repair: bool = False,
+    warehouse_ids: Optional[list[uuid.UUID]] = None,
+    concurrency: int = 4,
+) -> ReconciliationReport:
+    started = time.perf_counter()
+    if warehouse_ids is None:
+        async with session_factory() as db:
+            warehouse_ids = list((await db.execute(select(Warehouse.id))).scalars().all())
+
+    semaphore = asyncio.Semaphore(concurrency)
+
+    async def run_partition(warehouse_id: uuid.UUID):
+        # Cada partición usa su propia sesión para poder correr en paralelo
+        async with semaphore, session_factory() as db:
+            return await _reconcile_warehouse(db, warehouse_id, repair)
+
+    results = await asyncio.gather(*(run_partition(w) for w in warehouse_ids))
+    partitions = [partition for partition, _ in results]
+    return ReconciliationReport(
+        inventories_checked=sum(p.inventories_checked for p in partitions),
+        movements_scanned=sum(p.movements_scanned for p in partitions),
+        drifted=sum(p.drifted for p in partitions),
+        repaired=sum(p.repaired for p in partitions),
+        elapsed_ms=(time.perf_counter() - started) * 1000,
+        partitions=partitions,
+        drift=[d for _, drift in results for d in drift],
+    )
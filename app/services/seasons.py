@@ -0,0 +1,69 @@
+from datetime import date
+from typing import Iterable, Optional, Sequence
+
+from app.models.config import Season
+
+
+def season_priority(season: Season):
+    """Regla de desempate entre temporadas altas superpuestas.
+
+    Gana la de mayor deposit_ratio (la seña más conservadora); a igual ratio, la que empieza antes
+    y, por último, el nombre, para que el resultado no dependa del orden de carga.
+    """
+    return (-season.deposit_ratio, season.start_date, season.name)
+
+
+class SeasonIndex:
+    """Árbol de intervalos estático sobre las temporadas altas, ordenadas por start_date.
+
+    Es un árbol binario implícito sobre el arreglo ordenado; cada nodo guarda el end_date máximo
+    de su subárbol, así una consulta descarta ramas enteras: O(log n + k) para k solapamientos.
+    Se construye una vez por cambio de temporadas y es de solo lectura.
+    """
+
+    def __init__(self, seasons: Iterable[Season], high_only: bool = True):
+        self.seasons: Sequence[Season] = sorted(
+            (s for s in seasons if s.high_season or not high_only),
+            key=lambda s: (s.start_date, s.end_date, s.name),
+        )
+        self._starts = [s.start_date for s in self.seasons]
+        self._ends = [s.end_date for s in self.seasons]
+        self._max_end = [date.min] * (4 * len(self.seasons) + 1)
+        self._build(1, 0, len(self.seasons))
+
+    def __len__(self) -> int:
+        return len(self.seasons)
+
+    def _build(self, node: int, lo: int, hi: int) -> date:
+        if lo >= hi:
+            return date.min
+        mid = (lo + hi) // 2
+        self._max_end[node] = max(
+            self._ends[mid], self._build(2 * node, lo, mid), self._build(2 * node + 1, mid + 1, hi)
+        )
+        return self._max_end[node]
+
+    def _collect(
+        self, node: int, lo: int, hi: int, start: date, end: date, found: list[Season]
+    ) -> None:
+        if lo >= hi or self._max_end[node] < start:
+            return
+        mid = (lo + hi) // 2
+        self._collect(2 * node, lo, mid, start, end, found)
+        # A la derecha todo empieza en o después de starts[mid]
+        if self._starts[mid] > end:
+            return
+        if self._ends[mid] >= start:
+            found.append(self.seasons[mid])
+        self._collect(2 * node + 1, mid + 1, hi, start, end, found)
+
+    def overlapping(self, event_start: Optional[date], event_end: Optional[date]) -> list[Season]:
+        """Todas las temporadas indexadas que se superponen con el evento, por fecha de inicio."""
+        if not event_start or not event_end:
+            return []
+        found: list[Season] = []
+        self._collect(1, 0, len(self.seasons), event_start, event_end, found)
+        return found
+
+    def winner(self, event_start: Optional[date], event_end: Optional[date]) -> Optional[Season]:
+        return min(self.overlapping(event_start, event_end), key=season_priority, default=None)
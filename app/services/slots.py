@@ -0,0 +1,139 @@
+import uuid
+from datetime import date, timedelta
+from typing import Optional
+
+from sqlalchemy import and_, select, update
+from sqlalchemy.dialects import postgresql, sqlite
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.models.delivery import DeliverySlot, DeliverySlotDay
+from app.schemas.delivery import SlotAvailability
+
+MAX_AVAILABILITY_DAYS = 62
+
+
+def serves(slot: DeliverySlot, day: date) -> bool:
+    return slot.weekday is None or slot.weekday == day.weekday()
+
+
+async def list_slots(db: AsyncSession) -> list[DeliverySlot]:
+    result = await db.execute(
+        select(DeliverySlot)
+        .where(DeliverySlot.active.is_(True))
+        .order_by(DeliverySlot.weekday, DeliverySlot.label)
+    )
+    return list(result.scalars().all())
+
+
+async def create_slot(db: AsyncSession, payload: DeliverySlot) -> DeliverySlot:
+    db.add(payload)
+    await db.commit()
+    await db.refresh(payload)
+    return payload
+
+
+async def deactivate_slot(db: AsyncSession, slot: DeliverySlot) -> DeliverySlot:
+    # Las reservas ya tomadas siguen valiendo; solo deja de ofrecerse
+    slot.active = False
+    await db.commit()
+    await db.refresh(slot)
+    return slot
+
+
+async def book_slot(db: AsyncSession, slot_id: uuid.UUID, day: date) -> DeliverySlot:
+    """Toma un lugar de la franja en day, en la transacción del llamador; ValueError si está llena.
+
+    El cupo se descuenta con un UPDATE condicionado a booked < capacity: dos checkouts simultáneos
+    por el último lugar no pueden pasar los dos, sin locks explícitos ni leer antes el contador.
+    """
+    slot = await db.get(DeliverySlot, slot_id)
+    if slot is None or not slot.active:
+        raise ValueError("Delivery slot not found")
+    if not serves(slot, day):
+        raise ValueError(f"Delivery slot {slot.label} is not offered on {day.isoformat()}")
+    dialect = postgresql if db.get_bind().dialect.name == "postgresql" else sqlite
+    await db.execute(
+        dialect.insert(DeliverySlotDay)
+        .values(slot_id=slot.id, day=day, capacity=slot.capacity, booked=0)
+        .on_conflict_do_nothing()
+    )
+    taken = await db.execute(
+        update(DeliverySlotDay)
+        .where(
+            DeliverySlotDay.slot_id == slot.id,
+            DeliverySlotDay.day == day,
+            DeliverySlotDay.booked < DeliverySlotDay.capacity,
+        )
+        .values(booked=DeliverySlotDay.booked + 1)
+        .returning(DeliverySlotDay.booked)
+        .execution_options(synchronize_session=False)
+    )
+    if taken.first() is None:
+        raise ValueError(f"Delivery slot {slot.label} is full on {day.isoformat()}")
+    return slot
+
+
+async def release_slot(db: AsyncSession, slot_id: Optional[uuid.UUID], day: Optional[date]) -> None:
+    if slot_id is None or day is None:
+        return
+    await db.execute(
+        update(DeliverySlotDay)
+        .where(
+            DeliverySlotDay.slot_id == slot_id,
+            DeliverySlotDay.day == day,
+            DeliverySlotDay.booked > 0,
+        )
+        .values(booked=DeliverySlotDay.booked - 1)
+        .execution_options(synchronize_session=False)
+    )
+
+
+async def available_slots(db: AsyncSession, start: date, end: date) -> list[SlotAvailability]:
+    """Cupo de cada franja activa para cada fecha de start a end, con una sola consulta.
+
+    Las fechas sin reservas no tienen fila en delivery_slot_days: valen la capacidad de la franja.
+    """
+    if end < start:
+        raise ValueError("end must be on or after start")
+    if (end - start).days >= MAX_AVAILABILITY_DAYS:
+        raise ValueError(f"Date range cannot exceed {MAX_AVAILABILITY_DAYS} days")
+    rows = (
+        await db.execute(
+            select(
+                DeliverySlot, DeliverySlotDay.day, DeliverySlotDay.capacity, DeliverySlotDay.booked
+            )
+            .outerjoin(
+                DeliverySlotDay,
+                and_(
+                    DeliverySlotDay.slot_id == DeliverySlot.id,
+                    DeliverySlotDay.day.between(start, end),
+                ),
+            )
+            .where(DeliverySlot.active.is_(True))
+        )
+    ).all()
+    slots: dict[uuid.UUID, DeliverySlot] = {}
+    booked: dict[tuple[uuid.UUID, date], tuple[int, int]] = {}
+    for slot, day, capacity, count in rows:
+        slots[slot.id] = slot
+        if day is not None:
+            booked[(slot.id, day)] = (capacity, count)
+    ordered = sorted(slots.values(), key=lambda s: s.label)
+    availability = []
+    for offset in range((end - start).days + 1):
+        day = start + timedelta(days=offset)
+        for slot in ordered:
+            if not serves(slot, day):
+                continue
+            capacity, count = booked.get((slot.id, day), (slot.capacity, 0))
+            availability.append(
+                SlotAvailability(
+                    slot_id=slot.id,
+                    label=slot.label,
+                    day=day,
+                    capacity=capacity,
+                    booked=count,
+                    available=max(capacity - count, 0),
+                )
+            )
+    return availability
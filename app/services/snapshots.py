@@ -0,0 +1,149 @@
+import uuid
+from datetime import datetime, timedelta
+from typing import Optional
+
+from sqlalchemy import Select, and_, delete, func, insert, or_, select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.models.stock import Inventory, InventorySnapshot, StockMovement
+
+# Movimientos con created_at reciente pueden seguir en transacciones abiertas; el snapshot
+# se toma con este margen
+SNAPSHOT_SETTLE_LAG = timedelta(minutes=5)
+PRUNE_BATCH_SIZE = 1000
+
+
+def _balances_as_of(as_of: datetime) -> Select:
+    latest = (
+        select(
+            InventorySnapshot.inventory_id, func.max(InventorySnapshot.taken_at).label("taken_at")
+        )
+        .where(InventorySnapshot.taken_at <= as_of)
+        .group_by(InventorySnapshot.inventory_id)
+        .subquery()
+    )
+    snapshot = (
+        select(
+            InventorySnapshot.inventory_id, InventorySnapshot.taken_at, InventorySnapshot.balance
+        )
+        .join(
+            latest,
+            and_(
+                InventorySnapshot.inventory_id == latest.c.inventory_id,
+                InventorySnapshot.taken_at == latest.c.taken_at,
+            ),
+        )
+        .subquery()
+    )
+    # Solo se suman los movimientos posteriores al snapshot más cercano
+    # (índice inventory_id, created_at)
+    tail = and_(
+        StockMovement.inventory_id == Inventory.id,
+        StockMovement.created_at <= as_of,
+        or_(snapshot.c.taken_at.is_(None), StockMovement.created_at > snapshot.c.taken_at),
+    )
+    return (
+        select(
+            Inventory.id.label("inventory_id"),
+            Inventory.product_id,
+            Inventory.variant_id,
+            Inventory.warehouse_id,
+            snapshot.c.taken_at.label("snapshot_taken_at"),
+            (
+                func.coalesce(snapshot.c.balance, 0)
+                + func.coalesce(func.sum(StockMovement.quantity_change), 0)
+            ).label("balance"),
+            func.count(StockMovement.id).label("pending_movements"),
+        )
+        .outerjoin(snapshot, snapshot.c.inventory_id == Inventory.id)
+        .outerjoin(StockMovement, tail)
+        .group_by(
+            Inventory.id,
+            Inventory.product_id,
+            Inventory.variant_id,
+            Inventory.warehouse_id,
+            snapshot.c.taken_at,
+            snapshot.c.balance,
+        )
+    )
+
+
+async def stock_as_of(
+    db: AsyncSession,
+    as_of: datetime,
+    product_id: Optional[uuid.UUID] = None,
+    warehouse_id: Optional[uuid.UUID] = None,
+):
+    stmt = _balances_as_of(as_of)
+    if product_id:
+        stmt = stmt.where(Inventory.product_id == product_id)
+    if warehouse_id:
+        stmt = stmt.where(Inventory.warehouse_id == warehouse_id)
+    return (await db.execute(stmt)).all()
+
+
+async def write_snapshots(
+    db: AsyncSession, taken_at: Optional[datetime] = None, min_pending_movements: int = 1
+) -> int:
+    """Inserta los snapshots de take_snapshots sin hacer commit."""
+    taken_at = taken_at or datetime.utcnow() - SNAPSHOT_SETTLE_LAG
+    stmt = _balances_as_of(taken_at).having(func.count(StockMovement.id) >= min_pending_movements)
+    rows = [row for row in (await db.execute(stmt)).all() if row.snapshot_taken_at != taken_at]
+    if not rows:
+        return 0
+    await db.execute(
+        insert(InventorySnapshot),
+        [
+            {
+                "inventory_id": row.inventory_id,
+                "taken_at": taken_at,
+                "balance": row.balance,
+                "movement_count": row.pending_movements,
+            }
+            for row in rows
+        ],
+    )
+    return len(rows)
+
+
+async def take_snapshots(
+    db: AsyncSession, taken_at: Optional[datetime] = None, min_pending_movements: int = 1
+) -> int:
+    written = await write_snapshots(db, taken_at, min_pending_movements)
+    await db.commit()
+    return written
+
+
+async def prune_snapshots(db: AsyncSession, older_than: datetime) -> int:
+    # Antes de older_than se conserva solo el último snapshot de cada mes por inventario
+    result = await db.stream(
+        select(InventorySnapshot.id, InventorySnapshot.inventory_id, InventorySnapshot.taken_at)
+        .where(InventorySnapshot.taken_at < older_than)
+        .order_by(InventorySnapshot.inventory_id, InventorySnapshot.taken_at.desc())
+    )
+    seen: set[tuple[uuid.UUID, int, int]] = set()
+    doomed: list[uuid.UUID] = []
+    async for row in result:
+        bucket = (row.inventory_id, row.taken_at.year, row.taken_at.month)
+        if bucket in seen:
+            doomed.append(row.id)
+        else:
+            seen.add(bucket)
+    for start in range(0, len(doomed), PRUNE_BATCH_SIZE):
+        await db.execute(
+            delete(InventorySnapshot).where(
+                InventorySnapshot.id.in_(doomed[start : start + PRUNE_BATCH_SIZE])
+            )
+        )
+    await db.commit()
+    return len(doomed)
+
+
+async def compact_snapshots(
+    db: AsyncSession, max_pending_movements: int = 500, keep_all_days: int = 90
+) -> dict[str, int]:
+    # Acota el costo de as_of: ninguna cola de movimientos supera max_pending_movements
+    # y el historial viejo queda mensual
+    created = await take_snapshots(db, min_pending_movements=max_pending_movements)
+    pruned = await prune_snapshots(db, datetime.utcnow() - timedelta(days=keep_all_days))
+    return {"created": created, "pruned": pruned}
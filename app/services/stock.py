@@ -0,0 +1,319 @@
+import base64
+import uuid
+from collections import defaultdict
+from datetime import datetime
+from typing import Literal, Optional
+
+from sqlalchemy import Integer, Row, case, column, func, insert, or_, select, tuple_, update, values
+from sqlalchemy.dialects.postgresql import UUID
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.models.catalog import Product
+from app.models.stock import Inventory, StockMovement, StockMovementReason, Warehouse
+from app.schemas.stock import (
+    StockMovementBulkError,
+    StockMovementCreate,
+    StockOverviewProduct,
+    StockOverviewWarehouse,
+)
+from app.services.alerts import check_thresholds
+from app.services.realtime import publish_inventory_deltas
+from app.services.striping import stripe_totals, striped_available
+
+
+class InventoryNotFoundError(ValueError):
+    pass
+
+
+class InsufficientStockError(ValueError):
+    pass
+
+
+class BulkMovementError(ValueError):
+    def __init__(self, errors: list[StockMovementBulkError]):
+        super().__init__(f"{len(errors)} movements rejected")
+        self.errors = errors
+
+
+async def apply_inventory_delta(
+    db: AsyncSession, inventory_id: uuid.UUID, delta: int, prevent_negative: bool = False
+) -> int:
+    # El incremento se resuelve en SQL para no perder updates concurrentes (sin SELECT previo)
+    stmt = (
+        update(Inventory)
+        .where(Inventory.id == inventory_id)
+        .values(available=Inventory.available + delta)
+        .returning(Inventory.available)
+        .execution_options(synchronize_session=False)
+    )
+    if prevent_negative and delta < 0:
+        # Con stripes el stock total incluye lo repartido en inventory_stripes
+        stmt = stmt.where(Inventory.available + striped_available(Inventory.id) + delta >= 0)
+    available = (await db.execute(stmt)).scalar_one_or_none()
+    if available is not None:
+        return available
+    exists = (
+        await db.execute(select(Inventory.id).where(Inventory.id == inventory_id))
+    ).scalar_one_or_none()
+    if exists is None:
+        raise InventoryNotFoundError("Inventory not found")
+    raise InsufficientStockError("Movement would leave stock negative")
+
+
+async def create_movement(
+    db: AsyncSession, payload: StockMovementCreate, prevent_negative: bool = False
+) -> StockMovement:
+    try:
+        await apply_inventory_delta(
+            db, payload.inventory_id, payload.quantity_change, prevent_negative
+        )
+        movement = (
+            await db.scalars(
+                insert(StockMovement)
+                .values(
+                    inventory_id=payload.inventory_id,
+                    quantity_change=payload.quantity_change,
+                    reason=payload.reason,
+                    reference=payload.reference,
+                    amount=payload.amount,
+                )
+                .returning(StockMovement)
+            )
+        ).one()
+        await check_thresholds(db, [payload.inventory_id])
+        await publish_inventory_deltas(db, {payload.inventory_id: (payload.quantity_change, 0)})
+    except ValueError:
+        await db.rollback()
+        raise
+    await db.commit()
+    return movement
+
+
+async def apply_inventory_deltas(
+    db: AsyncSession, deltas: dict[uuid.UUID, int], prevent_negative: bool
+) -> set[uuid.UUID]:
+    if db.get_bind().dialect.name == "postgresql":
+        # Un solo UPDATE ... FROM (VALUES ...) para todo el lote
+        rows = values(
+            column("inventory_id", UUID(as_uuid=True)), column("delta", Integer), name="deltas"
+        ).data(list(deltas.items()))
+        delta = rows.c.delta
+        stmt = update(Inventory).where(Inventory.id == rows.c.inventory_id)
+    else:
+        # SQLite no admite alias de columnas sobre VALUES; CASE equivalente
+        delta = case(deltas, value=Inventory.id, else_=0)
+        stmt = update(Inventory).where(Inventory.id.in_(list(deltas)))
+    stmt = stmt.values(available=Inventory.available + delta).returning(Inventory.id)
+    if prevent_negative:
+        stmt = stmt.where(
+            or_(delta >= 0, Inventory.available + striped_available(Inventory.id) + delta >= 0)
+        )
+    result = await db.execute(stmt.execution_options(synchronize_session=False))
+    return set(result.scalars().all())
+
+
+async def create_movements_bulk(
+    db: AsyncSession, payloads: list[StockMovementCreate], prevent_negative: bool = False
+) -> dict[uuid.UUID, int]:
+    deltas: dict[uuid.UUID, int] = defaultdict(int)
+    for payload in payloads:
+        deltas[payload.inventory_id] += payload.quantity_change
+
+    existing = select(Inventory.id).where(Inventory.id.in_(list(deltas)))
+    known = set((await db.execute(existing)).scalars().all())
+    errors = [
+        StockMovementBulkError(
+            index=index, inventory_id=payload.inventory_id, detail="Inventory not found"
+        )
+        for index, payload in enumerate(payloads)
+        if payload.inventory_id not in known
+    ]
+    if errors:
+        raise BulkMovementError(errors)
+
+    try:
+        updated = await apply_inventory_deltas(db, deltas, prevent_negative)
+        rejected = set(deltas) - updated
+        if rejected:
+            raise BulkMovementError(
+                [
+                    StockMovementBulkError(
+                        index=index,
+                        inventory_id=payload.inventory_id,
+                        detail="Movement would leave stock negative",
+                    )
+                    for index, payload in enumerate(payloads)
+                    if payload.inventory_id in rejected
+                ]
+            )
+        # insertmanyvalues agrupa las filas en INSERTs multi-row
+        await db.execute(insert(StockMovement), [payload.model_dump() for payload in payloads])
+        await check_thresholds(db, deltas)
+        await publish_inventory_deltas(db, {inv: (delta, 0) for inv, delta in deltas.items()})
+    except ValueError:
+        await db.rollback()
+        raise
+    await db.commit()
+    return dict(deltas)
+
+
+def encode_movement_cursor(created_at: datetime, movement_id: uuid.UUID) -> str:
+    raw = f"{created_at.isoformat()}|{movement_id}"
+    return base64.urlsafe_b64encode(raw.encode()).decode()
+
+
+def decode_movement_cursor(cursor: str) -> tuple[datetime, uuid.UUID]:
+    try:
+        created_at, movement_id = base64.urlsafe_b64decode(cursor.encode()).decode().split("|")
+        return datetime.fromisoformat(created_at), uuid.UUID(movement_id)
+    except (ValueError, UnicodeDecodeError) as exc:
+        raise ValueError("Invalid cursor") from exc
+
+
+async def list_movements(
+    db: AsyncSession,
+    product_id: Optional[uuid.UUID] = None,
+    warehouse_id: Optional[uuid.UUID] = None,
+    reason: Optional[StockMovementReason] = None,
+    reference: Optional[str] = None,
+    created_from: Optional[datetime] = None,
+    created_to: Optional[datetime] = None,
+    cursor: Optional[str] = None,
+    limit: int = 100,
+) -> tuple[list[Row], Optional[str]]:
+    stmt = (
+        select(
+            StockMovement.id,
+            StockMovement.inventory_id,
+            StockMovement.quantity_change,
+            StockMovement.reason,
+            StockMovement.reference,
+            StockMovement.amount,
+            StockMovement.created_at,
+            Inventory.product_id,
+            Inventory.variant_id,
+            Inventory.warehouse_id,
+            Product.name.label("product_name"),
+            Warehouse.name.label("warehouse_name"),
+        )
+        .join(Inventory, StockMovement.inventory_id == Inventory.id)
+        .join(Product, Inventory.product_id == Product.id)
+        .join(Warehouse, Inventory.warehouse_id == Warehouse.id)
+    )
+    if product_id:
+        stmt = stmt.where(Inventory.product_id == product_id)
+    if warehouse_id:
+        stmt = stmt.where(Inventory.warehouse_id == warehouse_id)
+    if reason:
+        stmt = stmt.where(StockMovement.reason == reason)
+    if reference:
+        stmt = stmt.where(StockMovement.reference == reference)
+    if created_from:
+        stmt = stmt.where(StockMovement.created_at >= created_from)
+    if created_to:
+        stmt = stmt.where(StockMovement.created_at < created_to)
+    if cursor:
+        # Keyset: sigue desde la última fila vista usando el índice (created_at, id)
+        last_created_at, last_id = decode_movement_cursor(cursor)
+        stmt = stmt.where(
+            tuple_(StockMovement.created_at, StockMovement.id) < tuple_(last_created_at, last_id)
+        )
+    stmt = stmt.order_by(StockMovement.created_at.desc(), StockMovement.id.desc()).limit(limit + 1)
+    rows = list((await db.execute(stmt)).all())
+    next_cursor = None
+    if len(rows) > limit:
+        rows = rows[:limit]
+        next_cursor = encode_movement_cursor(rows[-1].created_at, rows[-1].id)
+    return rows, next_cursor
+
+
+async def stock_overview(
+    db: AsyncSession,
+    limit: int = 50,
+    offset: int = 0,
+    sort: Literal["scarcity", "name"] = "scarcity",
+    warehouse_id: Optional[uuid.UUID] = None,
+) -> list[StockOverviewProduct]:
+    """Totales por producto con desglose por depósito en una sola consulta agrupada.
+
+    La paginación es por producto: un dense_rank numera los productos y se filtran las filas del
+    rango pedido.
+    """
+    totals = stripe_totals()
+    # Subconsulta correlacionada: usa el índice (inventory_id, created_at), no agrupa el ledger
+    last_movement = (
+        select(func.max(StockMovement.created_at))
+        .where(StockMovement.inventory_id == Inventory.id)
+        .correlate(Inventory)
+        .scalar_subquery()
+    )
+    per_inventory = select(
+        Inventory.product_id,
+        Inventory.warehouse_id,
+        (Inventory.available + func.coalesce(totals.c.available, 0)).label("available"),
+        (Inventory.reserved + func.coalesce(totals.c.reserved, 0)).label("reserved"),
+        last_movement.label("last_movement_at"),
+    ).outerjoin(totals, totals.c.inventory_id == Inventory.id)
+    if warehouse_id:
+        per_inventory = per_inventory.where(Inventory.warehouse_id == warehouse_id)
+    per_inventory = per_inventory.subquery()
+
+    available = func.sum(per_inventory.c.available)
+    reserved = func.sum(per_inventory.c.reserved)
+    last_movement_at = func.max(per_inventory.c.last_movement_at)
+    by_product = {"partition_by": per_inventory.c.product_id}
+    grouped = (
+        select(
+            per_inventory.c.product_id,
+            Product.name.label("product_name"),
+            per_inventory.c.warehouse_id,
+            Warehouse.name.label("warehouse_name"),
+            available.label("available"),
+            reserved.label("reserved"),
+            last_movement_at.label("last_movement_at"),
+            func.sum(available).over(**by_product).label("product_available"),
+            func.sum(reserved).over(**by_product).label("product_reserved"),
+            func.max(last_movement_at).over(**by_product).label("product_last_movement_at"),
+        )
+        .join(Product, Product.id == per_inventory.c.product_id)
+        .join(Warehouse, Warehouse.id == per_inventory.c.warehouse_id)
+        .group_by(
+            per_inventory.c.product_id, Product.name, per_inventory.c.warehouse_id, Warehouse.name
+        )
+        .subquery()
+    )
+    # Escasez = menos unidades disponibles primero; el nombre desempata de forma estable
+    order = (grouped.c.product_name, grouped.c.product_id)
+    if sort == "scarcity":
+        order = (grouped.c.product_available,) + order
+    ranked = select(
+        grouped,
+        func.dense_rank().over(order_by=order).label("page_rank"),
+    ).subquery()
+    stmt = (
+        select(ranked)
+        .where(ranked.c.page_rank > offset, ranked.c.page_rank <= offset + limit)
+        .order_by(ranked.c.page_rank, ranked.c.warehouse_name)
+    )
+    products: dict[uuid.UUID, StockOverviewProduct] = {}
+    for row in (await db.execute(stmt)).all():
+        product = products.get(row.product_id)
+        if product is None:
+            product = products[row.product_id] = StockOverviewProduct(
+                product_id=row.product_id,
+                product_name=row.product_name,
+                available=row.product_available,
+                reserved=row.product_reserved,
+                last_movement_at=row.product_last_movement_at,
+                warehouses=[],
+            )
+        product.warehouses.append(
+            StockOverviewWarehouse(
+                warehouse_id=row.warehouse_id,
+                warehouse_name=row.warehouse_name,
+                available=row.available,
+                reserved=row.reserved,
+                last_movement_at=row.last_movement_at,
+            )
+        )
+    return list(products.values())
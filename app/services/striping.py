@@ -0,0 +1,153 @@
+import random
+import uuid
+from typing import Iterable, Optional
+
+from sqlalchemy import delete, func, insert, select, update
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.models.stock import Inventory, InventoryStripe
+
+MAX_STRIPES = 64
+
+
+def stripe_totals():
+    return (
+        select(
+            InventoryStripe.inventory_id,
+            func.sum(InventoryStripe.available).label("available"),
+            func.sum(InventoryStripe.reserved).label("reserved"),
+        )
+        .group_by(InventoryStripe.inventory_id)
+        .subquery()
+    )
+
+
+def striped_available(inventory_id):
+    return (
+        select(func.coalesce(func.sum(InventoryStripe.available), 0))
+        .where(InventoryStripe.inventory_id == inventory_id)
+        .scalar_subquery()
+    )
+
+
+async def take_stock(
+    db: AsyncSession,
+    inventory_id: uuid.UUID,
+    quantity: int,
+    stripe_count: int = 0,
+    reserve: bool = True,
+) -> bool:
+    """Descuenta quantity de available (y la suma a reserved si reserve).
+
+    Con stripes no pasa por la fila principal.
+    """
+    reserved_change = quantity if reserve else 0
+    if stripe_count:
+        # Arranca en un stripe al azar para que reservas concurrentes no compitan por la misma fila
+        start = random.randrange(stripe_count)
+        for offset in range(stripe_count):
+            stripe = (start + offset) % stripe_count
+            taken = await db.execute(
+                update(InventoryStripe)
+                .where(
+                    InventoryStripe.inventory_id == inventory_id,
+                    InventoryStripe.stripe == stripe,
+                    InventoryStripe.available >= quantity,
+                )
+                .values(
+                    available=InventoryStripe.available - quantity,
+                    reserved=InventoryStripe.reserved + reserved_change,
+                )
+                .returning(InventoryStripe.stripe)
+                .execution_options(synchronize_session=False)
+            )
+            if taken.first() is not None:
+                return True
+    stmt = (
+        update(Inventory)
+        .where(Inventory.id == inventory_id, Inventory.available >= quantity)
+        .values(
+            available=Inventory.available - quantity, reserved=Inventory.reserved + reserved_change
+        )
+        .returning(Inventory.id)
+        .execution_options(synchronize_session=False)
+    )
+    if (await db.execute(stmt)).first() is not None:
+        return True
+    if stripe_count:
+        # Stock fragmentado entre stripes: se junta todo en la fila principal y se reintenta una vez
+        await fold_stripes(db, [inventory_id], respread=False)
+        return (await db.execute(stmt)).first() is not None
+    return False
+
+
+async def fold_stripes(
+    db: AsyncSession, inventory_ids: Optional[Iterable[uuid.UUID]] = None, respread: bool = True
+) -> int:
+    """Vuelca los stripes en la fila principal; con respread reparte el available en partes iguales.
+
+    No hace commit: el llamador decide el límite de la transacción.
+    """
+    stmt = (
+        select(Inventory)
+        .where(Inventory.stripe_count > 0)
+        .order_by(Inventory.id)
+        .with_for_update()
+        .execution_options(populate_existing=True)
+    )
+    if inventory_ids is not None:
+        stmt = stmt.where(Inventory.id.in_(list(inventory_ids)))
+    inventories = list((await db.execute(stmt)).scalars().all())
+    if not inventories:
+        return 0
+    stripes = (
+        await db.execute(
+            select(InventoryStripe)
+            .where(InventoryStripe.inventory_id.in_([inv.id for inv in inventories]))
+            .order_by(InventoryStripe.inventory_id, InventoryStripe.stripe)
+            .with_for_update()
+            .execution_options(populate_existing=True)
+        )
+    ).scalars().all()
+    by_inventory: dict[uuid.UUID, list[InventoryStripe]] = {inv.id: [] for inv in inventories}
+    for stripe in stripes:
+        by_inventory[stripe.inventory_id].append(stripe)
+    for inv in inventories:
+        rows = by_inventory[inv.id]
+        available = (inv.available or 0) + sum(s.available or 0 for s in rows)
+        inv.reserved = (inv.reserved or 0) + sum(s.reserved or 0 for s in rows)
+        share, remainder = (
+            divmod(available, len(rows)) if respread and rows and available > 0 else (0, 0)
+        )
+        for stripe in rows:
+            stripe.reserved = 0
+            stripe.available = share + (1 if stripe.stripe < remainder else 0)
+        inv.available = available - sum(s.available for s in rows)
+    await db.flush()
+    return len(inventories)
+
+
+async def set_stripe_count(
+    db: AsyncSession, inventory_id: uuid.UUID, stripe_count: int
+) -> Inventory:
+    if stripe_count < 0 or stripe_count > MAX_STRIPES:
+        raise ValueError(f"stripe_count must be between 0 and {MAX_STRIPES}")
+    inventory = await db.get(Inventory, inventory_id, with_for_update=True)
+    if not inventory:
+        raise ValueError("Inventory not found")
+    await fold_stripes(db, [inventory_id], respread=False)
+    await db.execute(delete(InventoryStripe).where(InventoryStripe.inventory_id == inventory_id))
+    inventory.stripe_count = stripe_count
+    if stripe_count:
+        await db.execute(
+            insert(InventoryStripe),
+            [
+                {"inventory_id": inventory_id, "stripe": i, "available": 0, "reserved": 0}
+                for i in range(stripe_count)
+            ],
+        )
+        await db.flush()
+        await fold_stripes(db, [inventory_id])
+    await db.commit()
+    await db.refresh(inventory)
+    return inventory
@@ -0,0 +1,164 @@
+import uuid
+from collections import defaultdict
+
+from sqlalchemy import insert, select
+from sqlalchemy.dialects import postgresql, sqlite
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.models.stock import Inventory, StockMovement, StockMovementReason
+from app.schemas.stock import StockMovementBulkError, StockTransferCreate, StockTransferOut
+from app.services.alerts import check_thresholds
+from app.services.allocation import stock_key, variant_filter
+from app.services.realtime import publish_inventory_deltas
+from app.services.stock import BulkMovementError, apply_inventory_deltas
+
+
+def _reference() -> str:
+    return f"TRF-{uuid.uuid4().hex[:10].upper()}"
+
+
+async def _load_locations(
+    db: AsyncSession, transfers: list[StockTransferCreate], locations: dict[tuple, uuid.UUID]
+) -> None:
+    stmt = select(
+        Inventory.id, Inventory.product_id, Inventory.variant_id, Inventory.warehouse_id
+    ).where(variant_filter({stock_key(t) for t in transfers}))
+    for row in await db.execute(stmt):
+        locations[(row.product_id, row.variant_id, row.warehouse_id)] = row.id
+
+
+async def _resolve_inventories(
+    db: AsyncSession, transfers: list[StockTransferCreate]
+) -> dict[tuple, uuid.UUID]:
+    """Inventario por (product_id, variant_id, warehouse_id); crea vacíos los destinos faltantes.
+
+    El alta va con ON CONFLICT DO NOTHING sobre uq_inventories_stock_location: si otra
+    transferencia crea el mismo destino a la vez, se espera su commit y se relee su fila.
+    """
+    locations: dict[tuple, uuid.UUID] = {}
+    await _load_locations(db, transfers, locations)
+    missing = [
+        index
+        for index, transfer in enumerate(transfers)
+        if (*stock_key(transfer), transfer.from_warehouse_id) not in locations
+    ]
+    if missing:
+        raise BulkMovementError(
+            [
+                StockMovementBulkError(index=index, detail="Source inventory not found")
+                for index in missing
+            ]
+        )
+    destinations = {(*stock_key(t), t.to_warehouse_id) for t in transfers} - locations.keys()
+    if destinations:
+        dialect = postgresql if db.get_bind().dialect.name == "postgresql" else sqlite
+        created = await db.execute(
+            dialect.insert(Inventory)
+            .values(
+                [
+                    {
+                        "product_id": product_id,
+                        "variant_id": variant_id,
+                        "warehouse_id": warehouse_id,
+                        "available": 0,
+                        "reserved": 0,
+                    }
+                    for product_id, variant_id, warehouse_id in sorted(destinations, key=str)
+                ]
+            )
+            .on_conflict_do_nothing()
+            .returning(
+                Inventory.id, Inventory.product_id, Inventory.variant_id, Inventory.warehouse_id
+            )
+        )
+        for row in created.all():
+            locations[(row.product_id, row.variant_id, row.warehouse_id)] = row.id
+        if destinations - locations.keys():
+            # Los creó otra transacción que ya hizo commit
+            await _load_locations(db, transfers, locations)
+    return locations
+
+
+async def transfer_stock(
+    db: AsyncSession, transfers: list[StockTransferCreate]
+) -> list[StockTransferOut]:
+    """Debita el origen, acredita el destino y escribe el par de movimientos de cada transferencia.
+
+    Todo el lote va en una sola transacción.
+    """
+    invalid = [
+        index
+        for index, transfer in enumerate(transfers)
+        if transfer.from_warehouse_id == transfer.to_warehouse_id
+    ]
+    if invalid:
+        raise BulkMovementError(
+            [
+                StockMovementBulkError(index=index, detail="Source and destination must differ")
+                for index in invalid
+            ]
+        )
+
+    try:
+        locations = await _resolve_inventories(db, transfers)
+        results: list[StockTransferOut] = []
+        deltas: dict[uuid.UUID, int] = defaultdict(int)
+        for transfer in transfers:
+            key = stock_key(transfer)
+            result = StockTransferOut(
+                reference=transfer.reference or _reference(),
+                product_id=transfer.product_id,
+                variant_id=transfer.variant_id,
+                from_inventory_id=locations[(*key, transfer.from_warehouse_id)],
+                to_inventory_id=locations[(*key, transfer.to_warehouse_id)],
+                quantity=transfer.quantity,
+            )
+            deltas[result.from_inventory_id] -= result.quantity
+            deltas[result.to_inventory_id] += result.quantity
+            results.append(result)
+
+        # Locks siempre en orden de id: lotes concurrentes con inventarios cruzados no se traban
+        await db.execute(
+            select(Inventory.id)
+            .where(Inventory.id.in_(list(deltas)))
+            .order_by(Inventory.id)
+            .with_for_update()
+        )
+        rejected = set(deltas) - await apply_inventory_deltas(db, deltas, prevent_negative=True)
+        if rejected:
+            raise BulkMovementError(
+                [
+                    StockMovementBulkError(
+                        index=index,
+                        inventory_id=result.from_inventory_id,
+                        detail="Transfer would leave source stock negative",
+                    )
+                    for index, result in enumerate(results)
+                    if result.from_inventory_id in rejected
+                ]
+            )
+        await db.execute(
+            insert(StockMovement),
+            [
+                {
+                    "inventory_id": inventory_id,
+                    "quantity_change": change,
+                    "reason": StockMovementReason.transfer,
+                    "reference": result.reference,
+                }
+                for result in results
+                for inventory_id, change in (
+                    (result.from_inventory_id, -result.quantity),
+                    (result.to_inventory_id, result.quantity),
+                )
+            ],
+        )
+        await check_thresholds(db, deltas)
+        await publish_inventory_deltas(
+            db, {inventory_id: (delta, 0) for inventory_id, delta in deltas.items() if delta}
+        )
+    except ValueError:
+        await db.rollback()
+        raise
+    await db.commit()
+    return results
@@ -0,0 +1,187 @@
+"""Microbenchmark: integer-cent Money vs. the previous Decimal pricing path.
+
+"before" is the Decimal implementation calculate_totals had until amounts moved to Money, kept here
+as the baseline. Pure Python, no database needed:
+
+    python -m benchmarks.money_totals --carts 2000 --items 8 --orders 5000
+
+Medido en una máquina de desarrollo (varía entre corridas): totals/cart queda a la par o apenas
+más rápido (0.95-1.25x). json/order es una regresión aceptada: 0.27-0.32x, unos 1.4 us -> 4.5 us
+por pedido, porque pydantic llama a Python para serializar Money y Decimal lo resuelve en Rust.
+Se acepta a cambio de importes exactos y una sola representación.
+"""
+
+import argparse
+import random
+import time
+from datetime import date
+from decimal import Decimal
+
+from pydantic import BaseModel, TypeAdapter
+from sqlalchemy.orm.attributes import set_committed_value
+
+from app.core.money import Money
+from app.models.cart import Cart, CartItem
+from app.models.config import GuaranteeConfig, LogisticsConfig, Season
+from app.services.order import calculate_totals
+from app.services.seasons import SeasonIndex
+
+AMOUNT_FIELDS = (
+    "subtotal",
+    "logistics_cost",
+    "guarantee_amount",
+    "total",
+    "reservation_required",
+    "outstanding_balance",
+)
+
+
+def _decimal_totals(cart, logistics_config, guarantee_config, index) -> dict:
+    subtotal = Decimal("0")
+    guarantee_base = Decimal("0")
+    for item in cart.items:
+        line_subtotal = Decimal(item.price_per_day) * item.quantity * item.days
+        subtotal += line_subtotal
+        if item.requires_guarantee:
+            guarantee_base += line_subtotal
+    logistics_cost = Decimal(logistics_config.base_fee or 0) + Decimal(
+        logistics_config.default_tolls or 0
+    )
+    logistics_cost += Decimal(logistics_config.hourly_vehicle_fee or 0) * Decimal(
+        cart.logistics_hours or 1
+    )
+    logistics_cost += Decimal(cart.tolls or 0)
+    guarantee_amount = guarantee_base * Decimal(guarantee_config.percentage or 0)
+    if guarantee_config.apply_tax:
+        guarantee_amount *= Decimal(1) + Decimal(guarantee_config.tax_rate or 0)
+    total = subtotal + logistics_cost + guarantee_amount
+    season = index.winner(cart.event_start, cart.event_end)
+    reservation_required = total * Decimal(season.deposit_ratio) if season else Decimal("0")
+    return {
+        "subtotal": subtotal.quantize(Decimal("0.01")),
+        "logistics_cost": logistics_cost.quantize(Decimal("0.01")),
+        "guarantee_amount": guarantee_amount.quantize(Decimal("0.01")),
+        "total": total.quantize(Decimal("0.01")),
+        "reservation_required": reservation_required.quantize(Decimal("0.01")),
+        "outstanding_balance": (total - reservation_required).quantize(Decimal("0.01")),
+    }
+
+
+class DecimalAmounts(BaseModel):
+    subtotal: Decimal
+    logistics_cost: Decimal
+    guarantee_amount: Decimal
+    total: Decimal
+    reservation_required: Decimal
+    outstanding_balance: Decimal
+
+
+class MoneyAmounts(BaseModel):
+    subtotal: Money
+    logistics_cost: Money
+    guarantee_amount: Money
+    total: Money
+    reservation_required: Money
+    outstanding_balance: Money
+
+
+def _timed(fn, repeat: int = 5) -> float:
+    # Mejor de varias corridas: descarta ruido de GC y de otros procesos
+    best = float("inf")
+    for _ in range(repeat):
+        started = time.perf_counter()
+        fn()
+        best = min(best, time.perf_counter() - started)
+    return best
+
+
+def _report(label: str, before: float, after: float, count: int) -> None:
+    before_us, after_us = before * 1e6 / count, after * 1e6 / count
+    ratio = before / after
+    print(f"{label:<14} before {before_us:8.2f} us  after {after_us:8.2f} us  ({ratio:.2f}x)")
+
+
+def run(cart_count: int, item_count: int, order_count: int, seed: int) -> None:
+    rng = random.Random(seed)
+    season = Season(
+        name="Alta",
+        start_date=date(2026, 12, 1),
+        end_date=date(2027, 1, 31),
+        high_season=True,
+        deposit_ratio=Decimal("0.5"),
+    )
+    index = SeasonIndex([season])
+    guarantee = GuaranteeConfig(
+        percentage=Decimal("0.15"), apply_tax=True, tax_rate=Decimal("0.21")
+    )
+    decimal_logistics = LogisticsConfig(
+        base_fee=Decimal("100"), hourly_vehicle_fee=Decimal("50"), default_tolls=Decimal("20")
+    )
+    money_logistics = LogisticsConfig(
+        base_fee=Money(10000), hourly_vehicle_fee=Money(5000), default_tolls=Money(2000)
+    )
+    decimal_carts, money_carts = [], []
+    for _ in range(cart_count):
+        lines = [
+            (
+                rng.randrange(1, 100_000),
+                rng.randrange(1, 40),
+                rng.randrange(1, 5),
+                rng.random() < 0.5,
+            )
+            for _ in range(item_count)
+        ]
+        for carts, as_decimal in ((decimal_carts, True), (money_carts, False)):
+            cart = Cart(
+                event_start=date(2026, 12, 24),
+                event_end=date(2026, 12, 26),
+                logistics_hours=2,
+                tolls=0,
+            )
+            cart.items = [
+                CartItem(price_per_day=Money(c), quantity=q, days=d, requires_guarantee=g)
+                for c, q, d, g in lines
+            ]
+            if as_decimal:
+                # El validador de CartItem pasa a Money; la línea base guarda Decimal como antes
+                for item, (c, *_) in zip(cart.items, lines, strict=True):
+                    set_committed_value(item, "price_per_day", Decimal(c).scaleb(-2))
+            carts.append(cart)
+
+    before = _timed(
+        lambda: [
+            _decimal_totals(cart, decimal_logistics, guarantee, index) for cart in decimal_carts
+        ]
+    )
+    after = _timed(
+        lambda: [calculate_totals(cart, money_logistics, guarantee, index) for cart in money_carts]
+    )
+    _report("totals/cart", before, after, cart_count)
+
+    amounts = [
+        {name: rng.randrange(1, 10_000_000) for name in AMOUNT_FIELDS} for _ in range(order_count)
+    ]
+    decimal_rows = [
+        DecimalAmounts(**{k: Decimal(v).scaleb(-2) for k, v in row.items()}) for row in amounts
+    ]
+    money_rows = [MoneyAmounts(**{k: Money(v) for k, v in row.items()}) for row in amounts]
+    decimal_adapter, money_adapter = (
+        TypeAdapter(list[DecimalAmounts]),
+        TypeAdapter(list[MoneyAmounts]),
+    )
+    assert decimal_adapter.dump_json(decimal_rows) == money_adapter.dump_json(money_rows), (
+        "El JSON publicado cambió"
+    )
+    before = _timed(lambda: decimal_adapter.dump_json(decimal_rows))
+    after = _timed(lambda: money_adapter.dump_json(money_rows))
+    _report("json/order", before, after, order_count)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--carts", type=int, default=2000)
+    parser.add_argument("--items", type=int, default=8)
+    parser.add_argument("--orders", type=int, default=5000)
+    parser.add_argument("--seed", type=int, default=1)
+    args = parser.parse_args()
+    run(args.carts, args.items, args.orders, args.seed)
@@ -0,0 +1,69 @@
+"""Microbenchmark: SeasonIndex vs. the linear overlaps_high_season scan.
+
+Pure Python, no database needed:
+
+    python -m benchmarks.season_overlap --seasons 5000 --queries 20000
+"""
+
+import argparse
+import random
+import time
+from datetime import date, timedelta
+from decimal import Decimal
+
+from app.models.config import Season
+from app.services.order import overlaps_high_season
+from app.services.seasons import SeasonIndex
+
+
+def _synthetic_seasons(count: int, rng: random.Random) -> list[Season]:
+    origin = date(2020, 1, 1)
+    seasons = []
+    for i in range(count):
+        start = origin + timedelta(days=rng.randrange(3650))
+        seasons.append(
+            Season(
+                name=f"bench-{i}",
+                start_date=start,
+                end_date=start + timedelta(days=rng.randrange(1, 45)),
+                high_season=rng.random() < 0.7,
+                deposit_ratio=Decimal(rng.choice(["0.2", "0.3", "0.5"])),
+            )
+        )
+    return seasons
+
+
+def run(season_count: int, query_count: int, seed: int) -> None:
+    rng = random.Random(seed)
+    seasons = _synthetic_seasons(season_count, rng)
+    queries = []
+    for _ in range(query_count):
+        start = date(2020, 1, 1) + timedelta(days=rng.randrange(3700))
+        queries.append((start, start + timedelta(days=rng.randrange(1, 5))))
+
+    started = time.perf_counter()
+    index = SeasonIndex(seasons)
+    build = time.perf_counter() - started
+
+    started = time.perf_counter()
+    indexed = [index.winner(start, end) for start, end in queries]
+    indexed_time = time.perf_counter() - started
+
+    started = time.perf_counter()
+    linear = [overlaps_high_season(start, end, seasons) for start, end in queries]
+    linear_time = time.perf_counter() - started
+
+    assert indexed == linear, "SeasonIndex y el recorrido lineal difieren"
+    print(f"seasons={season_count} queries={query_count} build={build * 1000:.1f}ms")
+    print(f"linear  {linear_time * 1e6 / query_count:10.1f} us/query")
+    speedup = linear_time / indexed_time
+    print(f"indexed {indexed_time * 1e6 / query_count:10.1f} us/query  ({speedup:.0f}x)")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--seasons", type=int, default=5000)
+    parser.add_argument("--queries", type=int, default=20000)
+    parser.add_argument("--seed", type=int, default=1)
+    args = parser.parse_args()
+    run(args.seasons, args.queries, args.seed)
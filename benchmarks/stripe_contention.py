@@ -0,0 +1,74 @@
+"""Contention benchmark for striped inventory counters.
+
+Needs a real Postgres (row locks are what is being measured); uses DATABASE_URL:
+
+    python -m benchmarks.stripe_contention --workers 32 --seconds 10
+"""
+
+import argparse
+import asyncio
+import time
+
+from sqlalchemy import delete, update
+
+from app.db.session import AsyncSessionLocal, engine
+from app.models.catalog import Product
+from app.models.stock import Inventory, Warehouse
+from app.services.striping import set_stripe_count, take_stock
+
+STRIPE_COUNTS = (1, 4, 16)
+
+
+async def _worker(inventory_id, stripe_count: int, deadline: float) -> int:
+    done = 0
+    async with AsyncSessionLocal() as session:
+        while time.perf_counter() < deadline:
+            if await take_stock(session, inventory_id, 1, stripe_count):
+                done += 1
+            await session.commit()
+    return done
+
+
+async def run(workers: int, seconds: float) -> None:
+    async with AsyncSessionLocal() as session:
+        product = Product(name="bench-stripes", base_price=1)
+        warehouse = Warehouse(name="bench-stripes")
+        session.add_all([product, warehouse])
+        await session.commit()
+        inventory = Inventory(
+            product_id=product.id, warehouse_id=warehouse.id, available=0, reserved=0
+        )
+        session.add(inventory)
+        await session.commit()
+    try:
+        for stripe_count in STRIPE_COUNTS:
+            async with AsyncSessionLocal() as session:
+                await set_stripe_count(session, inventory.id, 0)
+                await session.execute(
+                    update(Inventory)
+                    .where(Inventory.id == inventory.id)
+                    .values(available=10_000_000, reserved=0)
+                )
+                await session.commit()
+                await set_stripe_count(session, inventory.id, stripe_count)
+            deadline = time.perf_counter() + seconds
+            counts = await asyncio.gather(
+                *(_worker(inventory.id, stripe_count, deadline) for _ in range(workers))
+            )
+            rate = sum(counts) / seconds
+            print(f"stripes={stripe_count:>2} workers={workers} reservations/s={rate:,.0f}")
+    finally:
+        async with AsyncSessionLocal() as session:
+            await session.execute(delete(Inventory).where(Inventory.id == inventory.id))
+            await session.execute(delete(Product).where(Product.id == product.id))
+            await session.execute(delete(Warehouse).where(Warehouse.id == warehouse.id))
+            await session.commit()
+        await engine.dispose()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--workers", type=int, default=32)
+    parser.add_argument("--seconds", type=float, default=10)
+    args = parser.parse_args()
+    asyncio.run(run(args.workers, args.seconds))
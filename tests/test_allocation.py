@@ -0,0 +1,61 @@
+import uuid
+
+from app.models.stock import Inventory
+from app.services.allocation import plan_allocation
+
+CHAIR, TABLE = uuid.uuid4(), uuid.uuid4()
+CENTRAL, NORTH, SOUTH = uuid.uuid4(), uuid.uuid4(), uuid.uuid4()
+
+
+def _inv(warehouse_id, product_id, available, variant_id=None):
+    return Inventory(
+        id=uuid.uuid4(),
+        warehouse_id=warehouse_id,
+        product_id=product_id,
+        variant_id=variant_id,
+        available=available,
+        reserved=0,
+    )
+
+
+def test_plan_minimizes_warehouses_touched():
+    inventories = [
+        _inv(CENTRAL, CHAIR, 80),
+        _inv(NORTH, CHAIR, 60),
+        _inv(NORTH, TABLE, 10),
+        _inv(SOUTH, TABLE, 10),
+    ]
+
+    plan = plan_allocation({(CHAIR, None): 50, (TABLE, None): 8}, inventories)
+
+    assert plan.feasible
+    assert plan.warehouse_ids == [NORTH]
+    assert sum(p.quantity for p in plan.picks if p.product_id == CHAIR) == 50
+
+
+def test_plan_prefers_configured_warehouse_and_reports_shortages():
+    inventories = [_inv(CENTRAL, CHAIR, 40), _inv(NORTH, CHAIR, 40)]
+
+    plan = plan_allocation({(CHAIR, None): 30}, inventories, preferred_warehouse_id=NORTH)
+    assert plan.warehouse_ids == [NORTH]
+
+    short = plan_allocation({(CHAIR, None): 100, (TABLE, None): 1}, inventories)
+    assert not short.feasible
+    assert {(s.product_id, s.quantity) for s in short.shortages} == {(CHAIR, 20), (TABLE, 1)}
+
+
+def test_plan_keeps_variants_apart():
+    red, blue = uuid.uuid4(), uuid.uuid4()
+    inventories = [
+        _inv(CENTRAL, CHAIR, 10, red),
+        _inv(NORTH, CHAIR, 50, blue),
+        _inv(SOUTH, CHAIR, 50),
+    ]
+
+    plan = plan_allocation({(CHAIR, red): 8}, inventories)
+    assert plan.feasible
+    assert [(p.warehouse_id, p.variant_id) for p in plan.picks] == [(CENTRAL, red)]
+
+    short = plan_allocation({(CHAIR, red): 20}, inventories)
+    assert not short.feasible
+    assert [(s.variant_id, s.quantity) for s in short.shortages] == [(red, 10)]
@@ -0,0 +1,47 @@
+from datetime import datetime, timedelta
+from decimal import Decimal
+
+import pytest
+from sqlalchemy import func, select
+
+from app.models.catalog import Product
+from app.models.order import Order, OrderItem, OrderReturn, OrderStatus
+from app.schemas.order import OrderOut
+from app.services.archive import archive_closed_orders, get_archived_order, list_archived_orders
+
+
+def _order(code: str, status: OrderStatus, updated_at: datetime, product: Product) -> Order:
+    order = Order(code=code, status=status, updated_at=updated_at)
+    order.items = [
+        OrderItem(
+            product_id=product.id, quantity=2, unit_price=Decimal("10"), total_price=Decimal("20")
+        )
+    ]
+    return order
+
+
+@pytest.mark.asyncio
+async def test_closed_orders_move_to_archive_in_batches(session):
+    product = Product(name="Silla Tiffany", base_price=Decimal("10"))
+    session.add(product)
+    await session.commit()
+    old = datetime.utcnow() - timedelta(days=400)
+    returned = _order("R-1", OrderStatus.returned, old, product)
+    returned.returns = [OrderReturn(breakage_cost=Decimal("5"))]
+    cancelled = _order("C-1", OrderStatus.cancelled, old, product)
+    recent = _order("C-2", OrderStatus.cancelled, datetime.utcnow(), product)
+    active = _order("A-1", OrderStatus.delivered, old, product)
+    session.add_all([returned, cancelled, recent, active])
+    await session.commit()
+
+    assert await archive_closed_orders(session, older_than_days=180, batch_size=1) == 2
+
+    hot = (await session.execute(select(Order.code).order_by(Order.code))).scalars().all()
+    assert hot == ["A-1", "C-2"]
+    assert (await session.execute(select(func.count()).select_from(OrderItem))).scalar_one() == 2
+    archived = await list_archived_orders(session)
+    assert sorted(o.code for o in archived) == ["C-1", "R-1"]
+    restored = await get_archived_order(session, returned.id)
+    assert restored.items[0].product_name == "Silla Tiffany"
+    assert restored.archived_at is not None
+    assert OrderOut.model_validate(restored).items[0].quantity == 2
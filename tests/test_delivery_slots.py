@@ -0,0 +1,83 @@
+from datetime import date
+from decimal import Decimal
+
+import pytest
+from sqlalchemy import select
+from sqlalchemy.orm import selectinload
+
+from app.models.cart import Cart, CartItem
+from app.models.catalog import Product
+from app.models.delivery import DeliverySlot
+from app.models.order import Order, OrderStatus
+from app.models.shared import DeliveryMethod
+from app.services.order import create_order_from_cart, update_order_status
+from app.services.slots import available_slots, create_slot
+
+SATURDAY = date(2026, 11, 7)
+
+
+async def _cart(session, product, token):
+    cart = Cart(
+        session_token=token,
+        delivery_type=DeliveryMethod.delivery,
+        event_start=SATURDAY,
+        event_end=date(2026, 11, 9),
+    )
+    cart.items = [
+        CartItem(product_id=product.id, quantity=1, days=1, price_per_day=Decimal("10.00"))
+    ]
+    session.add(cart)
+    await session.commit()
+    return cart
+
+
+async def _reload(session, model, key):
+    # Un checkout rechazado hace rollback y expira lo cargado en la sesión
+    options = (selectinload(Cart.items),) if model is Cart else ()
+    return (
+        await session.execute(select(model).options(*options).where(model.id == key))
+    ).scalar_one()
+
+
+@pytest.mark.asyncio
+async def test_slot_capacity_is_enforced_and_released(session):
+    product = Product(name="Mesa", base_price=Decimal("10"))
+    session.add(product)
+    await session.commit()
+    morning = await create_slot(
+        session, DeliverySlot(label="Sábado 09-13", weekday=SATURDAY.weekday(), capacity=1)
+    )
+    anytime = await create_slot(session, DeliverySlot(label="Todo el día", capacity=3))
+    morning_id = morning.id
+
+    anytime_id = anytime.id
+    first = await create_order_from_cart(
+        session, await _cart(session, product, "a"), morning_id, anytime_id
+    )
+    first_id = first.id
+    assert (first.delivery_window, first.return_window) == ("Sábado 09-13", "Todo el día")
+
+    second = await _cart(session, product, "b")
+    second_id = second.id
+    with pytest.raises(ValueError, match="full"):
+        await create_order_from_cart(session, second, morning_id)
+    with pytest.raises(ValueError, match="not offered"):
+        await create_order_from_cart(
+            session, await _reload(session, Cart, second_id), anytime_id, morning_id
+        )
+
+    slots = await available_slots(session, date(2026, 11, 7), date(2026, 11, 9))
+    assert [(s.label, s.day, s.booked, s.available) for s in slots] == [
+        ("Sábado 09-13", SATURDAY, 1, 0),
+        ("Todo el día", SATURDAY, 0, 3),
+        ("Todo el día", date(2026, 11, 8), 0, 3),
+        ("Todo el día", date(2026, 11, 9), 1, 2),
+    ]
+
+    await update_order_status(
+        session, await _reload(session, Order, first_id), OrderStatus.cancelled
+    )
+    order = await create_order_from_cart(
+        session, await _reload(session, Cart, second_id), morning_id
+    )
+    assert order.delivery_slot_id == morning_id
@@ -0,0 +1,74 @@
+from datetime import date
+from decimal import Decimal
+
+import pytest
+from sqlalchemy import select
+
+from app.models.cart import Cart, CartItem
+from app.models.catalog import Product
+from app.models.order import DispatchDailyLoad, DispatchLeg, OrderStatus
+from app.models.shared import DeliveryMethod
+from app.services.dispatch import dispatch_board, rebuild_dispatch_load
+from app.services.order import create_order_from_cart, update_order_status
+
+
+async def _checkout(
+    session, product, token, delivery_type, quantity, units_per_box, logistics_hours
+):
+    cart = Cart(
+        session_token=token,
+        delivery_type=delivery_type,
+        event_start=date(2026, 11, 7),
+        event_end=date(2026, 11, 8),
+        logistics_hours=logistics_hours,
+    )
+    cart.items = [
+        CartItem(
+            product_id=product.id,
+            quantity=quantity,
+            days=2,
+            price_per_day=Decimal("10.00"),
+            units_per_box=units_per_box,
+        )
+    ]
+    session.add(cart)
+    await session.commit()
+    return await create_order_from_cart(session, cart)
+
+
+async def _loads(session):
+    ordered = select(DispatchDailyLoad).order_by(DispatchDailyLoad.day, DispatchDailyLoad.leg)
+    rows = (await session.execute(ordered)).scalars().all()
+    return [(r.day, r.leg, r.window, r.orders, r.vehicle_hours, r.items, r.boxes) for r in rows]
+
+
+@pytest.mark.asyncio
+async def test_dispatch_board_follows_order_lifecycle(session):
+    product = Product(name="Copa", base_price=Decimal("10"))
+    session.add(product)
+    await session.commit()
+
+    await _checkout(session, product, "a", DeliveryMethod.delivery, 30, 12, 3)
+    second = await _checkout(session, product, "b", DeliveryMethod.delivery, 5, 1, 2)
+    await _checkout(session, product, "c", DeliveryMethod.pickup, 100, 1, 1)
+
+    board = await dispatch_board(session, date(2026, 11, 1), date(2026, 11, 30))
+    assert [(d.day, d.orders, d.vehicle_hours, d.items, d.boxes) for d in board] == [
+        (date(2026, 11, 7), 2, 5, 35, 8),
+        (date(2026, 11, 8), 2, 5, 35, 8),
+    ]
+    assert [(s.leg, s.window) for s in board[0].slots] == [(DispatchLeg.delivery, None)]
+
+    await update_order_status(session, second, OrderStatus.cancelled)
+    board = await dispatch_board(session, date(2026, 11, 7), date(2026, 11, 7))
+    assert (board[0].orders, board[0].vehicle_hours, board[0].items, board[0].boxes) == (
+        1,
+        3,
+        30,
+        3,
+    )
+
+    # Recalcular desde los pedidos da lo mismo que la tabla mantenida incrementalmente
+    incremental = [row for row in await _loads(session) if row[3]]
+    await rebuild_dispatch_load(session, date(2026, 11, 1), date(2026, 11, 30))
+    assert await _loads(session) == incremental
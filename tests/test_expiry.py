@@ -0,0 +1,89 @@
+from datetime import date, datetime, timedelta
+from decimal import Decimal
+
+import pytest
+from sqlalchemy import select, update
+
+from app.models.cart import Cart
+from app.models.catalog import Product
+from app.models.order import Order, OrderStatus
+from app.models.stock import Inventory, Warehouse
+from app.schemas.cart import CartItemCreate
+from app.schemas.order import OrderReturnCreate
+from app.services import cart as cart_service
+from app.services.expiry import expire_orders
+from app.services.order import create_order_from_cart, register_return, update_order_status
+
+SHIPPED = (OrderStatus.reservation_confirmed, OrderStatus.ready_for_delivery, OrderStatus.delivered)
+
+
+async def _order(session, product, token, quantity, event_end=None):
+    cart = Cart(session_token=token, event_start=event_end, event_end=event_end)
+    session.add(cart)
+    await session.commit()
+    item = CartItemCreate(product_id=product.id, quantity=quantity, price_per_day=Decimal("10"))
+    await cart_service.add_item(session, cart, item, hold_minutes=20)
+    cart = await cart_service.get_cart_by_id(session, cart.id)
+    return await create_order_from_cart(session, cart)
+
+
+@pytest.mark.asyncio
+async def test_sweeper_cancels_only_stale_pending_orders_and_reports_overdue_deliveries(session):
+    product = Product(name="Copa", base_price=Decimal("10"))
+    warehouse = Warehouse(name="Deposito Central")
+    session.add_all([product, warehouse])
+    await session.commit()
+    inventory = Inventory(
+        product_id=product.id, warehouse_id=warehouse.id, available=10, reserved=0
+    )
+    session.add(inventory)
+    await session.commit()
+
+    past = date.today() - timedelta(days=5)
+    unpaid = await _order(session, product, "unpaid", 3)
+    confirmed = await _order(session, product, "confirmed", 1, event_end=past)
+    confirmed = await update_order_status(session, confirmed, OrderStatus.reservation_confirmed)
+    delivered = await _order(session, product, "delivered", 2, event_end=past)
+    for status in SHIPPED:
+        delivered = await update_order_status(session, delivered, status)
+    fresh = await _order(session, product, "fresh", 1)
+    stale_at = datetime.utcnow() - timedelta(days=4)
+    await session.execute(update(Order).where(Order.id == unpaid.id).values(updated_at=stale_at))
+    await session.commit()
+
+    counts = await expire_orders(session, pending_hours=72, overdue_days=2, batch_size=1)
+
+    assert counts == {"cancelled": 1, "released_units": 3, "overdue_deliveries": 1}
+    statuses = dict((await session.execute(select(Order.id, Order.status))).all())
+    assert statuses == {
+        unpaid.id: OrderStatus.cancelled,
+        confirmed.id: OrderStatus.reservation_confirmed,
+        delivered.id: OrderStatus.delivered,
+        fresh.id: OrderStatus.pending_reservation,
+    }
+    # Solo vuelve lo del pedido cancelado; lo entregado espera el acta de devolución
+    await session.refresh(inventory)
+    assert (inventory.available, inventory.reserved) == (6, 4)
+    assert (await expire_orders(session, pending_hours=72, overdue_days=2))["released_units"] == 0
+
+
+@pytest.mark.asyncio
+async def test_register_return_releases_the_reservation(session):
+    product = Product(name="Copa", base_price=Decimal("10"))
+    warehouse = Warehouse(name="Deposito Central")
+    session.add_all([product, warehouse])
+    await session.commit()
+    inventory = Inventory(
+        product_id=product.id, warehouse_id=warehouse.id, available=10, reserved=0
+    )
+    session.add(inventory)
+    await session.commit()
+
+    order = await _order(session, product, "delivered", 2, event_end=date.today())
+    for status in SHIPPED:
+        order = await update_order_status(session, order, status)
+    order = await register_return(session, order, OrderReturnCreate())
+
+    assert order.status == OrderStatus.returned
+    await session.refresh(inventory)
+    assert (inventory.available, inventory.reserved) == (10, 0)
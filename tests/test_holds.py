@@ -0,0 +1,139 @@
+import uuid
+from datetime import datetime, timedelta
+from decimal import Decimal
+
+import pytest
+from sqlalchemy import select
+
+from app.models.cart import Cart, CartItem
+from app.models.catalog import Product
+from app.models.config import GuaranteeConfig, LogisticsConfig
+from app.models.order import OrderStatus
+from app.models.stock import Inventory, StockHold, Warehouse
+from app.schemas.cart import CartItemCreate
+from app.services import cart as cart_service
+from app.services.holds import release_expired_holds
+from app.services.order import create_order_from_cart, reserve_stock, update_order_status
+from app.services.stock import InsufficientStockError
+
+
+async def _setup(session, available: int):
+    product = Product(name="Copa Bordeaux", base_price=Decimal("120"))
+    warehouse = Warehouse(name="Deposito Central")
+    session.add_all([product, warehouse])
+    await session.commit()
+    inventory = Inventory(
+        product_id=product.id, warehouse_id=warehouse.id, available=available, reserved=0
+    )
+    cart = Cart(session_token="holds")
+    session.add_all([inventory, cart])
+    await session.commit()
+    return product, inventory, cart
+
+
+@pytest.mark.asyncio
+async def test_holds_expire_back_into_stock(session):
+    product, inventory, cart = await _setup(session, 10)
+
+    await cart_service.add_item(
+        session,
+        cart,
+        CartItemCreate(product_id=product.id, quantity=4, price_per_day=Decimal("120")),
+        hold_minutes=20,
+    )
+    await session.refresh(inventory)
+    assert inventory.available == 6
+
+    with pytest.raises(InsufficientStockError):
+        await cart_service.add_item(
+            session,
+            cart,
+            CartItemCreate(product_id=product.id, quantity=7, price_per_day=Decimal("120")),
+            hold_minutes=20,
+        )
+
+    assert await release_expired_holds(session, now=datetime.utcnow() + timedelta(hours=1)) == 1
+    await session.refresh(inventory)
+    assert inventory.available == 10
+
+
+@pytest.mark.asyncio
+async def test_checkout_converts_holds_into_reservations(session):
+    product, inventory, cart = await _setup(session, 10)
+    session.add_all(
+        [
+            LogisticsConfig(base_fee=0, hourly_vehicle_fee=0, default_tolls=0),
+            GuaranteeConfig(percentage=0, apply_tax=False, tax_rate=0),
+        ]
+    )
+    await session.commit()
+    await cart_service.add_item(
+        session,
+        cart,
+        CartItemCreate(product_id=product.id, quantity=3, price_per_day=Decimal("120")),
+        hold_minutes=20,
+    )
+    cart = await cart_service.get_cart_by_id(session, cart.id)
+
+    order = await create_order_from_cart(session, cart)
+    await session.refresh(order, attribute_names=["items"])
+    assert order.items[0].reserved_quantity == 3
+    assert (await session.execute(select(StockHold))).scalars().all() == []
+
+    plan = await reserve_stock(session, order)
+    assert plan.picks == []
+    await session.refresh(inventory)
+    assert (inventory.available, inventory.reserved) == (7, 3)
+
+
+@pytest.mark.asyncio
+async def test_cancelling_an_order_returns_its_reservation_to_stock(session):
+    product, inventory, cart = await _setup(session, 10)
+    item = CartItemCreate(product_id=product.id, quantity=4, price_per_day=Decimal("120"))
+    await cart_service.add_item(session, cart, item, hold_minutes=20)
+    cart = await cart_service.get_cart_by_id(session, cart.id)
+    order = await create_order_from_cart(session, cart)
+    await session.refresh(inventory)
+    assert (inventory.available, inventory.reserved) == (6, 4)
+
+    await update_order_status(session, order, OrderStatus.cancelled)
+
+    await session.refresh(inventory)
+    assert (inventory.available, inventory.reserved) == (10, 0)
+
+
+@pytest.mark.asyncio
+async def test_changing_the_quantity_keeps_the_holds_in_the_preferred_warehouse(session):
+    product = Product(name="Copa Flauta", base_price=Decimal("90"))
+    # Sin preferencia, a igual cobertura gana el id menor: el central
+    central = Warehouse(id=uuid.UUID("a" * 32), name="Deposito Central")
+    north = Warehouse(id=uuid.UUID("b" * 32), name="Deposito Norte")
+    cart = Cart(session_token="preferred")
+    session.add_all([product, central, north, cart])
+    await session.commit()
+    session.add_all(
+        [
+            Inventory(product_id=product.id, warehouse_id=w.id, available=10, reserved=0)
+            for w in (central, north)
+        ]
+    )
+    await session.commit()
+
+    await cart_service.add_item(
+        session,
+        cart,
+        CartItemCreate(product_id=product.id, quantity=2, price_per_day=Decimal("90")),
+        hold_minutes=20,
+        preferred_warehouse_id=north.id,
+    )
+    item = await session.scalar(select(CartItem))
+    await cart_service.update_item(
+        session, item, quantity=5, hold_minutes=20, preferred_warehouse_id=north.id
+    )
+
+    held = await session.execute(
+        select(Inventory.warehouse_id, StockHold.quantity).join(
+            StockHold, StockHold.inventory_id == Inventory.id
+        )
+    )
+    assert held.all() == [(north.id, 5)]
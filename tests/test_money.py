@@ -0,0 +1,44 @@
+from decimal import ROUND_HALF_UP, Decimal
+
+import pytest
+from sqlalchemy import text
+
+from app.core.money import Money
+from app.models.catalog import Product
+from app.schemas.order import OrderReturnCreate
+
+
+def test_rounding_rules_and_exact_arithmetic():
+    assert Money.of("2.675") == Decimal("2.68")
+    assert Money.of("2.665") == Decimal("2.66")  # a la par
+    assert Money.of("2.665", ROUND_HALF_UP) == Decimal("2.67")
+    assert Money.of(0.1) + Money.of(0.2) == Money.of("0.30")
+    assert Money(1001).scale(Decimal("0.5")) == Money(500)
+    assert Money(1003).scale(Decimal("0.5")) == Money(502)
+    assert Money(1003).scale(Decimal("0.5"), ROUND_HALF_UP) == Money(502)
+    assert Money(1001).scale(Decimal("0.5"), ROUND_HALF_UP) == Money(501)
+    assert sum([Money(150), Money(250)]) * 3 == Money(1200)
+    assert str(Money(-5)) == "-0.05"
+
+
+def test_api_contract_stays_decimal():
+    payload = OrderReturnCreate.model_validate_json('{"breakage_cost": "12.5", "missing_cost": 3}')
+    assert payload.breakage_cost == Money(1250)
+    assert (
+        payload.model_dump_json(include={"breakage_cost", "missing_cost"})
+        == '{"breakage_cost":"12.50","missing_cost":"3.00"}'
+    )
+    with pytest.raises(ValueError):
+        OrderReturnCreate(breakage_cost="-1")
+
+
+@pytest.mark.asyncio
+async def test_amounts_are_stored_as_integer_cents(session):
+    product = Product(name="Copa", base_price=Decimal("120.55"))
+    session.add(product)
+    await session.commit()
+    product_id = product.id
+    session.expire_all()
+
+    assert (await session.execute(text("SELECT base_price FROM products"))).scalar_one() == 12055
+    assert (await session.get(Product, product_id)).base_price == Money(12055)
@@ -0,0 +1,114 @@
+from datetime import date
+from decimal import Decimal
+
+import pytest
+from sqlalchemy import func, select
+
+from app.models.cart import Cart, CartItem
+from app.models.catalog import Product
+from app.models.config import ConfigVersion, Season
+from app.services import config as config_service
+from app.services import realtime
+from app.services.order import create_order_from_cart
+
+
+@pytest.mark.asyncio
+async def test_pricing_config_is_cached_until_an_update_commits(session):
+    await config_service.get_pricing_config(session)
+    # La versión por defecto se crea sin commit: hasta que el llamador la confirma no se cachea
+    await session.commit()
+    first = await config_service.get_pricing_config(session)
+    assert await config_service.get_pricing_config(session) is first
+
+    await config_service.set_logistics(
+        session,
+        base_fee=Decimal("250"),
+        hourly_vehicle_fee=Decimal("40"),
+        default_tolls=Decimal("0"),
+    )
+    updated = await config_service.get_pricing_config(session)
+    assert updated.version > first.version
+    assert updated.logistics.base_fee == Decimal("250")
+
+    await config_service.create_season(
+        session,
+        Season(
+            name="Fiestas",
+            start_date=date(2026, 12, 20),
+            end_date=date(2027, 1, 6),
+            high_season=True,
+        ),
+    )
+    assert [s.name for s in (await config_service.get_pricing_config(session)).seasons] == [
+        "Fiestas"
+    ]
+
+
+@pytest.mark.asyncio
+async def test_pricing_config_invalidated_by_other_workers(session):
+    cached = await config_service.get_pricing_config(session)
+
+    # Lo que llega por LISTEN/NOTIFY cuando otro worker cambia la configuración
+    realtime.hub.dispatch(
+        [{"topic": config_service.CONFIG_TOPIC, "data": {"section": "guarantee"}}]
+    )
+
+    assert await config_service.get_pricing_config(session) is not cached
+
+
+@pytest.mark.asyncio
+async def test_config_changes_append_versions_and_orders_keep_theirs(session):
+    product = Product(name="Mesa", base_price=Decimal("80"))
+    session.add(product)
+    await session.commit()
+    cart = Cart(session_token="v", logistics_hours=1, tolls=0)
+    cart.items = [
+        CartItem(product_id=product.id, quantity=1, days=1, price_per_day=Decimal("80.00"))
+    ]
+    session.add(cart)
+    await session.commit()
+
+    await config_service.set_logistics(
+        session,
+        base_fee=Decimal("100"),
+        hourly_vehicle_fee=Decimal("0"),
+        default_tolls=Decimal("0"),
+    )
+    order = await create_order_from_cart(session, cart)
+    priced_with = order.config_version_id
+
+    await config_service.set_guarantee(
+        session, percentage=Decimal("0.30"), apply_tax=False, tax_rate=Decimal("0")
+    )
+    current = await config_service.get_pricing_config(session)
+    assert current.config_version_id != priced_with
+    assert current.logistics.base_fee == Decimal("100")
+
+    # La versión del pedido sigue intacta y, al ser inmutable, se sirve de memoria
+    version = await config_service.get_config_version(session, priced_with)
+    assert version.logistics.base_fee == Decimal("100")
+    assert version.guarantee.percentage != Decimal("0.30")
+    assert await config_service.get_config_version(session, priced_with) is version
+    assert [v.id for v in await config_service.list_config_versions(session)][1] == priced_with
+    assert (
+        await session.execute(
+            select(func.count())
+            .select_from(ConfigVersion)
+            .where(ConfigVersion.is_current.is_(True))
+        )
+    ).scalar_one() == 1
+
+
+@pytest.mark.asyncio
+async def test_bootstrapping_the_config_version_leaves_the_commit_to_the_caller(session):
+    # Lo pendiente del llamador (p. ej. turnos reservados en el checkout) no se commitea acá
+    session.add(Product(name="Mesa", base_price=Decimal("80")))
+    config = await config_service.get_pricing_config(session)
+    assert config.config_version_id is not None
+    await session.rollback()
+
+    assert await session.scalar(select(func.count()).select_from(Product)) == 0
+    assert await session.scalar(select(func.count()).select_from(ConfigVersion)) == 0
+    # La foto con la versión deshecha no quedó en caché
+    again = await config_service.get_pricing_config(session)
+    assert again.config_version_id != config.config_version_id
@@ -0,0 +1,92 @@
+import uuid
+from datetime import date
+from decimal import Decimal
+
+import pytest
+
+from app.models.catalog import Category, Product
+from app.models.config import PricingRule, PricingRuleKind
+from app.services import config as config_service
+from app.services.config import SeasonSnapshot
+from app.services.pricing_rules import FACTOR_SCALE, PricingPlan, PricingRuleSnapshot
+
+
+def _rule(
+    kind: PricingRuleKind, multiplier: str, threshold=None, category_id=None, season_id=None
+) -> PricingRuleSnapshot:
+    return PricingRuleSnapshot(
+        uuid.uuid4(), kind, Decimal(multiplier), threshold, category_id, season_id
+    )
+
+
+def test_plan_lookups_per_line():
+    chairs, glassware = uuid.uuid4(), uuid.uuid4()
+    chair, glass = uuid.uuid4(), uuid.uuid4()
+    summer = SeasonSnapshot(
+        uuid.uuid4(), "Verano", date(2026, 12, 15), date(2027, 2, 28), False, Decimal("0")
+    )
+    holidays = SeasonSnapshot(
+        uuid.uuid4(), "Fiestas", date(2026, 12, 20), date(2027, 1, 6), True, Decimal("0.5")
+    )
+    plan = PricingPlan(
+        [
+            _rule(PricingRuleKind.volume_discount, "0.95", threshold=5),
+            _rule(PricingRuleKind.volume_discount, "0.90", threshold=10),
+            _rule(PricingRuleKind.duration_curve, "0.80", threshold=3),
+            _rule(PricingRuleKind.category_multiplier, "1.20", category_id=chairs),
+            _rule(PricingRuleKind.category_multiplier, "1.10", category_id=chairs),
+            _rule(PricingRuleKind.season_multiplier, "1.15", season_id=summer.id),
+            _rule(PricingRuleKind.season_multiplier, "1.30", season_id=holidays.id),
+        ],
+        {chair: chairs, glass: glassware},
+        (summer, holidays),
+    )
+    base = FACTOR_SCALE
+
+    assert plan.line_cents(1000, 4, 1, 1, glass, base) == 4000
+    # 48 copas en cajas de 12 son 4 cajas: todavía sin descuento por volumen
+    assert plan.line_cents(1000, 48, 1, 12, glass, base) == 48000
+    assert plan.line_cents(1000, 60, 1, 12, glass, base) == 57000
+    assert plan.line_cents(1000, 500, 1, 1, glass, base) == 450000
+    assert plan.line_cents(1000, 1, 7, 1, glass, base) == 5600
+    # La regla de categoría más reciente reemplaza a la anterior
+    assert plan.line_cents(1000, 1, 1, 1, chair, base) == 1100
+    assert plan.season_factor(date(2027, 2, 1), date(2027, 2, 2)) == 11500
+    assert plan.season_factor(date(2026, 12, 24), date(2026, 12, 26)) == 13000
+    assert plan.season_factor(date(2026, 6, 1), date(2026, 6, 2)) == base
+    assert plan.line_cents(1000, 1, 1, 1, chair, 13000) == 1430
+
+
+@pytest.mark.asyncio
+async def test_plan_is_compiled_from_db_rules_and_reused_by_version(session):
+    category = Category(name="Sillas")
+    session.add(category)
+    await session.commit()
+    product = Product(name="Silla Tiffany", base_price=Decimal("10"), category_id=category.id)
+    session.add(product)
+    await session.commit()
+    category_id, product_id = category.id, product.id
+
+    empty = (await config_service.get_pricing_config(session)).plan
+    assert not empty
+    with pytest.raises(ValueError):
+        await config_service.create_pricing_rule(
+            session, PricingRule(kind=PricingRuleKind.volume_discount, multiplier=Decimal("0.9"))
+        )
+    await session.rollback()
+    await config_service.create_pricing_rule(
+        session,
+        PricingRule(
+            kind=PricingRuleKind.category_multiplier,
+            multiplier=Decimal("1.5"),
+            category_id=category_id,
+        ),
+    )
+
+    plan = (await config_service.get_pricing_config(session)).plan
+    assert plan.version != empty.version
+    assert plan.line_cents(1000, 1, 1, 1, product_id, FACTOR_SCALE) == 1500
+
+    # Otra recarga sin cambios en reglas, productos ni temporadas no recompila
+    config_service.pricing_config_cache.invalidate()
+    assert (await config_service.get_pricing_config(session)).plan is plan
@@ -0,0 +1,84 @@
+import uuid
+from datetime import date
+from decimal import Decimal
+
+from app.core.money import Money
+from app.models.cart import Cart, CartItem
+from app.services import order as order_service
+from app.services.config import GuaranteeSnapshot, LogisticsSnapshot, PricingConfig
+from app.services.quote_cache import QuoteMemo, quote_key
+from app.services.seasons import SeasonIndex
+
+CHAIR, TABLE = uuid.uuid4(), uuid.uuid4()
+
+
+def _cart(*lines, event_start=date(2026, 6, 1)) -> Cart:
+    cart = Cart(
+        id=uuid.uuid4(),
+        event_start=event_start,
+        event_end=date(2026, 6, 3),
+        logistics_hours=2,
+        tolls=0,
+    )
+    cart.items = [
+        CartItem(
+            product_id=p, quantity=q, days=2, price_per_day=Money(1500), requires_guarantee=False
+        )
+        for p, q in lines
+    ]
+    return cart
+
+
+def test_key_depends_on_priced_content_only():
+    base = quote_key(_cart((CHAIR, 10), (TABLE, 2)), config_version=1)
+
+    assert quote_key(_cart((TABLE, 2), (CHAIR, 10)), config_version=1) == base
+    assert quote_key(_cart((CHAIR, 10), (TABLE, 3)), config_version=1) != base
+    assert (
+        quote_key(_cart((CHAIR, 10), (TABLE, 2), event_start=date(2026, 6, 2)), config_version=1)
+        != base
+    )
+    assert quote_key(_cart((CHAIR, 10), (TABLE, 2)), config_version=2) != base
+
+
+def test_lru_eviction_and_hit_rate():
+    memo = QuoteMemo(maxsize=2)
+    memo.put("a", {"total": Money(1)})
+    memo.put("b", {"total": Money(2)})
+    assert memo.get("a") == {"total": Money(1)}
+    memo.put("c", {"total": Money(3)})
+
+    assert memo.get("b") is None
+    assert memo.stats() == {
+        "size": 2,
+        "maxsize": 2,
+        "hits": 1,
+        "misses": 1,
+        "evictions": 1,
+        "hit_rate": 0.5,
+    }
+
+
+def test_repeat_quote_skips_calculate_totals(monkeypatch):
+    config = PricingConfig(
+        version=7,
+        logistics=LogisticsSnapshot(uuid.uuid4(), Money(10000), Money(0), Money(0), None, None),
+        guarantee=GuaranteeSnapshot(uuid.uuid4(), Decimal("0.15"), False, Decimal("0"), None),
+        seasons=(),
+        season_index=SeasonIndex(()),
+    )
+    memo = QuoteMemo()
+    monkeypatch.setattr(order_service, "quote_memo", memo)
+    calls = []
+    original = order_service.calculate_totals
+    monkeypatch.setattr(
+        order_service, "calculate_totals", lambda *args: calls.append(args) or original(*args)
+    )
+
+    first = order_service.quote_cart(_cart((CHAIR, 10)), config)
+    again = order_service.quote_cart(_cart((CHAIR, 10)), config)
+
+    assert first == again
+    assert first["total"] == Money(40000)
+    assert len(calls) == 1
+    assert memo.stats()["hit_rate"] == 0.5
@@ -0,0 +1,230 @@
+import random
+import uuid
+from datetime import date, timedelta
+from decimal import Decimal
+from types import SimpleNamespace
+
+import pytest
+from sqlalchemy import func, select
+
+from app.core.money import Money
+from app.models.cart import Cart, CartItem
+from app.models.catalog import Product
+from app.models.config import PricingRule, PricingRuleKind
+from app.models.order import Order, OrderItem
+from app.services import config as config_service
+from app.services.config import GuaranteeSnapshot, LogisticsSnapshot, PricingConfig, SeasonSnapshot
+from app.services.order import calculate_totals, create_order_from_cart
+from app.services.pricing_rules import EMPTY_PLAN, PricingPlan, PricingRuleSnapshot
+from app.services.quotes import QuoteColumns, price_columns, quote_carts, requote_pending_orders
+from app.services.seasons import SeasonIndex
+
+
+def _cents(rng: random.Random, top: int) -> Money:
+    return Money(rng.randrange(top))
+
+
+def _rows(cart: Cart) -> list[SimpleNamespace]:
+    header = dict(
+        id=cart.id,
+        event_start=cart.event_start,
+        event_end=cart.event_end,
+        logistics_hours=cart.logistics_hours,
+        tolls=cart.tolls,
+    )
+    if not cart.items:
+        return [
+            SimpleNamespace(
+                **header,
+                line_id=None,
+                price=None,
+                quantity=None,
+                line_days=None,
+                requires_guarantee=None,
+                product_id=None,
+                units_per_box=None,
+            )
+        ]
+    return [
+        SimpleNamespace(
+            **header,
+            line_id=uuid.uuid4(),
+            price=i.price_per_day,
+            quantity=i.quantity,
+            line_days=i.days,
+            requires_guarantee=i.requires_guarantee,
+            product_id=i.product_id,
+            units_per_box=i.units_per_box,
+        )
+        for i in cart.items
+    ]
+
+
+def test_column_pricing_matches_calculate_totals():
+    rng = random.Random(11)
+    seasons = tuple(
+        SeasonSnapshot(
+            uuid.uuid4(),
+            f"s{i}",
+            date(2026, 1, 1) + timedelta(days=30 * i),
+            date(2026, 1, 20) + timedelta(days=30 * i),
+            True,
+            Decimal(rng.randrange(100)).scaleb(-2),
+        )
+        for i in range(12)
+    )
+    products = [uuid.uuid4() for _ in range(5)]
+    category = uuid.uuid4()
+    plan = PricingPlan(
+        [
+            PricingRuleSnapshot(
+                uuid.uuid4(), PricingRuleKind.volume_discount, Decimal("0.9"), 3, None, None
+            ),
+            PricingRuleSnapshot(
+                uuid.uuid4(), PricingRuleKind.duration_curve, Decimal("0.85"), 3, None, None
+            ),
+            PricingRuleSnapshot(
+                uuid.uuid4(),
+                PricingRuleKind.category_multiplier,
+                Decimal("1.1"),
+                None,
+                category,
+                None,
+            ),
+            PricingRuleSnapshot(
+                uuid.uuid4(),
+                PricingRuleKind.season_multiplier,
+                Decimal("1.25"),
+                None,
+                None,
+                seasons[3].id,
+            ),
+        ],
+        {products[0]: category},
+        seasons,
+    )
+    rows, carts = [], []
+    for _ in range(300):
+        start = date(2026, 1, 1) + timedelta(days=rng.randrange(365))
+        cart = Cart(
+            id=uuid.uuid4(),
+            event_start=start,
+            event_end=start + timedelta(days=2),
+            logistics_hours=rng.randrange(4),
+            tolls=rng.randrange(3),
+        )
+        cart.items = [
+            CartItem(
+                product_id=rng.choice(products),
+                quantity=rng.randrange(1, 50),
+                days=rng.randrange(1, 5),
+                price_per_day=_cents(rng, 100000),
+                requires_guarantee=rng.random() < 0.5,
+                units_per_box=rng.choice([1, 6, 12]),
+            )
+            for _ in range(rng.randrange(4))
+        ]
+        carts.append(cart)
+        rows += _rows(cart)
+    for apply_tax, rules in ((True, plan), (False, EMPTY_PLAN)):
+        config = PricingConfig(
+            version=1,
+            logistics=LogisticsSnapshot(
+                uuid.uuid4(), Money(9999), Money(1235), Money(5), None, None
+            ),
+            guarantee=GuaranteeSnapshot(
+                uuid.uuid4(), Decimal("0.17"), apply_tax, Decimal("0.21"), None
+            ),
+            seasons=seasons,
+            season_index=SeasonIndex(seasons),
+            plan=rules,
+        )
+
+        quotes = price_columns(QuoteColumns.from_rows(rows, config.plan), config)
+
+        for cart, quote in zip(carts, quotes, strict=True):
+            assert quote.totals() == calculate_totals(
+                cart, config.logistics, config.guarantee, config.seasons, config.plan
+            )
+
+
+@pytest.mark.asyncio
+async def test_requote_reports_then_applies_new_totals(session):
+    product = Product(name="Mesa", base_price=Decimal("80"))
+    session.add(product)
+    await session.commit()
+    checked_out = Cart(
+        session_token="a",
+        event_start=date(2026, 5, 1),
+        event_end=date(2026, 5, 2),
+        logistics_hours=2,
+        tolls=0,
+    )
+    checked_out.items = [
+        CartItem(
+            product_id=product.id,
+            quantity=3,
+            days=2,
+            price_per_day=Decimal("80.00"),
+            requires_guarantee=True,
+        )
+    ]
+    open_cart = Cart(session_token="b", logistics_hours=1, tolls=5)
+    open_cart.items = [
+        CartItem(product_id=product.id, quantity=1, days=1, price_per_day=Decimal("80.00"))
+    ]
+    session.add_all([checked_out, open_cart])
+    await session.commit()
+    order = await create_order_from_cart(session, checked_out)
+    original_total = order.total
+
+    await config_service.set_guarantee(
+        session, percentage=Decimal("0.30"), apply_tax=True, tax_rate=Decimal("0.21")
+    )
+
+    report = await requote_pending_orders(session, dry_run=True)
+    assert (report.scanned, report.changed) == (1, 1)
+    assert {c.field for c in report.orders[0].changes} == {
+        "guarantee_amount",
+        "total",
+        "outstanding_balance",
+    }
+    assert (await session.execute(select(Order.total))).scalar_one() == original_total
+
+    applied = await requote_pending_orders(session, dry_run=False)
+    assert applied.changed == 1
+    config = await config_service.get_pricing_config(session)
+    expected = calculate_totals(checked_out, config.logistics, config.guarantee, config.seasons)
+    assert (await session.execute(select(Order.total))).scalar_one() == expected["total"]
+    assert (await requote_pending_orders(session)).changed == 0
+
+    assert list(await quote_carts(session)) == [open_cart.id]
+
+
+@pytest.mark.asyncio
+async def test_requote_rewrites_line_totals_after_a_rule_change(session):
+    product = Product(name="Silla", base_price=Decimal("10"))
+    session.add(product)
+    await session.commit()
+    cart = Cart(session_token="a", logistics_hours=1, tolls=0)
+    cart.items = [
+        CartItem(product_id=product.id, quantity=10, days=1, price_per_day=Decimal("10.00")),
+        CartItem(product_id=product.id, quantity=2, days=3, price_per_day=Decimal("25.00")),
+    ]
+    session.add(cart)
+    await session.commit()
+    order = await create_order_from_cart(session, cart)
+
+    await config_service.create_pricing_rule(
+        session,
+        PricingRule(kind=PricingRuleKind.volume_discount, multiplier=Decimal("0.8"), threshold=5),
+    )
+
+    report = await requote_pending_orders(session, dry_run=True)
+    line_changes = [c for c in report.orders[0].changes if c.field.startswith("items.")]
+    assert [(c.current, c.proposed) for c in line_changes] == [(Money(10000), Money(8000))]
+
+    await requote_pending_orders(session, dry_run=False)
+    line_sum = select(func.sum(OrderItem.total_price)).where(OrderItem.order_id == order.id)
+    subtotal = (await session.execute(select(Order.subtotal))).scalar_one()
+    assert Money.of(await session.scalar(line_sum)) == subtotal == Money(23000)
@@ -0,0 +1,163 @@
+import asyncio
+from decimal import Decimal
+
+import pytest
+from sqlalchemy import select
+
+from app.api.routes import realtime as realtime_routes
+from app.models.catalog import Product
+from app.models.stock import Inventory, StockMovementReason, Warehouse
+from app.models.user import User, UserRole
+from app.schemas.stock import StockMovementCreate
+from app.services import realtime
+from app.services.realtime import BroadcastHub, InMemoryBroker, PostgresBroker, Subscription
+from app.services.stock import create_movement
+
+
+async def _inventory(session, available: int) -> Inventory:
+    product = Product(name="Mesa", base_price=Decimal("80"))
+    warehouse = Warehouse(name="Deposito Norte")
+    session.add_all([product, warehouse])
+    await session.commit()
+    inventory = Inventory(
+        product_id=product.id, warehouse_id=warehouse.id, available=available, reserved=0
+    )
+    session.add(inventory)
+    await session.commit()
+    return inventory
+
+
+@pytest.mark.asyncio
+async def test_inventory_events_are_pushed_after_commit_only(session, monkeypatch):
+    hub = BroadcastHub()
+    monkeypatch.setattr(realtime, "broker", InMemoryBroker(hub))
+    inventory = await _inventory(session, 10)
+    matching = hub.subscribe({"inventory"}, {"warehouse_id": inventory.warehouse_id})
+    other_warehouse = hub.subscribe({"inventory"}, {"warehouse_id": "elsewhere"})
+    orders_only = hub.subscribe({"orders"})
+
+    await create_movement(
+        session,
+        StockMovementCreate(
+            inventory_id=inventory.id, quantity_change=-4, reason=StockMovementReason.adjustment
+        ),
+    )
+
+    event = matching.queue.get_nowait()
+    assert event["topic"] == "inventory"
+    assert event["data"]["inventory_id"] == str(inventory.id)
+    assert event["data"]["available_delta"] == -4
+    assert event["data"]["available"] == 6
+    assert other_warehouse.queue.empty()
+    assert orders_only.queue.empty()
+
+    await session.execute(select(Inventory.id))
+    await realtime.publish(session, "inventory", [{"inventory_id": str(inventory.id)}])
+    await session.rollback()
+    await session.commit()
+    assert matching.queue.empty()
+
+
+def test_slow_subscriber_drops_oldest_events_without_blocking():
+    hub = BroadcastHub()
+    subscription = Subscription({"orders"}, queue_size=2)
+    hub.subscriptions.add(subscription)
+
+    hub.dispatch({"topic": "orders", "data": {"status": status}} for status in ["a", "b", "c"])
+
+    assert subscription.dropped == 1
+    assert subscription.queue.get_nowait()["data"]["status"] == "b"
+    assert subscription.queue.get_nowait()["data"]["status"] == "c"
+
+
+def test_user_filter_fails_closed_when_the_event_has_no_owner():
+    subscription = Subscription({"orders", "inventory"}, {"user_id": "owner", "warehouse_id": None})
+
+    assert subscription.matches({"topic": "orders", "data": {"user_id": "owner"}})
+    assert not subscription.matches({"topic": "orders", "data": {"user_id": None}})
+    assert not subscription.matches({"topic": "orders", "data": {"status": "cancelled"}})
+    assert not subscription.matches({"topic": "inventory", "data": {"inventory_id": "x"}})
+
+
+class _Socket:
+    """WebSocket mínimo: acepta y el cliente se va sin mandar nada."""
+
+    def __init__(self):
+        self.sent = []
+
+    async def accept(self):
+        return None
+
+    async def receive(self):
+        return {"type": "websocket.disconnect", "code": 1000}
+
+    async def send_json(self, data):
+        self.sent.append(data)
+
+    async def close(self, code=1000):
+        return None
+
+
+@pytest.mark.asyncio
+async def test_closing_the_socket_on_a_quiet_topic_drops_the_subscription(monkeypatch):
+    hub = BroadcastHub()
+    monkeypatch.setattr(realtime, "hub", hub)
+
+    async def authenticate(token):
+        return User(email="ops@example.com", role=UserRole.operator, is_active=True)
+
+    monkeypatch.setattr(realtime_routes, "_authenticate", authenticate)
+
+    # Sin eventos en el tópico: el cierre del cliente tiene que alcanzar para terminar el handler
+    socket = _Socket()
+    await asyncio.wait_for(realtime_routes.stream(socket, token="x", topics="inventory"), timeout=1)
+
+    assert hub.subscriptions == set()
+    assert socket.sent == []
+
+
+class _Connection:
+    def __init__(self):
+        self.on_terminate = None
+        self.closed = False
+
+    def add_termination_listener(self, callback):
+        self.on_terminate = callback
+
+    async def add_listener(self, channel, callback):
+        return None
+
+    def is_closed(self):
+        return self.closed
+
+    async def close(self):
+        self.closed = True
+
+
+@pytest.mark.asyncio
+async def test_postgres_broker_listens_again_after_the_connection_drops(monkeypatch):
+    import asyncpg
+
+    connections = []
+    reconnected = asyncio.Event()
+
+    async def connect(dsn):
+        connections.append(_Connection())
+        if len(connections) == 2:
+            reconnected.set()
+        return connections[-1]
+
+    monkeypatch.setattr(asyncpg, "connect", connect)
+    monkeypatch.setattr(realtime, "RECONNECT_MIN_DELAY", 0)
+    broker = PostgresBroker(BroadcastHub(), "postgresql://test")
+    await broker.start()
+    while not connections or connections[0].on_terminate is None:
+        await asyncio.sleep(0)
+
+    connections[0].closed = True
+    connections[0].on_terminate(connections[0])
+    await asyncio.wait_for(reconnected.wait(), timeout=1)
+    await broker.stop()
+
+    assert len(connections) == 2
+    assert connections[1].closed
@@ -0,0 +1,125 @@
+from datetime import datetime
+from decimal import Decimal
+
+import httpx
+import pytest
+from fastapi import FastAPI
+from sqlalchemy.ext.asyncio import async_sessionmaker
+
+from app.api.deps import get_operator_or_admin, get_session_factory
+from app.api.routes import stock as stock_routes
+from app.models.catalog import Product
+from app.models.stock import (
+    Inventory,
+    StockLedgerBaseline,
+    StockMovement,
+    StockMovementReason,
+    Warehouse,
+)
+from app.services.reconciliation import reconcile_inventory
+
+
+@pytest.mark.asyncio
+async def test_reconciliation_reports_and_repairs_drift(session):
+    product = Product(name="Copa", base_price=Decimal("10"))
+    central = Warehouse(name="Deposito Central")
+    satellite = Warehouse(name="Deposito Norte")
+    session.add_all([product, central, satellite])
+    await session.commit()
+    ok = Inventory(product_id=product.id, warehouse_id=central.id, available=8, reserved=2)
+    drifted = Inventory(product_id=product.id, warehouse_id=satellite.id, available=50, reserved=0)
+    session.add_all([ok, drifted])
+    await session.commit()
+    session.add_all(
+        [
+            StockMovement(
+                inventory_id=ok.id, quantity_change=10, reason=StockMovementReason.adjustment
+            ),
+            StockMovement(
+                inventory_id=ok.id, quantity_change=-2, reason=StockMovementReason.reservation
+            ),
+            StockMovement(
+                inventory_id=drifted.id, quantity_change=40, reason=StockMovementReason.adjustment
+            ),
+            StockMovement(
+                inventory_id=drifted.id, quantity_change=-5, reason=StockMovementReason.reservation
+            ),
+        ]
+    )
+    await session.commit()
+    factory = async_sessionmaker(session.bind, expire_on_commit=False)
+
+    report = await reconcile_inventory(factory)
+    assert report.inventories_checked == 2
+    assert report.movements_scanned == 4
+    assert len(report.partitions) == 2
+    assert [(d.inventory_id, d.expected_available, d.expected_reserved) for d in report.drift] == [
+        (drifted.id, 35, 5)
+    ]
+
+    repaired = await reconcile_inventory(factory, repair=True)
+    assert repaired.repaired == 1
+    await session.refresh(drifted)
+    assert (drifted.available, drifted.reserved) == (35, 5)
+    assert (await reconcile_inventory(factory)).drifted == 0
+
+
+@pytest.mark.asyncio
+async def test_reconciliation_counts_detached_ledger_baseline(session):
+    product = Product(name="Mantel", base_price=Decimal("10"))
+    warehouse = Warehouse(name="Deposito Central")
+    session.add_all([product, warehouse])
+    await session.commit()
+    inventory = Inventory(
+        product_id=product.id, warehouse_id=warehouse.id, available=27, reserved=3
+    )
+    session.add(inventory)
+    await session.commit()
+    # 30 de alta y 3 reservadas en particiones ya desacopladas; el resto sigue en el ledger
+    session.add_all(
+        [
+            StockLedgerBaseline(
+                inventory_id=inventory.id,
+                quantity_change=27,
+                reserved_change=-3,
+                movement_count=2,
+                through=datetime(2024, 1, 1),
+            ),
+            StockMovement(
+                inventory_id=inventory.id, quantity_change=5, reason=StockMovementReason.adjustment
+            ),
+            StockMovement(
+                inventory_id=inventory.id, quantity_change=-5, reason=StockMovementReason.sale
+            ),
+        ]
+    )
+    await session.commit()
+
+    report = await reconcile_inventory(async_sessionmaker(session.bind, expire_on_commit=False))
+
+    assert report.drifted == 0
+
+
+@pytest.mark.asyncio
+async def test_reconcile_route_uses_the_injected_session_factory(session):
+    product = Product(name="Vaso", base_price=Decimal("5"))
+    warehouse = Warehouse(name="Deposito Central")
+    session.add_all([product, warehouse])
+    await session.commit()
+    inventory = Inventory(product_id=product.id, warehouse_id=warehouse.id, available=3, reserved=0)
+    session.add(inventory)
+    await session.commit()
+
+    app = FastAPI()
+    app.include_router(stock_routes.router)
+    app.dependency_overrides[get_session_factory] = lambda: async_sessionmaker(
+        session.bind, expire_on_commit=False
+    )
+    app.dependency_overrides[get_operator_or_admin] = lambda: None
+    transport = httpx.ASGITransport(app=app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://test") as client:
+        response = await client.post("/stock/reconcile")
+
+    assert response.status_code == 200
+    assert response.json()["inventories_checked"] == 1
+    assert response.json()["drift"][0]["expected_available"] == 0
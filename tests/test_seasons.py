@@ -0,0 +1,60 @@
+import random
+from datetime import date, timedelta
+from decimal import Decimal
+
+from app.models.config import Season
+from app.services.order import overlaps_high_season
+from app.services.seasons import SeasonIndex
+
+
+def _season(name: str, start: date, days: int, ratio: str, high: bool = True) -> Season:
+    return Season(
+        name=name,
+        start_date=start,
+        end_date=start + timedelta(days=days),
+        high_season=high,
+        deposit_ratio=Decimal(ratio),
+    )
+
+
+def test_index_returns_every_overlap_and_matches_linear_winner():
+    rng = random.Random(7)
+    origin = date(2024, 1, 1)
+    seasons = [
+        _season(
+            f"s{i}",
+            origin + timedelta(days=rng.randrange(730)),
+            rng.randrange(60),
+            rng.choice(["0.3", "0.5"]),
+            high=i % 5 != 0,
+        )
+        for i in range(300)
+    ]
+    index = SeasonIndex(seasons)
+
+    for _ in range(200):
+        start = origin + timedelta(days=rng.randrange(760))
+        end = start + timedelta(days=rng.randrange(10))
+        expected = {
+            s.name for s in seasons if s.high_season and s.start_date <= end and start <= s.end_date
+        }
+        assert {s.name for s in index.overlapping(start, end)} == expected
+        assert index.winner(start, end) is overlaps_high_season(start, end, seasons)
+
+
+def test_winner_prefers_highest_deposit_ratio_then_earliest_start():
+    early = _season("Temprana", date(2024, 12, 1), 40, "0.3")
+    strict = _season("Fiestas", date(2024, 12, 20), 20, "0.5")
+    tie = _season("Verano", date(2024, 12, 28), 60, "0.5")
+    low = _season("Baja", date(2024, 12, 1), 90, "0.9", high=False)
+    index = SeasonIndex([tie, low, strict, early])
+
+    assert [s.name for s in index.overlapping(date(2024, 12, 30), date(2025, 1, 2))] == [
+        "Temprana",
+        "Fiestas",
+        "Verano",
+    ]
+    assert index.winner(date(2024, 12, 30), date(2025, 1, 2)) is strict
+    assert index.winner(date(2024, 12, 5), date(2024, 12, 6)) is early
+    assert index.winner(date(2025, 3, 1), date(2025, 3, 2)) is None
+    assert index.winner(None, date(2025, 3, 2)) is None
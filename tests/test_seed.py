@@ -0,0 +1,33 @@
+from sqlalchemy import select
+from sqlalchemy.orm import selectinload
+
+from app.models.catalog import Product
+from app.models.order import OrderStatus
+from app.schemas.cart import CartItemCreate
+from app.seed.seed_data import seed_session
+from app.services import cart as cart_service
+from app.services.order import create_order_from_cart, reserve_stock, update_order_status
+
+
+async def test_seeded_variant_product_can_be_checked_out(session):
+    await seed_session(session)
+    stmt = select(Product).options(selectinload(Product.variants))
+    stmt = stmt.where(Product.name == "Copa Bordeaux")
+    product = (await session.execute(stmt)).scalar_one()
+    variant_id = product.variants[0].id
+
+    # El seed carga el stock sin variante: la variante lo usa mientras no tenga inventario propio
+    cart = await cart_service.create_cart(session, "seed")
+    payload = CartItemCreate(
+        product_id=product.id, variant_id=variant_id, quantity=12, price_per_day=product.base_price
+    )
+    await cart_service.add_item(session, cart, payload, hold_minutes=20)
+    cart = await cart_service.get_cart_by_id(session, cart.id)
+    order = await create_order_from_cart(session, cart)
+    await session.refresh(order, attribute_names=["items"])
+    assert order.items[0].reserved_quantity == 12
+
+    plan = await reserve_stock(session, order)
+    assert plan.feasible
+    confirmed = await update_order_status(session, order, OrderStatus.reservation_confirmed)
+    assert confirmed.status == OrderStatus.reservation_confirmed
@@ -0,0 +1,70 @@
+from datetime import datetime, timedelta
+from decimal import Decimal
+
+import pytest
+from sqlalchemy import func, select
+
+from app.models.catalog import Product
+from app.models.stock import Inventory, InventorySnapshot, StockMovement, Warehouse
+from app.services.snapshots import prune_snapshots, stock_as_of, take_snapshots, write_snapshots
+
+
+@pytest.mark.asyncio
+async def test_as_of_reads_snapshot_plus_tail(session):
+    product = Product(name="Mesa", base_price=Decimal("100"))
+    warehouse = Warehouse(name="Deposito Central")
+    session.add_all([product, warehouse])
+    await session.commit()
+    inventory = Inventory(product_id=product.id, warehouse_id=warehouse.id, available=0, reserved=0)
+    session.add(inventory)
+    await session.commit()
+
+    start = datetime(2026, 1, 1)
+    for day, change in enumerate([10, -3, 5, -1]):
+        session.add(
+            StockMovement(
+                inventory_id=inventory.id,
+                quantity_change=change,
+                created_at=start + timedelta(days=day),
+            )
+        )
+    await session.commit()
+
+    assert await take_snapshots(session, taken_at=start + timedelta(days=1, hours=1)) == 1
+
+    rows = await stock_as_of(session, start + timedelta(days=2, hours=1))
+    assert rows[0].balance == 12
+    assert rows[0].snapshot_taken_at is not None
+    before = await stock_as_of(session, start + timedelta(hours=1))
+    assert before[0].balance == 10
+    assert before[0].snapshot_taken_at is None
+
+    session.add(
+        InventorySnapshot(
+            inventory_id=inventory.id, taken_at=start + timedelta(days=1, hours=2), balance=7
+        )
+    )
+    await session.commit()
+    assert await prune_snapshots(session, start + timedelta(days=30)) == 1
+    rows = await stock_as_of(session, start + timedelta(days=5))
+    assert rows[0].balance == 11
+
+
+@pytest.mark.asyncio
+async def test_write_snapshots_leaves_the_commit_to_the_caller(session):
+    product = Product(name="Silla", base_price=Decimal("50"))
+    warehouse = Warehouse(name="Deposito Norte")
+    session.add_all([product, warehouse])
+    await session.commit()
+    inventory = Inventory(product_id=product.id, warehouse_id=warehouse.id, available=0, reserved=0)
+    session.add(inventory)
+    await session.commit()
+    session.add(
+        StockMovement(inventory_id=inventory.id, quantity_change=4, created_at=datetime(2026, 1, 1))
+    )
+    await session.commit()
+
+    # El detach de particiones escribe snapshots, baseline y DETACH en una sola transacción
+    assert await write_snapshots(session, taken_at=datetime(2026, 1, 31)) == 1
+    await session.rollback()
+    assert await session.scalar(select(func.count()).select_from(InventorySnapshot)) == 0
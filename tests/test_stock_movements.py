@@ -0,0 +1,191 @@
+import uuid
+from decimal import Decimal
+
+import pytest
+from sqlalchemy import func, select
+
+from app.models.catalog import Product
+from app.models.stock import (
+    Inventory,
+    StockAlertKind,
+    StockMovement,
+    StockMovementReason,
+    Warehouse,
+)
+from app.schemas.stock import StockMovementCreate
+from app.services import stock as stock_service
+from app.services.alerts import list_alerts, set_threshold
+from app.services.stock import (
+    BulkMovementError,
+    InsufficientStockError,
+    InventoryNotFoundError,
+    create_movement,
+    create_movements_bulk,
+    list_movements,
+)
+
+
+async def _inventory(session, available: int) -> Inventory:
+    product = Product(name="Silla", base_price=Decimal("50"))
+    warehouse = Warehouse(name="Deposito Central")
+    session.add_all([product, warehouse])
+    await session.commit()
+    inventory = Inventory(
+        product_id=product.id, warehouse_id=warehouse.id, available=available, reserved=0
+    )
+    session.add(inventory)
+    await session.commit()
+    await session.refresh(inventory)
+    return inventory
+
+
+@pytest.mark.asyncio
+async def test_movement_applies_delta_in_sql(session):
+    inventory = await _inventory(session, 10)
+
+    movement = await create_movement(
+        session,
+        StockMovementCreate(
+            inventory_id=inventory.id, quantity_change=-3, reason=StockMovementReason.adjustment
+        ),
+    )
+
+    assert movement.quantity_change == -3
+    assert movement.reason == StockMovementReason.adjustment
+    await session.refresh(inventory)
+    assert inventory.available == 7
+
+
+@pytest.mark.asyncio
+async def test_movement_guard_rejects_negative_stock(session):
+    inventory = await _inventory(session, 2)
+
+    with pytest.raises(InsufficientStockError):
+        await create_movement(
+            session,
+            StockMovementCreate(inventory_id=inventory.id, quantity_change=-5),
+            prevent_negative=True,
+        )
+    await session.refresh(inventory)
+    assert inventory.available == 2
+
+    with pytest.raises(InventoryNotFoundError):
+        await create_movement(
+            session, StockMovementCreate(inventory_id=uuid.uuid4(), quantity_change=1)
+        )
+
+
+@pytest.mark.asyncio
+async def test_bulk_movements_aggregate_deltas_in_one_transaction(session):
+    inventory = await _inventory(session, 10)
+    payloads = [
+        StockMovementCreate(
+            inventory_id=inventory.id, quantity_change=5, reason=StockMovementReason.return_in
+        ),
+        StockMovementCreate(
+            inventory_id=inventory.id, quantity_change=-2, reason=StockMovementReason.adjustment
+        ),
+    ]
+
+    deltas = await create_movements_bulk(session, payloads)
+
+    assert deltas == {inventory.id: 3}
+    await session.refresh(inventory)
+    assert inventory.available == 13
+    count = (await session.execute(select(func.count()).select_from(StockMovement))).scalar_one()
+    assert count == 2
+
+    missing = uuid.uuid4()
+    with pytest.raises(BulkMovementError) as exc:
+        await create_movements_bulk(
+            session,
+            [
+                StockMovementCreate(inventory_id=inventory.id, quantity_change=1),
+                StockMovementCreate(inventory_id=missing, quantity_change=1),
+            ],
+        )
+    assert [e.index for e in exc.value.errors] == [1]
+
+    with pytest.raises(BulkMovementError):
+        await create_movements_bulk(
+            session,
+            [StockMovementCreate(inventory_id=inventory.id, quantity_change=-20)],
+            prevent_negative=True,
+        )
+    await session.refresh(inventory)
+    assert inventory.available == 13
+
+
+@pytest.mark.asyncio
+async def test_movement_ledger_keyset_pagination(session):
+    inventory = await _inventory(session, 0)
+    await create_movements_bulk(
+        session,
+        [
+            StockMovementCreate(inventory_id=inventory.id, quantity_change=1, reference=f"R{i}")
+            for i in range(5)
+        ],
+    )
+
+    first, cursor = await list_movements(session, limit=3)
+    second, last_cursor = await list_movements(session, cursor=cursor, limit=3)
+
+    assert len(first) == 3 and len(second) == 2
+    assert last_cursor is None
+    assert {r.id for r in first}.isdisjoint({r.id for r in second})
+    filtered, _ = await list_movements(session, reference="R2", product_id=inventory.product_id)
+    assert [r.reference for r in filtered] == ["R2"]
+
+
+@pytest.mark.asyncio
+async def test_low_stock_alerts_only_fire_on_crossings(session):
+    inventory = await _inventory(session, 10)
+    await set_threshold(session, inventory.product_id, inventory.warehouse_id, 5)
+
+    for change in (-6, -1, 5):
+        await create_movement(
+            session, StockMovementCreate(inventory_id=inventory.id, quantity_change=change)
+        )
+
+    alerts = await list_alerts(session)
+    assert [(a.kind, a.available) for a in alerts] == [
+        (StockAlertKind.low, 4),
+        (StockAlertKind.recovered, 8),
+    ]
+
+
+@pytest.mark.asyncio
+async def test_stock_overview_groups_by_product_and_sorts_by_scarcity(session):
+    plenty = await _inventory(session, 30)
+    second_warehouse = Warehouse(name="Deposito Sur")
+    session.add(second_warehouse)
+    await session.commit()
+    session.add(
+        Inventory(
+            product_id=plenty.product_id, warehouse_id=second_warehouse.id, available=5, reserved=2
+        )
+    )
+    scarce_product = Product(name="Vajilla", base_price=Decimal("10"))
+    session.add(scarce_product)
+    await session.commit()
+    scarce = Inventory(
+        product_id=scarce_product.id, warehouse_id=plenty.warehouse_id, available=3, reserved=0
+    )
+    session.add(scarce)
+    await session.commit()
+    await create_movement(session, StockMovementCreate(inventory_id=scarce.id, quantity_change=-1))
+
+    overview = await stock_service.stock_overview(session)
+
+    assert [p.product_id for p in overview] == [scarce_product.id, plenty.product_id]
+    assert overview[0].available == 2
+    assert overview[0].last_movement_at is not None
+    assert overview[1].available == 35 and overview[1].reserved == 2
+    assert [w.warehouse_name for w in overview[1].warehouses] == [
+        "Deposito Central",
+        "Deposito Sur",
+    ]
+
+    second_page = await stock_service.stock_overview(session, limit=1, offset=1)
+    assert [p.product_id for p in second_page] == [plenty.product_id]
+    assert len(second_page[0].warehouses) == 2
@@ -0,0 +1,86 @@
+from decimal import Decimal
+
+import pytest
+from sqlalchemy import func, select
+
+from app.models.catalog import Product
+from app.models.order import Order, OrderItem
+from app.models.stock import Inventory, InventoryStripe, Warehouse
+from app.services.order import reserve_stock
+from app.services.striping import fold_stripes, set_stripe_count, take_stock
+
+
+async def _totals(session, inventory):
+    await session.refresh(inventory)
+    stripes = (
+        await session.execute(
+            select(
+                func.coalesce(func.sum(InventoryStripe.available), 0),
+                func.coalesce(func.sum(InventoryStripe.reserved), 0),
+            ).where(InventoryStripe.inventory_id == inventory.id)
+        )
+    ).one()
+    return inventory.available + stripes[0], inventory.reserved + stripes[1]
+
+
+@pytest.mark.asyncio
+async def test_striped_reservations_keep_totals(session):
+    product = Product(name="Silla Crossback", base_price=Decimal("1800"))
+    warehouse = Warehouse(name="Deposito Central")
+    session.add_all([product, warehouse])
+    await session.commit()
+    inventory = Inventory(
+        product_id=product.id, warehouse_id=warehouse.id, available=10, reserved=0
+    )
+    session.add(inventory)
+    await session.commit()
+
+    await set_stripe_count(session, inventory.id, 4)
+    of_inventory = select(InventoryStripe.available).where(
+        InventoryStripe.inventory_id == inventory.id
+    )
+    stripes = (await session.execute(of_inventory)).scalars().all()
+    assert sorted(stripes) == [2, 2, 3, 3]
+    assert await _totals(session, inventory) == (10, 0)
+
+    assert await take_stock(session, inventory.id, 2, 4)
+    # Ningún stripe tiene 7: se junta el stock y se reintenta sobre la fila principal
+    assert await take_stock(session, inventory.id, 7, 4)
+    assert not await take_stock(session, inventory.id, 5, 4)
+    await session.commit()
+    assert await _totals(session, inventory) == (1, 9)
+
+    await fold_stripes(session)
+    await session.commit()
+    assert await _totals(session, inventory) == (1, 9)
+    assert inventory.reserved == 9
+
+
+@pytest.mark.asyncio
+async def test_reserve_stock_uses_striped_inventory(session):
+    product = Product(name="Mesa", base_price=Decimal("5200"))
+    warehouse = Warehouse(name="Deposito Central")
+    session.add_all([product, warehouse])
+    await session.commit()
+    inventory = Inventory(
+        product_id=product.id, warehouse_id=warehouse.id, available=12, reserved=0
+    )
+    session.add(inventory)
+    await session.commit()
+    await set_stripe_count(session, inventory.id, 3)
+    order = Order(code="ORD-STRIPE")
+    order.items = [
+        OrderItem(
+            product_id=product.id,
+            quantity=3,
+            unit_price=Decimal("5200"),
+            total_price=Decimal("15600"),
+        )
+    ]
+    session.add(order)
+    await session.commit()
+
+    plan = await reserve_stock(session, order)
+
+    assert plan.warehouse_ids == [warehouse.id]
+    assert await _totals(session, inventory) == (9, 3)
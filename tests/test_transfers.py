@@ -0,0 +1,138 @@
+from decimal import Decimal
+
+import pytest
+from sqlalchemy import func, select
+from sqlalchemy.exc import IntegrityError
+
+from app.models.catalog import Product
+from app.models.stock import Inventory, StockMovement, StockMovementReason, Warehouse
+from app.schemas.stock import StockTransferCreate
+from app.services import transfers as transfer_service
+from app.services.stock import BulkMovementError
+from app.services.transfers import transfer_stock
+
+
+async def _setup(session):
+    product = Product(name="Copa", base_price=Decimal("5"))
+    central = Warehouse(name="Deposito Central")
+    satellite = Warehouse(name="Deposito Satelite")
+    session.add_all([product, central, satellite])
+    await session.commit()
+    inventory = Inventory(product_id=product.id, warehouse_id=central.id, available=100, reserved=0)
+    session.add(inventory)
+    await session.commit()
+    return product, central, satellite, inventory
+
+
+@pytest.mark.asyncio
+async def test_transfer_writes_paired_movements_and_creates_destination(session):
+    product, central, satellite, source = await _setup(session)
+
+    results = await transfer_stock(
+        session,
+        [
+            StockTransferCreate(
+                product_id=product.id,
+                from_warehouse_id=central.id,
+                to_warehouse_id=satellite.id,
+                quantity=30,
+            ),
+            StockTransferCreate(
+                product_id=product.id,
+                from_warehouse_id=central.id,
+                to_warehouse_id=satellite.id,
+                quantity=10,
+                reference="R-1",
+            ),
+        ],
+    )
+
+    destination = (
+        await session.execute(select(Inventory).where(Inventory.warehouse_id == satellite.id))
+    ).scalar_one()
+    await session.refresh(source)
+    assert (source.available, destination.available) == (60, 40)
+    assert results[1].reference == "R-1" and results[0].to_inventory_id == destination.id
+    transfers = select(StockMovement).where(StockMovement.reason == StockMovementReason.transfer)
+    movements = (await session.execute(transfers)).scalars().all()
+    assert sorted(m.quantity_change for m in movements) == [-30, -10, 10, 30]
+    assert {m.reference for m in movements if m.quantity_change in (-10, 10)} == {"R-1"}
+
+
+@pytest.mark.asyncio
+async def test_transfer_batch_is_all_or_nothing(session):
+    product, central, satellite, source = await _setup(session)
+    satellite_id = satellite.id
+
+    with pytest.raises(BulkMovementError) as exc:
+        await transfer_stock(
+            session,
+            [
+                StockTransferCreate(
+                    product_id=product.id,
+                    from_warehouse_id=central.id,
+                    to_warehouse_id=satellite.id,
+                    quantity=60,
+                ),
+                StockTransferCreate(
+                    product_id=product.id,
+                    from_warehouse_id=central.id,
+                    to_warehouse_id=satellite.id,
+                    quantity=60,
+                ),
+            ],
+        )
+
+    assert [e.index for e in exc.value.errors] == [0, 1]
+    await session.refresh(source)
+    assert source.available == 100
+    assert (
+        await session.execute(select(Inventory).where(Inventory.warehouse_id == satellite_id))
+    ).first() is None
+
+
+@pytest.mark.asyncio
+async def test_destination_created_concurrently_is_reused(session, monkeypatch):
+    product, central, satellite, source = await _setup(session)
+    session.add(
+        Inventory(product_id=product.id, warehouse_id=satellite.id, available=5, reserved=0)
+    )
+    await session.commit()
+    load_locations = transfer_service._load_locations
+    reads = []
+
+    async def stale_first_read(db, transfers, locations):
+        # La primera lectura no ve el destino, como si otra transferencia lo creara justo después
+        await load_locations(db, transfers, locations)
+        if not reads:
+            locations.pop((product.id, None, satellite.id))
+        reads.append(len(locations))
+
+    monkeypatch.setattr(transfer_service, "_load_locations", stale_first_read)
+    [result] = await transfer_stock(
+        session,
+        [
+            StockTransferCreate(
+                product_id=product.id,
+                from_warehouse_id=central.id,
+                to_warehouse_id=satellite.id,
+                quantity=30,
+            )
+        ],
+    )
+
+    assert reads == [1, 2]
+    destinations = select(Inventory).where(Inventory.warehouse_id == satellite.id)
+    destination = (await session.execute(destinations)).scalar_one()
+    await session.refresh(destination)
+    assert (result.to_inventory_id, destination.available) == (destination.id, 35)
+
+    # Sin variante también es una sola fila por ubicación
+    session.add(
+        Inventory(product_id=product.id, warehouse_id=satellite.id, available=0, reserved=0)
+    )
+    with pytest.raises(IntegrityError):
+        await session.commit()
+    await session.rollback()
+    count = select(func.count()).select_from(Inventory)
+    assert await session.scalar(count) == 2